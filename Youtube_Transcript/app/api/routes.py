@@ -4,29 +4,93 @@ This layer is intentionally thin and delegates real work to controller modules.
 """
 
 from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
 
-from app.controller.initialize_chat_controller import initialize_chat_controller
-from app.controller.send_message_controller import send_message_controller
-from app.models.schemas import ChatRequest, InitChatRequest
+from app.controller.bulk_ingest_controller import (
+    bulk_ingest_controller,
+    get_bulk_ingest_controller,
+)
+from app.controller.initialize_chat_controller import (
+    get_ingest_job_controller,
+    initialize_chat_controller,
+)
+from app.controller.send_message_controller import (
+    batch_message_controller,
+    send_message_controller,
+    stream_message_controller,
+)
+from app.models.schemas import BatchChatRequest, BulkIngestRequest, ChatRequest, InitChatRequest
 
 
 # All routes under /api/v1 are registered on this router in app/main.py
 router = APIRouter()
 
 
-@router.post("/init", status_code=201)
+@router.post("/init", status_code=202)
 async def initialize_chat(request: InitChatRequest) -> dict:
     """
-    Initialize / reset the knowledge base for a given YouTube URL.
+    Start initializing the knowledge base of a thread for a given YouTube URL.
 
+    Returns an ingest job immediately; in the background the job:
     - Downloads the transcript for the given URL
     - Splits it into text chunks suited for retrieval
-    - Indexes chunks into the Chroma vector store
+    - Indexes chunks into the video's own Chroma collection
+    - Binds the video to request.thread_id (replacing or appending)
     """
-    return await initialize_chat_controller(str(request.url))
+    return await initialize_chat_controller(
+        str(request.url),
+        request.thread_id,
+        append=request.append,
+    )
+
+
+@router.get("/init/{job_id}")
+async def get_ingest_job(job_id: str) -> dict:
+    """Report an ingest job's status, per-stage progress and chunk counts."""
+    return await get_ingest_job_controller(job_id)
+
+
+@router.post("/ingest/bulk", status_code=202)
+async def bulk_ingest(request: BulkIngestRequest) -> dict:
+    """
+    Preload many videos (video, playlist or channel URLs) in the background.
+
+    Transcripts are fetched concurrently; already-indexed videos are skipped
+    and per-video failures are reported without stopping the run.
+    """
+    return await bulk_ingest_controller([str(url) for url in request.urls])
+
+
+@router.get("/ingest/bulk/{run_id}")
+async def get_bulk_ingest(run_id: str) -> dict:
+    """Report a bulk ingest run's progress, failures and throughput."""
+    return await get_bulk_ingest_controller(run_id)
 
 
 @router.post("/message")
 async def send_message(request: ChatRequest) -> dict:
     """Send a chat message to the RAG graph and return the model's answer."""
     return await send_message_controller(request)
+
+
+@router.post("/message/batch")
+async def batch_message(request: BatchChatRequest) -> dict:
+    """
+    Answer many independent questions about the thread's videos in one pass.
+
+    Questions are embedded together and retrieved with one read of each
+    video's index; their LLM calls run concurrently. They are not added to
+    the thread's conversation history.
+    """
+    return await batch_message_controller(request)
+
+
+@router.post("/message/stream")
+async def stream_message(request: ChatRequest) -> StreamingResponse:
+    """
+    Send a chat message and stream the answer back as Server-Sent Events.
+
+    Emits a "retrieval" event with timing first, then one "token" event per
+    generated token, and finally a "done" event with the complete answer.
+    """
+    return await stream_message_controller(request)
@@ -0,0 +1,67 @@
+"""Command-line bulk ingest of videos, playlists and channels.
+
+Usage:
+    python -m app.cli.bulk_ingest URL [URL ...] [--file urls.txt] [--workers 8]
+
+Indexes into the same Chroma persist directory as the API (set
+IS_CHROMA_PERSISTENT=True so the results outlive the command), prints one
+line per video and finishes with throughput statistics.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from typing import List
+
+from app.core.resources import close_resources
+from app.services.bulk_ingest_service import BulkIngestor, BulkIngestRun
+from app.services.ingest_service import IngestJob, ingest_jobs
+
+
+def _read_urls(args: argparse.Namespace) -> List[str]:
+    urls = list(args.urls)
+    if args.file:
+        with open(args.file, encoding="utf-8") as handle:
+            urls.extend(
+                line.strip() for line in handle
+                if line.strip() and not line.lstrip().startswith("#")
+            )
+    return urls
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk ingest YouTube transcripts.")
+    parser.add_argument("urls", nargs="*", help="video, playlist or channel URLs")
+    parser.add_argument("-f", "--file", help="file with one URL per line (# starts a comment)")
+    parser.add_argument("-w", "--workers", type=int, help="concurrent videos (default BULK_INGEST_WORKERS)")
+    args = parser.parse_args(argv)
+
+    urls = _read_urls(args)
+    if not urls:
+        parser.error("no URLs given")
+
+    run = BulkIngestRun(urls)
+    ingestor = BulkIngestor(ingest_jobs.pipeline, workers=args.workers)
+
+    def report(job: IngestJob) -> None:
+        if job.error is not None:
+            outcome = f"failed: {job.error}"
+        elif job.cached:
+            outcome = "skipped (already indexed)"
+        else:
+            outcome = f"{job.chunks_indexed} chunks"
+        print(f"{job.video_id}  {outcome}", flush=True)
+
+    try:
+        ingestor.run(run, on_video=report)
+    finally:
+        asyncio.run(close_resources())
+
+    stats = run.to_dict()
+    print(json.dumps(stats, indent=2))
+    return 0 if stats["status"] == "done" and not stats["failures"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+"""Offline calibration of the off-topic relevance gate.
+
+Usage:
+    python -m app.cli.calibrate_relevance eval.jsonl [--min-recall 0.95] [--classifier]
+
+Each line of the evaluation file is a labelled question about a video:
+    {"url": "https://www.youtube.com/watch?v=...", "question": "...", "on_topic": true}
+
+Videos are ingested if needed, every question goes through the real
+retrieval step, and the script picks the strictest gate that still lets at
+least --min-recall of the on-topic questions through. It prints the
+RELEVANCE_GATE_THRESHOLD to use, or with --classifier fits a small logistic
+regression over the retrieval features and writes it to
+RELEVANCE_GATE_MODEL_PATH, where the gate picks it up on the next start.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from typing import Dict, List, Tuple
+
+import numpy as np
+from langchain_core.messages import HumanMessage
+
+from app.core.config import settings
+from app.core.resources import close_resources
+from app.services.graph.nodes.retrieve_node import retrieve_node
+from app.services.ingest_service import IngestJob, ingest_jobs
+from app.services.relevance_gate_service import FEATURES
+from app.services.youtube_loader_service import extract_video_id
+
+
+def _load_examples(path: str) -> List[dict]:
+    with open(path, encoding="utf-8") as handle:
+        return [json.loads(line) for line in handle if line.strip()]
+
+
+async def _collect(examples: List[dict]) -> Tuple[np.ndarray, np.ndarray]:
+    """Run retrieval for every example and return (features, labels)."""
+    # Calibrate on dense scores, so keyword matches must not short-circuit them
+    settings.BM25_FAST_PATH_ENABLED = False
+
+    ingested = set()
+    rows, labels = [], []
+    try:
+        for example in examples:
+            video_id = extract_video_id(example["url"])
+            if video_id not in ingested:
+                ingest_jobs.pipeline.ingest(IngestJob(example["url"], video_id, None, False))
+                ingested.add(video_id)
+
+            state = await retrieve_node({
+                "messages": [HumanMessage(content=example["question"])],
+                "video_ids": [video_id],
+            })
+            rows.append([state["relevance"][name] for name in FEATURES])
+            labels.append(1.0 if example["on_topic"] else 0.0)
+    finally:
+        await close_resources()
+    return np.asarray(rows, dtype=np.float64), np.asarray(labels, dtype=np.float64)
+
+
+def _fit_logistic(x: np.ndarray, y: np.ndarray, steps: int = 5000, l2: float = 1e-3) -> Tuple[np.ndarray, float]:
+    """Plain gradient-descent logistic regression (features are small and few)."""
+    weights, bias = np.zeros(x.shape[1]), 0.0
+    for _ in range(steps):
+        p = 1.0 / (1.0 + np.exp(-(x @ weights + bias)))
+        weights -= 0.5 * (x.T @ (p - y) / len(y) + l2 * weights)
+        bias -= 0.5 * float(np.mean(p - y))
+    return weights, bias
+
+
+def _pick_threshold(scores: np.ndarray, labels: np.ndarray, min_recall: float) -> Dict[str, float]:
+    """Strictest threshold that keeps on-topic recall >= min_recall."""
+    positives = scores[labels == 1]
+    negatives = scores[labels == 0]
+    best = {"threshold": float(scores.min()), "recall": 1.0, "refused_off_topic": 0.0}
+    for threshold in np.unique(scores):
+        recall = float(np.mean(positives >= threshold)) if len(positives) else 1.0
+        if recall < min_recall:
+            break
+        refused = float(np.mean(negatives < threshold)) if len(negatives) else 0.0
+        best = {"threshold": float(threshold), "recall": recall, "refused_off_topic": refused}
+    return best
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Calibrate the off-topic relevance gate.")
+    parser.add_argument("eval_file", help="JSONL file of {url, question, on_topic} examples")
+    parser.add_argument("--min-recall", type=float, default=0.95, help="on-topic questions that must pass")
+    parser.add_argument("--classifier", action="store_true", help="fit and save a logistic classifier")
+    parser.add_argument("--output", default=settings.RELEVANCE_GATE_MODEL_PATH, help="classifier file")
+    args = parser.parse_args(argv)
+
+    x, y = asyncio.run(_collect(_load_examples(args.eval_file)))
+    print(f"{len(y)} examples ({int(y.sum())} on topic, {int(len(y) - y.sum())} off topic)")
+
+    if not args.classifier:
+        result = _pick_threshold(x[:, FEATURES.index("top_dense")], y, args.min_recall)
+        print(json.dumps(result, indent=2))
+        print(f"RELEVANCE_GATE_THRESHOLD={result['threshold']:.4f}")
+        return 0
+
+    weights, bias = _fit_logistic(x, y)
+    probabilities = 1.0 / (1.0 + np.exp(-(x @ weights + bias)))
+    result = _pick_threshold(probabilities, y, args.min_recall)
+    model = {
+        "features": list(FEATURES),
+        "weights": weights.tolist(),
+        "bias": bias,
+        "threshold": result["threshold"],
+        "min_recall": args.min_recall,
+        "examples": int(len(y)),
+    }
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as handle:
+        json.dump(model, handle, indent=2)
+    print(json.dumps(result, indent=2))
+    print(f"Wrote relevance classifier to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,30 @@
+"""Controller for bulk ingestion of playlists, channels and URL lists."""
+
+from typing import List
+
+from fastapi import HTTPException
+
+from app.services.bulk_ingest_service import bulk_ingests
+
+
+async def bulk_ingest_controller(urls: List[str]) -> dict:
+    """
+    Start a background bulk ingest and return its run record at once.
+
+    Every URL may be a video, playlist or channel. Videos are indexed into
+    their own collections (already-indexed ones are skipped) without being
+    bound to any thread; a later /init of such a video is an ingest cache hit.
+    """
+    try:
+        run = bulk_ingests.submit(urls)
+        return run.to_dict()
+    except Exception as e:  # Let FastAPI convert this into a 500 response
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+async def get_bulk_ingest_controller(run_id: str) -> dict:
+    """Return the progress and throughput statistics of a bulk ingest run."""
+    run = bulk_ingests.get(run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail=f"Unknown bulk ingest run '{run_id}'")
+    return run.to_dict()
@@ -2,52 +2,38 @@
 
 from fastapi import HTTPException
 
-from app.core.config import settings
-from app.core.factory import get_embeddings
-from app.infrastructure.chroma.repository import ChromaVectorRepository
-from app.services.document_splitter_service import DocumentSplitter
-from app.services.youtube_loader_service import YoutubeTranscriptLoader
+from app.services.ingest_service import ingest_jobs
+from app.services.youtube_loader_service import extract_video_id
 
 
-# Long‑lived helpers reused across requests
-loader = YoutubeTranscriptLoader()
-splitter = DocumentSplitter()
-
-# Repository abstraction around the Chroma vector store
-vector_repo = ChromaVectorRepository(
-    embeddings=get_embeddings(),
-    persist_dir=settings.CHROMA_PERSIST_DIR if settings.IS_CHROMA_PERSISTENT else None,
-)
+async def initialize_chat_controller(url: str, thread_id: str, append: bool = False) -> dict:
+    """
+    Start ingesting a YouTube transcript for a chat thread and return at once.
 
+    The returned job runs in the background and:
+    - reuses an existing index of the video when its cache key matches
+    - otherwise loads the transcript, splits it into overlapping chunks,
+      embeds them and saves them into the video's own collection
+    - precomputes the bounded video digest used on every chat turn
+    - binds the video to thread_id (optionally alongside earlier videos).
 
-async def initialize_chat_controller(url: str) -> dict:
+    Poll get_ingest_job_controller with the returned job_id for progress.
     """
-    Ingest a YouTube transcript and (re)build the vector store.
+    try:
+        video_id = extract_video_id(url)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    This:
-    - loads the transcript from YouTube
-    - splits it into overlapping chunks
-    - saves all chunks into a single "youtube_transcripts" collection,
-      clearing any previous content.
-    """
     try:
-        # 1) Load raw transcript documents for the URL
-        documents = loader.load(url)
-
-        # 2) Split into smaller, retriever‑friendly chunks
-        chunks = splitter.split(documents)
-
-        # 3) Persist chunks into Chroma (optionally clearing existing data)
-        vector_repo.save(
-            documents=chunks,
-            collection_name="youtube_transcripts",
-            clear_existing=True,
-        )
-
-        return {
-            "status": "ready",
-            "message": f"Knowledge base cleared and updated with new video. Total chunks: {len(chunks)}",
-        }
+        job = ingest_jobs.submit(url, video_id, thread_id, append=append)
+        return job.to_dict()
     except Exception as e:  # Let FastAPI convert this into a 500 response
         raise HTTPException(status_code=500, detail=str(e))
 
+
+async def get_ingest_job_controller(job_id: str) -> dict:
+    """Return the progress of an ingest job (stage timings and chunk counts)."""
+    snapshot = ingest_jobs.snapshot(job_id)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail=f"Unknown ingest job '{job_id}'")
+    return snapshot
@@ -1,9 +1,28 @@
 """Controller that forwards chat messages into the LangGraph RAG pipeline."""
 
+import json
+import logging
+from typing import AsyncIterator
+
 from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+
+from app.infrastructure.llm.gateway import LLMOverloadedError
+from app.models.schemas import BatchChatRequest, ChatRequest
+from app.services.batch_answer_service import answer_batch
+from app.services.graph.main import ThreadNotInitializedError, chat, chat_stream
+
+
+logger = logging.getLogger(__name__)
 
-from app.models.schemas import ChatRequest
-from app.services.graph.main import chat
+
+def _overloaded(e: LLMOverloadedError) -> HTTPException:
+    """503 with a Retry-After hint, so clients back off instead of retrying at once."""
+    return HTTPException(
+        status_code=503,
+        detail=str(e),
+        headers={"Retry-After": str(max(1, round(e.retry_after)))},
+    )
 
 
 async def send_message_controller(request: ChatRequest) -> dict:
@@ -13,18 +32,94 @@ async def send_message_controller(request: ChatRequest) -> dict:
     The underlying graph handles:
     - retrieving relevant chunks from Chroma
     - calling the LLM with strict system instructions
-    - returning the final answer text
+    - returning the final answer text with timestamped sources
     """
     try:
         # Delegate to the async chat graph entrypoint
-        answer = await chat(
+        result = await chat(
             request.message,
             request.thread_id,
         )
         return {
             "thread_id": request.thread_id,
-            "answer": answer,
+            "answer": result["answer"],
+            "sources": result["sources"],
         }
 
+    except ThreadNotInitializedError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except LLMOverloadedError as e:
+        raise _overloaded(e)
     except Exception as e:  # Surface errors as HTTP 500
         raise HTTPException(status_code=500, detail=str(e))
+
+
+async def batch_message_controller(request: BatchChatRequest) -> dict:
+    """
+    Answer a batch of questions in one pass over the thread's videos.
+
+    Per-question LLM failures are reported in that question's result; only
+    failures of the whole batch become an HTTP error.
+    """
+    try:
+        result = await answer_batch(request.questions, request.thread_id)
+        return {"thread_id": request.thread_id, **result}
+
+    except ThreadNotInitializedError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def _format_sse(event: str, data: dict) -> str:
+    """Encode a single Server-Sent Events frame."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _sse_events(events: AsyncIterator[dict], request: ChatRequest) -> AsyncIterator[str]:
+    """Translate graph stream events into SSE frames, reporting errors inline."""
+    try:
+        async for item in events:
+            yield _format_sse(item["event"], {"thread_id": request.thread_id, **item["data"]})
+    except LLMOverloadedError as e:
+        yield _format_sse(
+            "error",
+            {"thread_id": request.thread_id, "detail": str(e), "status": 503, "retry_after": e.retry_after},
+        )
+    except Exception as e:  # Headers are already sent, so report in-band
+        logger.exception("Streaming chat turn failed")
+        yield _format_sse("error", {"thread_id": request.thread_id, "detail": str(e)})
+
+
+async def stream_message_controller(request: ChatRequest) -> StreamingResponse:
+    """
+    Execute a single chat turn, streaming progress as Server-Sent Events.
+
+    Events are emitted in order: "retrieval" (timing), one "token" per LLM
+    token, then "done" with the full answer (or "error" on failure).
+    """
+    events = chat_stream(request.message, request.thread_id)
+    try:
+        # Prime the generator so setup errors become a proper HTTP status
+        first = await events.__anext__()
+    except ThreadNotInitializedError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except LLMOverloadedError as e:
+        raise _overloaded(e)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    async def replay() -> AsyncIterator[dict]:
+        yield first
+        async for item in events:
+            yield item
+
+    return StreamingResponse(
+        _sse_events(replay(), request),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            # Stop reverse proxies (e.g. nginx) from buffering the stream
+            "X-Accel-Buffering": "no",
+        },
+    )
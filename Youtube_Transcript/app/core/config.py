@@ -1,5 +1,7 @@
 """Application configuration loaded from environment variables."""
 
+from typing import Optional
+
 from pydantic_settings import BaseSettings
 
 
@@ -9,18 +11,159 @@ class Settings(BaseSettings):
     # LLM / embeddings credentials
     OPENAI_API_KEY: str
     HF_TOKEN: str
+    ANTHROPIC_API_KEY: Optional[str] = None
+    GOOGLE_API_KEY: Optional[str] = None
 
     # Chroma persistence configuration
     CHROMA_PERSIST_DIR: str = "./chroma_db"
     IS_CHROMA_PERSISTENT: bool = False
 
+    # Chroma backend: memory, persistent (CHROMA_PERSIST_DIR) or http (a Chroma
+    # server shared by every worker); unset = persistent/memory per IS_CHROMA_PERSISTENT
+    CHROMA_MODE: Optional[str] = None
+    CHROMA_HOST: str = "localhost"
+    CHROMA_PORT: int = 8000
+    CHROMA_SSL: bool = False
+    CHROMA_AUTH_TOKEN: Optional[str] = None
+
     # LLM configuration
     MODEL_NAME: str = "gpt-4o-mini"
-    LLM_PROVIDER: str = "openai"  # openai, google, anthropic
+    LLM_PROVIDER: str = "openai"  # openai, google, anthropic, fake
+    # LLM gateway: concurrent provider calls, rate limit, and the queue beyond
+    # which calls fail fast (HTTP 503) instead of piling up. Each worker
+    # process has its own gateway, so these limits apply per worker: divide
+    # the provider's limits by WEB_CONCURRENCY (and by the API containers)
+    LLM_MAX_CONCURRENCY: int = 16
+    LLM_REQUESTS_PER_MINUTE: int = 0  # 0 = no limit
+    LLM_MAX_QUEUE: int = 64
+    LLM_QUEUE_TIMEOUT_SECONDS: float = 30.0
+    LLM_COALESCE_ENABLED: bool = True
+    # Provider prompt caching of the static prompt prefix (Anthropic
+    # cache_control marker, OpenAI prompt_cache_key routing hint)
+    LLM_PROMPT_CACHING: bool = True
 
     # Embedding model configuration
     EMBEDDING_MODEL: str = "BAAI/bge-m3"
-    EMBEDDING_PROVIDER: str = "huggingface"  # openai, google, huggingface
+    EMBEDDING_PROVIDER: str = "huggingface"  # openai, google, huggingface, local, fake
+
+    # Where transcripts come from, tried in order (comma-separated): youtube
+    # (transcript API, then yt-dlp subtitles), api, ytdlp, fixtures (files in
+    # TRANSCRIPT_FIXTURES_DIR) or synthetic (offline, for benchmarks)
+    TRANSCRIPT_SOURCE: str = "youtube"
+    TRANSCRIPT_YTDLP_FALLBACK: bool = True
+    TRANSCRIPT_FIXTURES_DIR: str = "./fixtures/transcripts"
+    # Fetched transcripts are cached here, gzipped ("" disables the cache)
+    TRANSCRIPT_CACHE_DIR: str = "./transcript_cache"
+    TRANSCRIPT_CACHE_TTL_SECONDS: int = 30 * 24 * 3600
+    # Per attempt; transient failures are retried with jittered exponential backoff
+    TRANSCRIPT_FETCH_TIMEOUT_SECONDS: float = 30.0
+    TRANSCRIPT_FETCH_RETRIES: int = 2
+    TRANSCRIPT_FETCH_BACKOFF_SECONDS: float = 1.0
+
+    # Offline fake providers (LLM_PROVIDER=fake / EMBEDDING_PROVIDER=fake)
+    FAKE_LLM_FIRST_TOKEN_MS: float = 0.0
+    FAKE_LLM_TOKEN_MS: float = 0.0
+    FAKE_EMBEDDING_LATENCY_MS: float = 0.0
+    FAKE_EMBEDDING_DIM: int = 384
+
+    # Local (EMBEDDING_PROVIDER=local) ONNX model settings
+    EMBEDDING_THREADS: Optional[int] = None  # ONNX Runtime intra-op threads
+    EMBEDDING_BATCH_WINDOW_MS: float = 5.0
+    EMBEDDING_MICRO_BATCH_MAX: int = 32
+
+    # Persistent embedding cache and batching of provider calls
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_PATH: str = "./embedding_cache/embeddings.sqlite3"
+    EMBEDDING_BATCH_SIZE: int = 64
+    EMBEDDING_MAX_CONCURRENCY: int = 4
+    EMBEDDING_MAX_RETRIES: int = 3
+
+    # Outbound HTTP connection pool per provider (OpenAI, Anthropic, Google)
+    HTTP_MAX_CONNECTIONS: int = 32
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 16
+    HTTP_KEEPALIVE_EXPIRY_SECONDS: float = 60.0
+    HTTP_TIMEOUT_SECONDS: float = 60.0
+
+    # Hybrid retrieval: BM25 + dense, fused with reciprocal rank fusion
+    RETRIEVAL_CANDIDATES: int = 30
+
+    # Off-topic gate on retrieval scores, before rerank/LLM. Chroma's default
+    # (squared L2) collections give 1 - (2 - 2*cos)/sqrt(2), i.e. -0.41..1 for
+    # normalized embeddings; -0.1 is roughly cosine 0.22
+    RELEVANCE_GATE_ENABLED: bool = True
+    RELEVANCE_GATE_THRESHOLD: float = -0.1
+    RELEVANCE_GATE_MODEL_PATH: str = "./calibration/relevance_gate.json"
+
+    # Reranking: over-fetch, rescore (relevance + MMR) and trim to a token budget
+    RERANK_CANDIDATES: int = 30
+    RERANK_MIN_RELEVANCE: float = 0.2
+    RERANK_MMR_LAMBDA: float = 0.7
+    RERANK_TOKEN_BUDGET: int = 1200
+    BM25_FAST_PATH_ENABLED: bool = True
+    BM25_DECISIVE_MIN_SCORE: float = 6.0
+    BM25_DECISIVE_RATIO: float = 2.0
+
+    # Conversation memory: checkpointer backend and bounds
+    CHECKPOINTER_BACKEND: str = "sqlite"  # sqlite, memory
+    CHECKPOINT_DB_PATH: str = "./checkpoints/checkpoints.sqlite3"
+    # Thread -> video bindings and ingest job status, shared by workers (sqlite backend)
+    STATE_DB_PATH: str = "./checkpoints/state.sqlite3"
+    THREAD_MAX_ACTIVE: int = 1000
+    THREAD_IDLE_TTL_SECONDS: int = 24 * 3600
+    HISTORY_WINDOW_MESSAGES: int = 10
+
+    # Batch Q&A (/message/batch): questions per request, concurrent LLM calls per batch
+    BATCH_MAX_QUESTIONS: int = 100
+    BATCH_LLM_CONCURRENCY: int = 8
+
+    # Semantic cache of first-turn answers
+    ANSWER_CACHE_ENABLED: bool = True
+    ANSWER_CACHE_THRESHOLD: float = 0.95
+    ANSWER_CACHE_TTL_SECONDS: int = 3600
+    ANSWER_CACHE_MAX_ENTRIES: int = 1000
+
+    # Transcript chunking: caption segments packed into token-budgeted chunks
+    CHUNK_MAX_TOKENS: int = 250
+    CHUNK_OVERLAP_SEGMENTS: int = 1
+
+    # Approximate token budget of the per-video digest sent on every turn
+    DIGEST_TOKEN_BUDGET: int = 2000
+
+    # Background ingest jobs
+    INGEST_MAX_WORKERS: int = 4
+    INGEST_JOB_HISTORY: int = 500
+    # Cross-process lock per video while it is (re)indexed
+    INGEST_LOCK_LEASE_SECONDS: int = 900
+    INGEST_LOCK_TIMEOUT_SECONDS: int = 900
+    # A re-indexed video's previous collection outlives the swap by this long,
+    # so queries already running against it can finish
+    INDEX_SWAP_GRACE_SECONDS: float = 5.0
+    # How often a worker re-reads which index a collection holds, so caches
+    # built from it (lexical index, digest, answers) notice a re-index elsewhere
+    INDEX_REVALIDATE_SECONDS: float = 10.0
+
+    # Optional in-process quantized index of recently queried collections,
+    # used for similarity search instead of a Chroma query
+    HOT_INDEX_ENABLED: bool = False
+    HOT_INDEX_DTYPE: str = "int8"  # or "float16"
+    HOT_INDEX_MAX_COLLECTIONS: int = 64
+    # Collections larger than this get an IVF index searching HOT_INDEX_NPROBE clusters
+    HOT_INDEX_FLAT_MAX: int = 4096
+    HOT_INDEX_NPROBE: int = 8
+    # Memory-mapped codes shared by the workers on a host ("" keeps them in RAM)
+    HOT_INDEX_DIR: str = "./hot_index"
+    # How often a worker checks that a cached index is still the live one
+    HOT_INDEX_REVALIDATE_SECONDS: float = 30.0
+
+    # Bulk ingest (playlists, channels, URL lists)
+    BULK_INGEST_WORKERS: int = 8
+    BULK_INGEST_MAX_VIDEOS: int = 500
+
+    # Ingest cache: reuse an already-indexed video instead of rebuilding it
+    INGEST_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+    INGEST_CACHE_MAX_VIDEOS: int = 200
+    # How often (at most) an ingest sweeps the cache for videos to evict
+    INGEST_CACHE_SWEEP_SECONDS: float = 60.0
 
     class Config:
         env_file = ".env"
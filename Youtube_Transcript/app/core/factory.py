@@ -1,30 +1,172 @@
-"""Factories for creating LLM and embedding clients based on configuration."""
+"""Factories for creating LLM and embedding clients based on configuration.
 
-from langchain_anthropic import ChatAnthropic
-from langchain_google_genai import (
-    ChatGoogleGenerativeAI,
-    GoogleGenerativeAIEmbeddings,
-)
-from langchain_huggingface import HuggingFaceEndpointEmbeddings
-from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+Provider SDKs are imported inside the branch that uses them: importing every
+SDK costs seconds of startup and tens of MB per worker, and only the
+configured LLM_PROVIDER / EMBEDDING_PROVIDER are ever needed.
+"""
+
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional
 
 from app.core.config import settings
+from app.infrastructure.embeddings.cached import CachedEmbeddings
+from app.infrastructure.embeddings.store import SQLiteEmbeddingStore
+from app.infrastructure.http.pool import HttpPool, connection_limits
+from app.infrastructure.state.store import SQLiteStateStore
+
+if TYPE_CHECKING:
+    from langchain_anthropic import ChatAnthropic
+
+    from app.infrastructure.embeddings.batching import MicroBatchingEmbeddings
+
+
+@lru_cache(maxsize=None)
+def get_embedding_store() -> SQLiteEmbeddingStore:
+    """Return the process-wide persistent embedding cache."""
+    return SQLiteEmbeddingStore(settings.EMBEDDING_CACHE_PATH)
+
+
+@lru_cache(maxsize=None)
+def get_state_store() -> Optional[SQLiteStateStore]:
+    """
+    Return the store for state shared by worker processes.
+
+    Only with the sqlite checkpointer (which workers already share); with the
+    memory checkpointer every worker is on its own anyway, so None.
+    """
+    if settings.CHECKPOINTER_BACKEND != "sqlite":
+        return None
+    return SQLiteStateStore(settings.STATE_DB_PATH)
+
+
+@lru_cache(maxsize=None)
+def get_local_embeddings() -> "MicroBatchingEmbeddings":
+    """
+    Return the process-wide local ONNX model, behind a query micro-batcher.
+
+    Shared by every caller so the model is loaded into memory only once.
+    """
+    from app.infrastructure.embeddings.batching import MicroBatchingEmbeddings
+    from app.infrastructure.embeddings.local import LocalOnnxEmbeddings
+
+    model = LocalOnnxEmbeddings(
+        model_name=settings.EMBEDDING_MODEL,
+        threads=settings.EMBEDDING_THREADS,
+        batch_size=settings.EMBEDDING_BATCH_SIZE,
+    )
+    return MicroBatchingEmbeddings(
+        model,
+        window_ms=settings.EMBEDDING_BATCH_WINDOW_MS,
+        max_batch=settings.EMBEDDING_MICRO_BATCH_MAX,
+    )
+
+
+def create_http_pool(provider: str) -> Optional[HttpPool]:
+    """Return a pooled HTTP client for a provider's SDK, or None if it cannot use one."""
+    if provider == "openai":
+        import openai
+
+        return HttpPool(openai.DefaultHttpxClient, openai.DefaultAsyncHttpxClient)
+    elif provider == "anthropic":
+        import anthropic
+
+        return HttpPool(anthropic.DefaultHttpxClient, anthropic.DefaultAsyncHttpxClient)
+    return None
+
+
+def _openai_http_kwargs(http: Optional[HttpPool]) -> dict:
+    if http is None:
+        return {}
+    return {"http_client": http.client, "http_async_client": http.async_client}
+
+
+def _google_http_kwargs() -> dict:
+    # google-genai builds its own httpx clients (one pool per model); apply the same limits
+    return {"client_args": {"limits": connection_limits(), "timeout": settings.HTTP_TIMEOUT_SECONDS}}
+
+
+def _use_anthropic_pool(llm: "ChatAnthropic", http: HttpPool) -> "ChatAnthropic":
+    """
+    Point ChatAnthropic's SDK clients at the pooled HTTP clients.
 
+    ChatAnthropic has no http_client option; it builds its SDK clients lazily
+    (as cached properties) on default httpx clients, so build them up front.
+    """
+    import anthropic
 
-def get_embeddings():
-    """Return a LangChain embeddings client for the configured provider."""
+    params = llm._client_params
+    llm.__dict__["_client"] = anthropic.Client(**params, http_client=http.client)
+    llm.__dict__["_async_client"] = anthropic.AsyncClient(**params, http_client=http.async_client)
+    return llm
+
+
+def warmup_embeddings() -> None:
+    """Load and exercise the local embedding model (no-op for hosted providers)."""
+    if settings.EMBEDDING_PROVIDER == "local":
+        get_local_embeddings().embeddings.warmup()
+
+
+# Providers whose embed_query(text) is embed_documents([text])[0], so many
+# queries can be embedded in one documents call (Gemini tags queries apart)
+SYMMETRIC_EMBEDDING_PROVIDERS = ("openai", "huggingface", "fake")
+
+
+def get_embeddings(http: Optional[HttpPool] = None):
+    """
+    Return a LangChain embeddings client for the configured provider.
+
+    Unless EMBEDDING_CACHE_ENABLED is False, the provider client is wrapped so
+    vectors are cached on disk and misses are embedded in concurrent batches.
+    http, if given, is the pooled HTTP client the provider SDK should use.
+    """
+    embeddings = create_provider_embeddings(http)
+    if not settings.EMBEDDING_CACHE_ENABLED:
+        return embeddings
+
+    return CachedEmbeddings(
+        embeddings,
+        store=get_embedding_store(),
+        model_key=f"{settings.EMBEDDING_PROVIDER}:{settings.EMBEDDING_MODEL}",
+        batch_size=settings.EMBEDDING_BATCH_SIZE,
+        max_concurrency=settings.EMBEDDING_MAX_CONCURRENCY,
+        max_retries=settings.EMBEDDING_MAX_RETRIES,
+        symmetric_queries=settings.EMBEDDING_PROVIDER in SYMMETRIC_EMBEDDING_PROVIDERS,
+    )
+
+
+def create_provider_embeddings(http: Optional[HttpPool] = None):
+    """Return the raw, uncached embeddings client for the configured provider."""
     if settings.EMBEDDING_PROVIDER == "openai":
+        from langchain_openai import OpenAIEmbeddings
+
         return OpenAIEmbeddings(
             model=settings.EMBEDDING_MODEL,
             api_key=settings.OPENAI_API_KEY,
+            **_openai_http_kwargs(http),
         )
     elif settings.EMBEDDING_PROVIDER == "google":
+        from langchain_google_genai import GoogleGenerativeAIEmbeddings
+
         return GoogleGenerativeAIEmbeddings(
             model=settings.EMBEDDING_MODEL,
             google_api_key=settings.GOOGLE_API_KEY,
+            **_google_http_kwargs(),
+        )
+    elif settings.EMBEDDING_PROVIDER == "local":
+        # In-process ONNX model on the CPU; no network round-trip per query
+        return get_local_embeddings()
+    elif settings.EMBEDDING_PROVIDER == "fake":
+        # Offline deterministic vectors for benchmarks; no key or network needed
+        from app.infrastructure.fake.embeddings import FakeHashingEmbeddings
+
+        return FakeHashingEmbeddings(
+            size=settings.FAKE_EMBEDDING_DIM,
+            latency_ms=settings.FAKE_EMBEDDING_LATENCY_MS,
         )
     elif settings.EMBEDDING_PROVIDER == "huggingface":
         # Hosted HuggingFace Inference API
+        from langchain_huggingface import HuggingFaceEndpointEmbeddings
+
         return HuggingFaceEndpointEmbeddings(
             model=settings.EMBEDDING_MODEL,
             task="feature-extraction",
@@ -34,26 +176,49 @@ def get_embeddings():
         raise ValueError(f"Unsupported embedding provider: {settings.EMBEDDING_PROVIDER}")
 
 
-def get_llm():
-    """Return a chat LLM client for the configured provider."""
+def get_llm(http: Optional[HttpPool] = None):
+    """
+    Return a chat LLM client for the configured provider.
+
+    http, if given, is the pooled HTTP client the provider SDK should use.
+    """
     if settings.LLM_PROVIDER == "openai":
+        from langchain_openai import ChatOpenAI
+
         return ChatOpenAI(
             model=settings.MODEL_NAME,
             temperature=0,
             streaming=True,
+            # Report token usage on streamed responses too (for /metrics)
+            stream_usage=True,
             api_key=settings.OPENAI_API_KEY,
+            **_openai_http_kwargs(http),
         )
     elif settings.LLM_PROVIDER == "google":
+        from langchain_google_genai import ChatGoogleGenerativeAI
+
         return ChatGoogleGenerativeAI(
             model=settings.MODEL_NAME,
             temperature=0,
             google_api_key=settings.GOOGLE_API_KEY,
+            **_google_http_kwargs(),
         )
     elif settings.LLM_PROVIDER == "anthropic":
-        return ChatAnthropic(
+        from langchain_anthropic import ChatAnthropic
+
+        llm = ChatAnthropic(
             model=settings.MODEL_NAME,
             temperature=0,
             api_key=settings.ANTHROPIC_API_KEY,
         )
+        return _use_anthropic_pool(llm, http) if http is not None else llm
+    elif settings.LLM_PROVIDER == "fake":
+        # Offline streaming model with simulated latency, for benchmarks
+        from app.infrastructure.fake.llm import FakeStreamingChatModel
+
+        return FakeStreamingChatModel(
+            first_token_latency_ms=settings.FAKE_LLM_FIRST_TOKEN_MS,
+            token_latency_ms=settings.FAKE_LLM_TOKEN_MS,
+        )
     else:
         raise ValueError(f"Unsupported LLM provider: {settings.LLM_PROVIDER}")
\ No newline at end of file
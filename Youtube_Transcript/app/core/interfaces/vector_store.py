@@ -1,7 +1,8 @@
 """Abstract interface for a vector store implementation."""
 
+import threading
 from abc import ABC, abstractmethod
-from typing import Any, List
+from typing import Any, ContextManager, Dict, List, Optional, Tuple
 
 
 class VectorStore(ABC):
@@ -15,6 +16,32 @@ class VectorStore(ABC):
     def get_vector_store(self, collection_name: str) -> Any:
         """Return the underlying vector store client for advanced operations."""
 
+    @abstractmethod
+    async def asimilarity_search(self, collection_name: str, query: str, k: int) -> List[Tuple[Any, float]]:
+        """Return the k documents most relevant to query with their relevance scores, best first."""
+
+    @abstractmethod
+    def refresh_vector_store(self, collection_name: str) -> Any:
+        """Drop any cached client for the collection and return a fresh one."""
+
+    @abstractmethod
+    def index_version(self, collection_name: str) -> str:
+        """Return a value that changes whenever the collection's documents change ("" if it does not exist)."""
+
+    @abstractmethod
+    def write_lock(
+        self,
+        collection_name: str,
+        cancel: Optional[threading.Event] = None,
+        timeout_seconds: Optional[float] = None,
+    ) -> ContextManager:
+        """
+        Return a lock (context manager) held while the collection is rebuilt or evicted.
+
+        Setting cancel stops waiting for it; timeout_seconds overrides the
+        configured wait (0 = fail at once with TimeoutError if it is held).
+        """
+
     @abstractmethod
     def clear_collection(self, collection_name: str) -> None:
         """Remove all documents from a specific collection."""
@@ -25,10 +52,44 @@ class VectorStore(ABC):
         documents: List[Any],
         collection_name: str,
         clear_existing: bool = True,
+        collection_metadata: Optional[Dict[str, Any]] = None,
+        vectors: Optional[List[List[float]]] = None,
+        ids: Optional[List[str]] = None,
     ) -> None:
         """
         Save documents into a collection.
 
-        If clear_existing=True, any existing collection with the same name
-        should be deleted before saving.
+        If clear_existing=True, the documents replace the collection's
+        contents; readers must never see it half-written. collection_metadata,
+        if given, is attached to the collection. vectors, if given, are
+        precomputed embeddings (one per document) to store instead of
+        embedding again. ids, if given, are the documents' IDs.
         """
+
+    @abstractmethod
+    def get_chunk_ids(self, collection_name: str) -> List[str]:
+        """Return the IDs of the documents in a collection (empty if it does not exist)."""
+
+    @abstractmethod
+    def get_vectors(self, collection_name: str, ids: List[str]) -> Dict[str, List[float]]:
+        """Return the stored embeddings of the given document IDs, keyed by ID."""
+
+    @abstractmethod
+    def get_chunks(self, collection_name: str) -> Tuple[List[Any], List[List[float]]]:
+        """Return every document of a collection and its embedding (empty if it does not exist)."""
+
+    @abstractmethod
+    def list_collections(self) -> List[str]:
+        """Return the names of all existing collections."""
+
+    @abstractmethod
+    def get_collection_metadata(self, collection_name: str) -> Optional[Dict[str, Any]]:
+        """Return a collection's metadata, or None if it does not exist."""
+
+    @abstractmethod
+    def update_collection_metadata(self, collection_name: str, metadata: Dict[str, Any]) -> None:
+        """Replace a collection's metadata."""
+
+    @abstractmethod
+    def close(self) -> None:
+        """Release cached handles and the underlying client."""
@@ -0,0 +1,95 @@
+"""Prometheus metrics and request IDs shared by every layer of the app.
+
+Stage timings land in a single histogram labelled by stage, so a slow answer
+can be attributed to the transcript fetch, embeddings, Chroma or the LLM.
+All metrics are exposed by the /metrics route in app/main.py.
+"""
+
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+from prometheus_client import Counter, Gauge, Histogram
+
+
+# Ingest stages run for seconds to minutes, query stages for milliseconds
+_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+STAGE_SECONDS = Histogram(
+    "rag_stage_seconds",
+    "Duration of pipeline stages (ingest: fetch/split/embed/index; chat: "
+    "chroma_query/chroma_get/retrieve/rerank/prompt_build/llm_queue/llm_ttft/llm/total; batch: batch_retrieve/batch_total; "
+    "embedding_request per provider call)",
+    ["stage"],
+    buckets=_BUCKETS,
+)
+
+LLM_TOKENS = Counter(
+    "rag_llm_tokens_total",
+    "Tokens sent to and generated by the LLM",
+    ["kind"],  # input, output, cache_read / cache_creation (input tokens read from / written to the provider's prompt cache)
+)
+
+CACHE_REQUESTS = Counter(
+    "rag_cache_requests_total",
+    "Cache lookups by cache and result",
+    ["cache", "result"],  # cache: answer, embedding, ingest, transcript; result: hit, miss
+)
+
+TRANSCRIPT_FETCHES = Counter(
+    "rag_transcript_fetches_total",
+    "Transcript fetch attempts by source and result",
+    ["source", "result"],  # result: ok, retry, unavailable (no transcript there), failed (out of retries)
+)
+
+LLM_GATEWAY_REQUESTS = Counter(
+    "rag_llm_gateway_requests_total",
+    "LLM calls by how the gateway handled them",
+    ["result"],  # called (sent to the provider), coalesced, rejected
+)
+
+LLM_GATEWAY_WAITING = Gauge(
+    "rag_llm_gateway_waiting",
+    "LLM calls queued for a concurrency slot",
+)
+
+TURNS = Counter(
+    "rag_chat_turns_total",
+    "Chat turns by how they were answered",
+    ["outcome"],  # llm, refused, cached
+)
+
+# ID of the HTTP request being served, set by the middleware in app/main.py
+request_id_var: ContextVar[str] = ContextVar("request_id", default="")
+
+
+def new_request_id() -> str:
+    return uuid.uuid4().hex
+
+
+def current_request_id() -> str:
+    """The current request's ID, or a fresh one outside of a request."""
+    return request_id_var.get() or new_request_id()
+
+
+def observe(stage: str, seconds: float) -> None:
+    STAGE_SECONDS.labels(stage=stage).observe(seconds)
+
+
+@contextmanager
+def timed(stage: str) -> Iterator[None]:
+    """Record the duration of the enclosed block under the given stage."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage, time.perf_counter() - started)
+
+
+def count_cache(cache: str, hits: int, misses: int) -> None:
+    if hits:
+        CACHE_REQUESTS.labels(cache=cache, result="hit").inc(hits)
+    if misses:
+        CACHE_REQUESTS.labels(cache=cache, result="miss").inc(misses)
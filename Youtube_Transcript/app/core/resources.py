@@ -0,0 +1,96 @@
+"""Application-scoped clients shared by every request.
+
+The FastAPI lifespan opens the resources once at startup and closes them on
+shutdown, so no request pays for client construction or connection setup;
+CLI tools get them lazily on first use.
+"""
+
+import logging
+import threading
+from typing import Dict, Optional
+
+from app.core.config import settings
+from app.core.factory import (
+    create_http_pool,
+    get_embedding_store,
+    get_embeddings,
+    get_llm,
+    get_state_store,
+)
+from app.infrastructure.chroma.client import ChromaClientFactory, chroma_mode
+from app.infrastructure.chroma.repository import ChromaVectorRepository
+from app.infrastructure.http.pool import HttpPool
+from app.infrastructure.llm.gateway import LLMGateway
+from app.services.lexical_index_service import lexical_indexes
+from app.services.video_digest_service import digest_cache
+
+
+logger = logging.getLogger(__name__)
+
+
+class AppResources:
+    """
+    The process-wide embeddings client, LLM client (and its gateway) and
+    vector repository.
+
+    Provider SDKs share one pooled HTTP client per provider (so the OpenAI
+    LLM and OpenAI embeddings reuse the same keep-alive connections), and
+    the repository caches its collection handles.
+    """
+
+    def __init__(self):
+        self._pools: Dict[str, Optional[HttpPool]] = {}
+        self.embeddings = get_embeddings(http=self.http_pool(settings.EMBEDDING_PROVIDER))
+        self.llm = get_llm(http=self.http_pool(settings.LLM_PROVIDER))
+        # Every chat-model call goes through here (see answer_node)
+        self.llm_gateway = LLMGateway.from_settings()
+        self.vector_repo = ChromaVectorRepository(
+            embeddings=self.embeddings,
+            persist_dir=settings.CHROMA_PERSIST_DIR if chroma_mode() == "persistent" else None,
+            client=ChromaClientFactory.from_settings(),
+            # Digests and lexical indexes are built from a collection's chunks
+            on_change=(digest_cache.invalidate, lexical_indexes.invalidate),
+        )
+
+    def http_pool(self, provider: str) -> Optional[HttpPool]:
+        """Return the provider's pooled HTTP client, creating it on first use."""
+        if provider not in self._pools:
+            self._pools[provider] = create_http_pool(provider)
+        return self._pools[provider]
+
+    async def aclose(self) -> None:
+        """Close the HTTP pools, the vector repository, the embedding cache and the state store."""
+        for provider, pool in self._pools.items():
+            if pool is not None:
+                await pool.aclose()
+                logger.info(f"Closed the {provider} HTTP connection pool")
+        self.vector_repo.close()
+        if settings.EMBEDDING_CACHE_ENABLED:
+            get_embedding_store().close()
+            get_embedding_store.cache_clear()
+        if get_state_store() is not None:
+            get_state_store().close()
+        get_state_store.cache_clear()
+
+
+_resources: Optional[AppResources] = None
+_resources_lock = threading.Lock()
+
+
+def get_resources() -> AppResources:
+    """Return the shared resources, creating them on first use (thread-safe)."""
+    global _resources
+    if _resources is None:
+        with _resources_lock:
+            if _resources is None:
+                _resources = AppResources()
+    return _resources
+
+
+async def close_resources() -> None:
+    """Close the shared resources (called from the FastAPI lifespan on shutdown)."""
+    global _resources
+    with _resources_lock:
+        resources, _resources = _resources, None
+    if resources is not None:
+        await resources.aclose()
@@ -1,9 +1,19 @@
-"""Factory for creating Chroma clients with or without persistence."""
+"""Factory for creating Chroma clients: in-memory, persistent or client/server."""
 
 import os
 from typing import Optional
 
 import chromadb
+from chromadb.config import Settings as ChromaSettings
+
+from app.core.config import settings
+
+
+def chroma_mode() -> str:
+    """The configured Chroma backend (CHROMA_MODE, or derived from IS_CHROMA_PERSISTENT)."""
+    if settings.CHROMA_MODE:
+        return settings.CHROMA_MODE
+    return "persistent" if settings.IS_CHROMA_PERSISTENT else "memory"
 
 
 class ChromaClientFactory:
@@ -23,3 +33,41 @@ class ChromaClientFactory:
             return chromadb.PersistentClient(path=persist_dir)
         else:
             return chromadb.Client()
+
+    @staticmethod
+    def create_http_client() -> chromadb.ClientAPI:
+        """
+        Create a client for a Chroma server (CHROMA_HOST / CHROMA_PORT).
+
+        Every API worker and container talks to the same server, so indexes
+        are shared and no worker holds embeddings in its own memory. Requests
+        go over a keep-alive connection pool bounded like the provider pools.
+        """
+        headers = {}
+        if settings.CHROMA_AUTH_TOKEN:
+            headers["Authorization"] = f"Bearer {settings.CHROMA_AUTH_TOKEN}"
+        return chromadb.HttpClient(
+            host=settings.CHROMA_HOST,
+            port=settings.CHROMA_PORT,
+            ssl=settings.CHROMA_SSL,
+            headers=headers or None,
+            settings=ChromaSettings(
+                anonymized_telemetry=False,
+                chroma_http_max_connections=settings.HTTP_MAX_CONNECTIONS,
+                chroma_http_max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                chroma_http_keepalive_secs=settings.HTTP_KEEPALIVE_EXPIRY_SECONDS,
+            ),
+        )
+
+    @classmethod
+    def from_settings(cls) -> chromadb.ClientAPI:
+        """Create the client for the configured CHROMA_MODE."""
+        mode = chroma_mode()
+        if mode == "http":
+            return cls.create_http_client()
+        elif mode == "persistent":
+            return cls.create_client(settings.CHROMA_PERSIST_DIR)
+        elif mode == "memory":
+            return cls.create_client()
+        else:
+            raise ValueError(f"Unsupported Chroma mode: {mode}")
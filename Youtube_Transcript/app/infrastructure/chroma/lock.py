@@ -0,0 +1,160 @@
+"""Cross-process lock kept on the Chroma backend, to coordinate index writes."""
+
+import logging
+import threading
+import time
+import uuid
+from typing import Optional
+
+import chromadb
+from chromadb.errors import NotFoundError
+
+
+logger = logging.getLogger(__name__)
+
+# Metadata keys of a lock marker collection
+HOLDER = "lock_holder"
+# When the lease was taken or last renewed
+ACQUIRED_AT = "lock_acquired_at"
+
+
+class LockCancelledError(RuntimeError):
+    """Raised by ChromaLock.acquire when its cancel event is set while waiting."""
+
+
+class ChromaLock:
+    """
+    A lease lock shared by every process that uses the same Chroma backend.
+
+    Creating a collection is atomic (creating an existing name fails), so the
+    lock is a marker collection: whoever creates it holds the lock and deletes
+    it to release. A holder that died leaves its marker behind; markers not
+    renewed for lease_seconds are taken over. While held, the lease is
+    renewed in the background every lease_seconds / 3, so a long rebuild
+    keeps it. Works across uvicorn workers and containers as long as they
+    share the Chroma server (or persist dir).
+
+    Setting the cancel event makes a waiting acquire() give up with
+    LockCancelledError (e.g. on shutdown).
+    """
+
+    def __init__(
+        self,
+        client: chromadb.ClientAPI,
+        name: str,
+        lease_seconds: float,
+        timeout_seconds: float,
+        poll_seconds: float = 0.25,
+        cancel: Optional[threading.Event] = None,
+    ):
+        self.client = client
+        self.name = name
+        self.lease_seconds = lease_seconds
+        self.timeout_seconds = timeout_seconds
+        self.poll_seconds = poll_seconds
+        self.cancel = cancel or threading.Event()
+        self.holder = uuid.uuid4().hex
+        self._released = threading.Event()
+        self._renewer: Optional[threading.Thread] = None
+
+    def _marker_metadata(self):
+        """The marker's metadata, or None if nobody holds the lock."""
+        try:
+            return self.client.get_collection(name=self.name).metadata or {}
+        except (NotFoundError, ValueError):
+            # Older chromadb versions raise ValueError for a missing collection
+            return None
+
+    def _try_create(self) -> bool:
+        try:
+            self.client.create_collection(
+                name=self.name,
+                metadata={HOLDER: self.holder, ACQUIRED_AT: time.time()},
+            )
+            return True
+        except Exception:
+            # Other errors than "already exists" (e.g. server down) surface from here
+            metadata = self._marker_metadata()
+            if metadata is not None and time.time() - metadata.get(ACQUIRED_AT, 0) > self.lease_seconds:
+                self._take_over(metadata)
+            return False
+
+    def _take_over(self, expired: dict) -> None:
+        """
+        Delete an expired marker, unless it changed since it was read.
+
+        Another waiter may have taken the lock over (new holder) or the
+        holder may have renewed it (new acquired_at) in the meantime;
+        deleting either would let two processes hold the lock.
+        """
+        current = self._marker_metadata()
+        if current is None or (current.get(HOLDER), current.get(ACQUIRED_AT)) != (
+            expired.get(HOLDER),
+            expired.get(ACQUIRED_AT),
+        ):
+            return
+        logger.warning(f"Taking over expired lock '{self.name}'")
+        self._delete()
+
+    def renew(self) -> bool:
+        """Extend the lease if this lock still holds it; return whether it does."""
+        try:
+            marker = self.client.get_collection(name=self.name)
+        except (NotFoundError, ValueError):
+            return False
+        if (marker.metadata or {}).get(HOLDER) != self.holder:
+            return False
+        marker.modify(metadata={HOLDER: self.holder, ACQUIRED_AT: time.time()})
+        return True
+
+    def _renew_until_released(self) -> None:
+        while not self._released.wait(self.lease_seconds / 3):
+            try:
+                if not self.renew():
+                    logger.warning(f"Lost lock '{self.name}' (taken over after its lease expired)")
+                    return
+            except Exception as e:
+                # A backend hiccup; the lease has two more renewals' worth of slack
+                logger.warning(f"Could not renew lock '{self.name}': {e}")
+
+    def _delete(self) -> None:
+        try:
+            self.client.delete_collection(name=self.name)
+        except Exception:
+            pass
+
+    def acquire(self) -> None:
+        """
+        Block until the lock is held and start renewing its lease.
+
+        Raises TimeoutError after timeout_seconds, or LockCancelledError as
+        soon as the cancel event is set.
+        """
+        deadline = time.monotonic() + self.timeout_seconds
+        while not self._try_create():
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Timed out waiting for lock '{self.name}'")
+            if self.cancel.wait(self.poll_seconds):
+                raise LockCancelledError(f"Gave up waiting for lock '{self.name}'")
+        self._released.clear()
+        self._renewer = threading.Thread(
+            target=self._renew_until_released, name=f"lease-{self.name}", daemon=True
+        )
+        self._renewer.start()
+
+    def release(self) -> None:
+        """Stop renewing the lease and delete the marker if this lock still holds it."""
+        self._released.set()
+        if self._renewer is not None:
+            self._renewer.join()
+            self._renewer = None
+        metadata = self._marker_metadata()
+        if metadata is not None and metadata.get(HOLDER) == self.holder:
+            self._delete()
+
+    def __enter__(self) -> "ChromaLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
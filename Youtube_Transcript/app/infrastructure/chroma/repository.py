@@ -1,11 +1,32 @@
 """Concrete VectorStore implementation backed by Chroma + LangChain."""
 
-from typing import Any, List, Optional
+import asyncio
+import threading
+import time
+import uuid
+import warnings
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 
+import chromadb
+from chromadb.errors import NotFoundError
 from langchain_chroma import Chroma
+from langchain_core.documents import Document
 
+from app.core.config import settings
 from app.core.interfaces.vector_store import VectorStore
+from app.core.observability import timed
 from app.infrastructure.chroma.client import ChromaClientFactory
+from app.infrastructure.chroma.lock import ChromaLock
+from app.infrastructure.vector_index.hot_index import HotIndexCache, QuantizedIndex
+
+
+# A collection's name is a stable pointer: its metadata names the collection
+# that currently holds the chunks, so a rebuilt index can be swapped in at once
+INDEX_TARGET = "index_target"
+# Set on the collections that hold chunks, naming the pointer they belong to
+INDEX_OF = "index_of"
+# Changed on the pointer whenever chunks are appended to the collection it names
+INDEX_REVISION = "index_revision"
 
 
 class ChromaVectorRepository(VectorStore):
@@ -15,60 +36,445 @@ class ChromaVectorRepository(VectorStore):
     This is used both for:
     - initial ingestion (saving all chunks)
     - retrieval via LangChain's Chroma wrapper.
+
+    Rebuilding a collection writes a new (shadow) collection and then points
+    the collection name at it in one metadata update, so readers see either
+    the old or the new index, never an empty or half-written one.
+
+    The LangChain wrapper of each collection is built once and reused by
+    later turns; it is dropped whenever the collection is swapped or deleted,
+    and rebuilt once the name is found (at most INDEX_REVALIDATE_SECONDS
+    later) to point at a collection swapped in by another process.
+    With HOT_INDEX_ENABLED, queried collections are also loaded into an
+    in-process quantized index that answers similarity searches.
+
+    on_change callbacks are called with a collection name whenever its
+    contents are rewritten, appended to or deleted, so caches derived from
+    them (digests, lexical indexes) can be dropped. Caches in other worker
+    processes compare index_version() instead, which changes on every
+    rewrite or append and is re-read every INDEX_REVALIDATE_SECONDS.
     """
 
-    def __init__(self, embeddings: Any, persist_dir: Optional[str] = None):
+    def __init__(
+        self,
+        embeddings: Any,
+        persist_dir: Optional[str] = None,
+        client: Optional[chromadb.ClientAPI] = None,
+        on_change: Sequence[Callable[[str], None]] = (),
+    ):
         self.embeddings = embeddings
         self.persist_dir = persist_dir
-        # Underlying low-level Chroma client (persistent or in-memory)
-        self.client = ChromaClientFactory.create_client(persist_dir)
-        self._vector_store = None
+        self.on_change = list(on_change)
+        # Underlying low-level Chroma client (persistent, in-memory or HTTP)
+        self.client = client or ChromaClientFactory.create_client(persist_dir)
+        # Collection name -> (LangChain wrapper, collection it was built on)
+        self._handles: Dict[str, Tuple[Chroma, str]] = {}
+        self._handles_lock = threading.Lock()
+        # Deletions waiting out INDEX_SWAP_GRACE_SECONDS; close() runs them at once
+        self._retirements: Dict[threading.Timer, Callable[[], None]] = {}
+        self._retirements_lock = threading.Lock()
+        self.hot_indexes: Optional[HotIndexCache] = None
+        if settings.HOT_INDEX_ENABLED:
+            self.hot_indexes = HotIndexCache(
+                max_collections=settings.HOT_INDEX_MAX_COLLECTIONS,
+                revalidate_seconds=settings.HOT_INDEX_REVALIDATE_SECONDS,
+                directory=settings.HOT_INDEX_DIR,
+            )
+        self._hot_build_lock = threading.Lock()
+        # Collection name -> (target collection, index version, when they were read)
+        self._versions: Dict[str, Tuple[str, str, float]] = {}
+        self._versions_lock = threading.Lock()
 
-    def clear_collection(self, collection_name: str) -> None:
-        """Delete a collection if it exists, logging failures instead of raising."""
+    def _forget_handle(self, collection_name: str) -> None:
+        with self._handles_lock:
+            self._handles.pop(collection_name, None)
+        with self._versions_lock:
+            self._versions.pop(collection_name, None)
+        if self.hot_indexes is not None:
+            self.hot_indexes.invalidate(collection_name)
+
+    def _changed(self, collection_name: str) -> None:
+        """Drop everything cached from a collection's previous contents."""
+        for callback in self.on_change:
+            callback(collection_name)
+        if self.hot_indexes is not None:
+            self.hot_indexes.invalidate(collection_name)
+
+    def _get(self, name: str):
+        """Return a Chroma collection, or None if it does not exist."""
+        try:
+            return self.client.get_collection(name=name)
+        except (NotFoundError, ValueError):
+            # Older chromadb versions raise ValueError for a missing collection
+            return None
+
+    def _target_name(self, collection_name: str) -> str:
+        """Name of the collection holding the chunks (the name itself for older indexes)."""
+        pointer = self._get(collection_name)
+        if pointer is None:
+            return collection_name
+        return (pointer.metadata or {}).get(INDEX_TARGET, collection_name)
+
+    def _read_version(self, collection_name: str) -> Tuple[str, str]:
+        """Read a name's target collection and index version from the backend and remember them."""
+        pointer = self._get(collection_name)
+        if pointer is None:
+            target, version = collection_name, ""
+        else:
+            metadata = pointer.metadata or {}
+            target = metadata.get(INDEX_TARGET, collection_name)
+            version = f"{target}-{metadata.get(INDEX_REVISION, 0)}"
+        with self._versions_lock:
+            self._versions[collection_name] = (target, version, time.monotonic())
+        return target, version
+
+    def _index_state(self, collection_name: str) -> Tuple[str, str]:
+        """(target collection, index version) of a name, re-read every INDEX_REVALIDATE_SECONDS."""
+        with self._versions_lock:
+            entry = self._versions.get(collection_name)
+        if entry is not None and time.monotonic() - entry[2] <= settings.INDEX_REVALIDATE_SECONDS:
+            return entry[0], entry[1]
+        return self._read_version(collection_name)
+
+    def index_version(self, collection_name: str) -> str:
+        """
+        Identity of a collection's current contents ("" if it does not exist).
+
+        It changes whenever the collection is rebuilt (by any process) or
+        appended to, so caches built from the chunks can be keyed by it. The
+        value is re-read from the backend at most every
+        INDEX_REVALIDATE_SECONDS; this process's own writes show at once.
+        """
+        return self._index_state(collection_name)[1]
+
+    def _appended(self, collection_name: str) -> None:
+        """Give a collection a new revision after chunks were appended to it."""
+        pointer = self._get(collection_name)
+        if pointer is not None:
+            pointer.modify(metadata={**(pointer.metadata or {}), INDEX_REVISION: uuid.uuid4().hex[:12]})
+        self._read_version(collection_name)
+
+    def _live(self, collection_name: str):
+        """The collection holding a name's chunks, or None if it was never indexed."""
+        return self._get(self._target_name(collection_name))
+
+    def _delete(self, name: str) -> None:
         try:
-            self.client.delete_collection(name=collection_name)
-            print(f"Collection '{collection_name}' deleted successfully")
+            self.client.delete_collection(name=name)
         except Exception as e:
-            print(f"Collection '{collection_name}' does not exist or error deleting: {e}")
+            print(f"Collection '{name}' does not exist or error deleting: {e}")
+
+    def _retire(self, name: str) -> None:
+        """Delete a swapped-out collection unless it is already gone (e.g. cleared)."""
+        try:
+            self.client.delete_collection(name=name)
+        except Exception:
+            pass
+
+    def _delete_chunks(self, collection_name: str, ids: List[str]) -> None:
+        """Delete chunks by ID from a collection, unless it is already gone."""
+        collection = self._get(collection_name)
+        if collection is None:
+            return
+        batch_size = self.client.get_max_batch_size()
+        for start in range(0, len(ids), batch_size):
+            collection.delete(ids=ids[start:start + batch_size])
+
+    def _retire_later(self, delay: float, action: Callable[..., None], *args: Any) -> None:
+        """Run a cleanup after delay seconds, or when the repository is closed if that comes first."""
+        def run() -> None:
+            # Unless close() already ran it
+            with self._retirements_lock:
+                pending = self._retirements.pop(timer, None)
+            if pending is not None:
+                pending()
+
+        timer = threading.Timer(delay, run)
+        timer.daemon = True
+        with self._retirements_lock:
+            self._retirements[timer] = lambda: action(*args)
+        timer.start()
+
+    def clear_collection(self, collection_name: str) -> None:
+        """Delete a collection (and the index it points to), logging failures instead of raising."""
+        # Anything built from the old contents is now stale
+        self._changed(collection_name)
+        self._forget_handle(collection_name)
+        # The indexes it points to (live or pending deletion), then the name itself
+        self._drop_orphans(collection_name, keep=None)
+        self._delete(collection_name)
+        print(f"Collection '{collection_name}' deleted")
 
     def save(
         self,
         documents: List[Any],
         collection_name: str,
         clear_existing: bool = True,
+        collection_metadata: Optional[Dict[str, Any]] = None,
+        vectors: Optional[List[List[float]]] = None,
+        ids: Optional[List[str]] = None,
     ) -> None:
         """
-        Create (or recreate) a collection from a list of documents.
+        Create (or rebuild) a collection from a list of documents.
 
-        If clear_existing=True, any existing collection with the same name is
-        dropped before building a new one.
+        If clear_existing=True, the documents replace the collection's
+        contents: they are written to a shadow collection which then becomes
+        the live one, and the previous one is deleted. Otherwise they are
+        appended to the live collection. The on_change callbacks run either
+        way since its contents change.
+        collection_metadata is stored on the collection itself (e.g. ingest
+        cache bookkeeping) so it survives restarts in persistent mode.
+        When vectors are given (one per document, computed ahead of time),
+        they are written as-is and the embeddings client is not called.
+        ids (e.g. content hashes) default to random UUIDs.
         """
-        if clear_existing:
-            self.clear_collection(collection_name)
-
-        kwargs = {
-            "documents": documents,
-            "embedding": self.embeddings,
-            "collection_name": collection_name,
-            "client": self.client,
-        }
+        self._changed(collection_name)
+        if vectors is None:
+            vectors = self.embeddings.embed_documents([doc.page_content for doc in documents])
+        if ids is None:
+            ids = [str(uuid.uuid4()) for _ in documents]
+
+        if not clear_existing:
+            collection = self._live(collection_name) or self.client.create_collection(
+                name=collection_name,
+                embedding_function=None,
+                metadata=collection_metadata or None,
+            )
+            self._add(collection, documents, vectors, ids)
+            self._appended(collection_name)
+            return
+        self._swap(collection_name, documents, vectors, ids, collection_metadata)
+
+    def _add(self, collection, documents: List[Any], vectors: List[List[float]], ids: List[str]) -> None:
+        """Write pre-embedded documents straight into a Chroma collection."""
+        batch_size = self.client.get_max_batch_size()
+        for start in range(0, len(documents), batch_size):
+            batch = documents[start:start + batch_size]
+            collection.add(
+                ids=ids[start:start + batch_size],
+                embeddings=vectors[start:start + batch_size],
+                documents=[doc.page_content for doc in batch],
+                metadatas=[doc.metadata or None for doc in batch],
+            )
+
+    def _swap(
+        self,
+        collection_name: str,
+        documents: List[Any],
+        vectors: List[List[float]],
+        ids: List[str],
+        collection_metadata: Optional[Dict[str, Any]],
+    ) -> None:
+        """Build a shadow collection, point collection_name at it and drop the old one."""
+        previous = self._target_name(collection_name)
+        self._drop_orphans(collection_name, keep=previous)
+
+        shadow_name = f"{collection_name}_{uuid.uuid4().hex[:12]}"
+        shadow = self.client.create_collection(
+            name=shadow_name,
+            embedding_function=None,
+            metadata={INDEX_OF: collection_name},
+        )
+        self._add(shadow, documents, vectors, ids)
+
+        # The switch: one metadata write, seen by every reader of the name
+        pointer = self.client.get_or_create_collection(name=collection_name, embedding_function=None)
+        pointer.modify(metadata={**(collection_metadata or {}), INDEX_TARGET: shadow_name})
+        self._forget_handle(collection_name)
+
+        # Readers still holding the old collection re-resolve the name on
+        # NotFound once it is gone; queries already running get to finish
+        if previous != collection_name:
+            self._retire_later(settings.INDEX_SWAP_GRACE_SECONDS, self._retire, previous)
+        else:
+            # An index from before pointers existed: its chunks sit on the name
+            # itself, which other workers keep querying (and would find empty,
+            # not gone) until they revalidate the name
+            stale_ids = pointer.get(include=[])["ids"]
+            delay = settings.INDEX_REVALIDATE_SECONDS + settings.INDEX_SWAP_GRACE_SECONDS
+            self._retire_later(delay, self._delete_chunks, collection_name, stale_ids)
 
-        # When a persistent directory is configured, also persist via LangChain
-        if self.persist_dir:
-            kwargs["persist_directory"] = self.persist_dir
+    def _drop_orphans(self, collection_name: str, keep: Optional[str]) -> None:
+        """Delete this name's collections other than keep (interrupted rebuilds, swaps not yet cleaned up)."""
+        for collection in self.client.list_collections():
+            if (
+                collection.name.startswith(f"{collection_name}_")
+                and collection.name != keep
+                and (collection.metadata or {}).get(INDEX_OF) == collection_name
+            ):
+                self._delete(collection.name)
 
-        self._vector_store = Chroma.from_documents(**kwargs)
+    def get_chunk_ids(self, collection_name: str) -> List[str]:
+        """IDs of the chunks currently indexed under a collection name (empty if none)."""
+        collection = self._live(collection_name)
+        return collection.get(include=[])["ids"] if collection is not None else []
+
+    def get_vectors(self, collection_name: str, ids: List[str]) -> Dict[str, List[float]]:
+        """Stored embeddings of the given chunk IDs (missing IDs are omitted)."""
+        collection = self._live(collection_name)
+        if collection is None or not ids:
+            return {}
+        found: Dict[str, List[float]] = {}
+        batch_size = self.client.get_max_batch_size()
+        for start in range(0, len(ids), batch_size):
+            result = collection.get(ids=ids[start:start + batch_size], include=["embeddings"])
+            for chunk_id, vector in zip(result["ids"], result["embeddings"]):
+                found[chunk_id] = [float(value) for value in vector]
+        return found
+
+    def get_chunks(self, collection_name: str) -> Tuple[List[Document], List[List[float]]]:
+        """Every chunk of a collection with its stored embedding, in one read."""
+        collection = self._live(collection_name)
+        if collection is None:
+            return [], []
+        with timed("chroma_get"):
+            result = collection.get(include=["documents", "metadatas", "embeddings"])
+        documents = [
+            Document(id=chunk_id, page_content=text, metadata=metadata or {})
+            for chunk_id, text, metadata in zip(result["ids"], result["documents"], result["metadatas"])
+        ]
+        return documents, [list(vector) for vector in result["embeddings"]]
+
+    def _hot_index(self, collection_name: str) -> Optional[QuantizedIndex]:
+        """Load (or revalidate) a collection's in-process index; None if it has no chunks."""
+        with self._hot_build_lock:
+            # Read the version before the chunks: a change in between only causes a rebuild
+            _, version = self._read_version(collection_name)
+            index = self.hot_indexes.peek(collection_name)
+            if index is None or index.target != version:
+                documents, vectors = self.get_chunks(collection_name)
+                if not documents:
+                    return None
+                with timed("hot_index_build"):
+                    index = QuantizedIndex(
+                        documents,
+                        vectors,
+                        target=version,
+                        dtype=settings.HOT_INDEX_DTYPE,
+                        flat_max=settings.HOT_INDEX_FLAT_MAX,
+                        nprobe=settings.HOT_INDEX_NPROBE,
+                        directory=settings.HOT_INDEX_DIR,
+                    )
+            self.hot_indexes.put(collection_name, index)
+            return index
+
+    async def asimilarity_search(self, collection_name: str, query: str, k: int) -> List[Tuple[Document, float]]:
+        """
+        The k chunks most relevant to query, with relevance scores, best first.
+
+        Served by the collection's in-process index when hot indexes are
+        enabled, otherwise by the LangChain Chroma wrapper.
+        """
+        if self.hot_indexes is not None:
+            index = self.hot_indexes.get(collection_name)
+            if index is None:
+                index = await asyncio.to_thread(self._hot_index, collection_name)
+            if index is not None:
+                vector = await self.embeddings.aembed_query(query)
+                return index.search(vector, k)
+        vector_store = self.get_vector_store(collection_name)
+        with warnings.catch_warnings():
+            # Relevance scores are only compared with a calibrated threshold, so
+            # models whose unnormalized embeddings fall outside 0..1 need not warn
+            # (with every matching document in the message) on each query
+            warnings.filterwarnings("ignore", message="Relevance scores must be between 0 and 1")
+            return await vector_store.asimilarity_search_with_relevance_scores(query, k=k)
 
     def get_vector_store(self, collection_name: str) -> Chroma:
-        """Return a LangChain Chroma instance for the given collection."""
-        return Chroma(
-            client=self.client,
-            collection_name=collection_name,
-            embedding_function=self.embeddings,
+        """
+        Return the (cached) LangChain Chroma instance for the given collection.
+
+        The handle is rebuilt once the name points at another collection,
+        which another process notices within INDEX_REVALIDATE_SECONDS.
+        """
+        target, _ = self._index_state(collection_name)
+        with self._handles_lock:
+            entry = self._handles.get(collection_name)
+            if entry is None or entry[1] != target:
+                entry = self._handles[collection_name] = (
+                    Chroma(client=self.client, collection_name=target, embedding_function=self.embeddings),
+                    target,
+                )
+        return entry[0]
+
+    def refresh_vector_store(self, collection_name: str) -> Chroma:
+        """
+        Rebuild a collection's cached handle and return it.
+
+        Needed when another process rebuilt (swapped) or deleted the collection,
+        which leaves the cached handle pointing at a collection that is gone.
+        """
+        self._forget_handle(collection_name)
+        return self.get_vector_store(collection_name)
+
+    def write_lock(
+        self,
+        collection_name: str,
+        cancel: Optional[threading.Event] = None,
+        timeout_seconds: Optional[float] = None,
+    ) -> ChromaLock:
+        """
+        Lock for rebuilding a collection, held across every process on this backend.
+
+        Keeps concurrent ingests of one video (e.g. /init on two workers) from
+        deleting and rewriting the same collection at the same time, and the
+        ingest cache from evicting it meanwhile. Setting cancel stops waiting
+        for it; timeout_seconds defaults to INGEST_LOCK_TIMEOUT_SECONDS.
+        """
+        return ChromaLock(
+            self.client,
+            f"{collection_name}_lock",
+            lease_seconds=settings.INGEST_LOCK_LEASE_SECONDS,
+            timeout_seconds=settings.INGEST_LOCK_TIMEOUT_SECONDS if timeout_seconds is None else timeout_seconds,
+            cancel=cancel,
         )
 
     def add_documents(self, documents: List[Any], collection_name: str) -> None:
         """Append additional documents to an existing collection."""
+        self._changed(collection_name)
         vector_store = self.get_vector_store(collection_name)
         vector_store.add_documents(documents)
+        self._appended(collection_name)
+
+    def list_collections(self) -> List[str]:
+        """Return the names of all collections in the backend."""
+        return [collection.name for collection in self.client.list_collections()]
+
+    def get_collection_metadata(self, collection_name: str) -> Optional[Dict[str, Any]]:
+        """Return a collection's metadata, or None if the collection does not exist."""
+        collection = self._get(collection_name)
+        if collection is None:
+            return None
+        metadata = dict(collection.metadata or {})
+        metadata.pop(INDEX_TARGET, None)
+        metadata.pop(INDEX_REVISION, None)
+        return metadata
+
+    def update_collection_metadata(self, collection_name: str, metadata: Dict[str, Any]) -> None:
+        """Replace a collection's metadata without touching its documents (or its index)."""
+        collection = self.client.get_collection(name=collection_name)
+        # The index bookkeeping is kept, so the index version does not change
+        index_keys = {
+            key: value
+            for key, value in (collection.metadata or {}).items()
+            if key in (INDEX_TARGET, INDEX_REVISION)
+        }
+        collection.modify(metadata={**metadata, **index_keys})
+
+    def close(self) -> None:
+        """
+        Finish pending cleanups, drop the cached collection handles and release the Chroma client.
+
+        Swapped-out collections still waiting out their grace period are
+        deleted now; a CLI process would otherwise exit before their timers fire.
+        """
+        with self._retirements_lock:
+            retirements, self._retirements = self._retirements, {}
+        for timer, action in retirements.items():
+            timer.cancel()
+            action()
+        with self._handles_lock:
+            self._handles.clear()
+        # Older chromadb clients have no close()
+        if hasattr(self.client, "close"):
+            self.client.close()
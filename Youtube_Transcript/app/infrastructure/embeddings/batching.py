@@ -0,0 +1,79 @@
+"""Dynamic micro-batching of concurrent query embeddings."""
+
+import asyncio
+from typing import List, Optional, Set, Tuple
+
+from langchain_core.embeddings import Embeddings
+
+
+class MicroBatchingEmbeddings(Embeddings):
+    """
+    Coalesces concurrent aembed_query calls into single batched model calls.
+
+    The first query to arrive opens a short window (window_ms); every query
+    arriving within it, up to max_batch, is embedded together in one worker
+    thread call. For a local model this turns N simultaneous /message
+    requests into one inference instead of N.
+    """
+
+    def __init__(self, embeddings: Embeddings, window_ms: float = 5.0, max_batch: int = 32):
+        self.embeddings = embeddings
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # The event loop only keeps weak references to tasks: hold running batches here
+        self._tasks: Set[asyncio.Task] = set()
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """Embed several queries in one model call when the wrapped model supports it."""
+        if hasattr(self.embeddings, "embed_queries"):
+            return self.embeddings.embed_queries(texts)
+        return [self.embeddings.embed_query(text) for text in texts]
+
+    # Synchronous calls and document batches go straight to the wrapped model
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embeddings.embed_query(text)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await asyncio.to_thread(self.embeddings.embed_documents, texts)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # First call, or a new event loop (e.g. tests): start from scratch
+            self._loop, self._pending, self._flush_handle, self._tasks = loop, [], None, set()
+
+        future = loop.create_future()
+        self._pending.append((text, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = self._loop.create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        try:
+            vectors = await asyncio.to_thread(self.embed_queries, [text for text, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), vector in zip(batch, vectors):
+            if not future.done():
+                future.set_result(vector)
@@ -0,0 +1,174 @@
+"""Caching, batching embeddings wrapper used in front of every provider."""
+
+import asyncio
+import hashlib
+import logging
+import random
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+from langchain_core.embeddings import Embeddings
+
+from app.core.observability import count_cache, timed
+from app.infrastructure.embeddings.store import SQLiteEmbeddingStore
+
+
+logger = logging.getLogger(__name__)
+
+
+def _hash(kind: str, text: str) -> str:
+    # Queries and documents are cached apart: some providers embed them differently
+    return hashlib.sha256(f"{kind}:{text}".encode("utf-8")).hexdigest()
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    LangChain Embeddings that only calls the wrapped provider for cache misses.
+
+    - vectors are persisted in a SQLiteEmbeddingStore keyed by (model, text hash)
+    - duplicate texts within a call are embedded once
+    - misses are sent in batches of batch_size, at most max_concurrency at a
+      time, each retried with jittered exponential backoff
+    - a batch of queries is one provider call: embed_queries() when the
+      provider has it (local models), embed_documents() when
+      symmetric_queries says queries are embedded like documents
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        store: SQLiteEmbeddingStore,
+        model_key: str,
+        batch_size: int = 64,
+        max_concurrency: int = 4,
+        max_retries: int = 3,
+        symmetric_queries: bool = False,
+    ):
+        self.embeddings = embeddings
+        self.store = store
+        self.model_key = model_key
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.symmetric_queries = symmetric_queries
+
+    # ----- helpers -------------------------------------------------------
+
+    def _split_misses(self, kind: str, texts: List[str]):
+        """Return (hashes per text, cached vectors, unique missing texts by hash)."""
+        hashes = [_hash(kind, text) for text in texts]
+        cached = self.store.get_many(self.model_key, hashes)
+        missing: Dict[str, str] = {}
+        for text_hash, text in zip(hashes, texts):
+            if text_hash not in cached:
+                missing.setdefault(text_hash, text)
+        count_cache("embedding", hits=len(cached), misses=len(missing))
+        return hashes, cached, missing
+
+    def _batches(self, missing: Dict[str, str]) -> List[List[str]]:
+        keys = list(missing)
+        return [keys[i:i + self.batch_size] for i in range(0, len(keys), self.batch_size)]
+
+    def _backoff(self, attempt: int) -> float:
+        return min(30.0, 2 ** attempt) * (0.5 + random.random() / 2)
+
+    def _embed_queries(self, texts: List[str]) -> List[List[float]]:
+        if len(texts) > 1 and hasattr(self.embeddings, "embed_queries"):
+            return self.embeddings.embed_queries(texts)
+        if self.symmetric_queries:
+            return self.embeddings.embed_documents(texts)
+        return [self.embeddings.embed_query(text) for text in texts]
+
+    async def _aembed_queries(self, texts: List[str]) -> List[List[float]]:
+        # A single query goes through aembed_query, which a micro-batcher coalesces across requests
+        if len(texts) > 1 and hasattr(self.embeddings, "embed_queries"):
+            return await asyncio.to_thread(self.embeddings.embed_queries, texts)
+        if len(texts) > 1 and self.symmetric_queries:
+            return await self.embeddings.aembed_documents(texts)
+        # Providers may embed queries differently from documents
+        return list(await asyncio.gather(*(self.embeddings.aembed_query(text) for text in texts)))
+
+    def _embed_batch(self, kind: str, texts: List[str]) -> List[List[float]]:
+        for attempt in range(self.max_retries + 1):
+            try:
+                with timed("embedding_request"):
+                    if kind == "query":
+                        return self._embed_queries(texts)
+                    return self.embeddings.embed_documents(texts)
+            except Exception as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+                logger.warning(f"Embedding batch failed ({e}); retrying in {delay:.1f}s")
+                time.sleep(delay)
+
+    async def _aembed_batch(self, kind: str, texts: List[str]) -> List[List[float]]:
+        for attempt in range(self.max_retries + 1):
+            try:
+                with timed("embedding_request"):
+                    if kind == "query":
+                        return await self._aembed_queries(texts)
+                    return await self.embeddings.aembed_documents(texts)
+            except Exception as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+                logger.warning(f"Embedding batch failed ({e}); retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    def _store_results(self, batches, results, cached) -> None:
+        computed = []
+        for keys, vectors in zip(batches, results):
+            # Round to float32 now so fresh and cached results are identical
+            computed.extend((key, array("f", vector).tolist()) for key, vector in zip(keys, vectors))
+        self.store.put_many(self.model_key, computed)
+        cached.update(computed)
+
+    # ----- sync API ------------------------------------------------------
+
+    def _embed(self, kind: str, texts: List[str]) -> List[List[float]]:
+        hashes, cached, missing = self._split_misses(kind, texts)
+        if missing:
+            batches = self._batches(missing)
+            batch_texts = [[missing[key] for key in keys] for keys in batches]
+            if len(batches) == 1:
+                results = [self._embed_batch(kind, batch_texts[0])]
+            else:
+                with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+                    results = list(pool.map(lambda batch: self._embed_batch(kind, batch), batch_texts))
+            self._store_results(batches, results, cached)
+        return [cached[text_hash] for text_hash in hashes]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._embed("document", texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed("query", [text])[0]
+
+    # ----- async API -----------------------------------------------------
+
+    async def _aembed(self, kind: str, texts: List[str]) -> List[List[float]]:
+        hashes, cached, missing = self._split_misses(kind, texts)
+        if missing:
+            batches = self._batches(missing)
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+
+            async def run(keys: List[str]) -> List[List[float]]:
+                async with semaphore:
+                    return await self._aembed_batch(kind, [missing[key] for key in keys])
+
+            results = await asyncio.gather(*(run(keys) for keys in batches))
+            self._store_results(batches, results, cached)
+        return [cached[text_hash] for text_hash in hashes]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await self._aembed("document", texts)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return (await self._aembed("query", [text]))[0]
+
+    async def aembed_queries(self, texts: List[str]) -> List[List[float]]:
+        """Embed many queries at once: cached ones are skipped, the rest go out in as few provider calls as it allows."""
+        return await self._aembed("query", texts)
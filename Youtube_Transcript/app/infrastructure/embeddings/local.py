@@ -0,0 +1,47 @@
+"""Local CPU embeddings backed by ONNX Runtime (via fastembed).
+
+fastembed ships ONNX exports (several of them int8-quantized) of common
+embedding models such as BAAI/bge-small-en-v1.5, so embeddings are computed
+in-process without any network round-trip or provider rate limit.
+"""
+
+from typing import List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+
+class LocalOnnxEmbeddings(Embeddings):
+    """LangChain Embeddings running a fastembed ONNX model on the CPU."""
+
+    def __init__(
+        self,
+        model_name: str,
+        threads: Optional[int] = None,
+        batch_size: int = 64,
+        cache_dir: Optional[str] = None,
+    ):
+        try:
+            from fastembed import TextEmbedding
+        except ImportError as e:
+            raise ImportError(
+                "EMBEDDING_PROVIDER=local requires the 'fastembed' package "
+                "(pip install fastembed)"
+            ) from e
+
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.model = TextEmbedding(model_name=model_name, threads=threads, cache_dir=cache_dir)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [vector.tolist() for vector in self.model.embed(texts, batch_size=self.batch_size)]
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """Embed several queries in one ONNX batch (models may prefix queries)."""
+        return [vector.tolist() for vector in self.model.query_embed(texts)]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_queries([text])[0]
+
+    def warmup(self) -> None:
+        """Run one tiny inference so the first real request pays no init cost."""
+        self.embed_documents(["warmup"])
@@ -0,0 +1,57 @@
+"""Deterministic offline embeddings for benchmarks and local development."""
+
+import asyncio
+import hashlib
+import re
+import time
+from typing import List
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+# Function words carry no topic, so they are left out of the vectors
+_STOPWORDS = frozenset(
+    "a an and are about at be but by can do does for from have how i in is it me "
+    "of on or say so that the then there this to us was we what when where which "
+    "who why will with you video".split()
+)
+
+
+class FakeHashingEmbeddings(Embeddings):
+    """
+    Feature-hashed set-of-words vectors (stopwords dropped), L2-normalized.
+
+    Texts sharing content words get similar vectors, so retrieval, reranking
+    and the relevance gate behave plausibly without a model. latency_ms is
+    slept once per call to simulate a provider round-trip.
+    """
+
+    def __init__(self, size: int = 384, latency_ms: float = 0.0):
+        self.size = size
+        self.latency_ms = latency_ms
+
+    def _vector(self, text: str) -> List[float]:
+        vector = np.zeros(self.size, dtype=np.float32)
+        for word in set(_WORD_RE.findall(text.lower())) - _STOPWORDS:
+            digest = hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], "little") % self.size
+            vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        time.sleep(self.latency_ms / 1000)
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        await asyncio.sleep(self.latency_ms / 1000)
+        return [self._vector(text) for text in texts]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return (await self.aembed_documents([text]))[0]
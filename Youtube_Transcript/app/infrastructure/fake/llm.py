@@ -0,0 +1,105 @@
+"""Deterministic offline chat model for benchmarks and local development."""
+
+import asyncio
+import time
+from typing import Any, AsyncIterator, Iterator, List, Optional, Set
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import PrivateAttr
+
+
+class FakeStreamingChatModel(BaseChatModel):
+    """
+    Answers with the opening words of the retrieved context, token by token.
+
+    first_token_latency_ms and token_latency_ms simulate a provider's time to
+    first token and generation speed, so latency work can be measured
+    without an API key. Token usage is reported like a real provider would,
+    including prompt cache reads of a repeated system prefix.
+    """
+
+    answer_tokens: int = 40
+    first_token_latency_ms: float = 0.0
+    token_latency_ms: float = 0.0
+    _prefixes: Set[str] = PrivateAttr(default_factory=set)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-streaming-chat-model"
+
+    def _tokens(self, messages: List[BaseMessage]) -> List[str]:
+        # The retrieved context comes with the question, in the last message
+        prompt = str(messages[-1].content) if messages else ""
+        _, _, context = prompt.partition("RETRIEVED CONTEXT")
+        words = (context or prompt).split()[1:self.answer_tokens + 1] or ["I", "don't", "know."]
+        return [f"{word} " for word in words]
+
+    def _usage(self, messages: List[BaseMessage], tokens: List[str]) -> dict:
+        prompt_words = sum(len(str(message.content).split()) for message in messages)
+        usage = {
+            "input_tokens": prompt_words,
+            "output_tokens": len(tokens),
+            "total_tokens": prompt_words + len(tokens),
+        }
+        if len(messages) > 1:
+            # Like a provider prompt cache: a repeated system prefix is read from cache
+            prefix = str(messages[0].content)
+            kind = "cache_read" if prefix in self._prefixes else "cache_creation"
+            self._prefixes.add(prefix)
+            usage["input_token_details"] = {kind: len(prefix.split())}
+        return usage
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        tokens = self._tokens(messages)
+        time.sleep((self.first_token_latency_ms + self.token_latency_ms * len(tokens)) / 1000)
+        message = AIMessage(content="".join(tokens).strip(), usage_metadata=self._usage(messages, tokens))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _chunks(self, messages: List[BaseMessage]) -> Iterator[ChatGenerationChunk]:
+        tokens = self._tokens(messages)
+        for position, token in enumerate(tokens):
+            last = position == len(tokens) - 1
+            yield ChatGenerationChunk(message=AIMessageChunk(
+                content=token.strip() if last else token,
+                # Usage arrives with the final chunk, as with OpenAI's stream_usage
+                usage_metadata=self._usage(messages, tokens) if last else None,
+            ))
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        time.sleep(self.first_token_latency_ms / 1000)
+        for position, chunk in enumerate(self._chunks(messages)):
+            if position:
+                time.sleep(self.token_latency_ms / 1000)
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        await asyncio.sleep(self.first_token_latency_ms / 1000)
+        for position, chunk in enumerate(self._chunks(messages)):
+            if position:
+                await asyncio.sleep(self.token_latency_ms / 1000)
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
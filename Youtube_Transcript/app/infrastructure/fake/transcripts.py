@@ -0,0 +1,35 @@
+"""Synthetic caption segments, so ingestion can run without YouTube."""
+
+import hashlib
+import random
+from typing import Dict, Iterator, List
+
+_SYLLABLES = ["ka", "lo", "mi", "ra", "te", "su", "no", "vi", "da", "pe", "zu", "ho", "ri", "ma", "ne", "to"]
+_COMMON_WORDS = ["the", "and", "we", "this", "is", "so", "then", "you", "it", "of", "to", "in", "that", "now"]
+
+
+def _rng(video_id: str) -> random.Random:
+    return random.Random(int(hashlib.sha256(video_id.encode("utf-8")).hexdigest()[:16], 16))
+
+
+def topic_words(video_id: str, count: int = 60) -> List[str]:
+    """The made-up vocabulary a synthetic video talks about."""
+    rng = _rng(f"vocabulary:{video_id}")
+    return ["".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 4))) for _ in range(count)]
+
+
+def synthetic_segments(video_id: str, segments: int = 400) -> Iterator[Dict]:
+    """
+    Deterministic caption segments for a video ID (3 seconds each).
+
+    Every video mixes filler words with its own topic vocabulary, so questions
+    built from topic_words(video_id) are on topic and retrievable.
+    """
+    rng = _rng(video_id)
+    vocabulary = topic_words(video_id)
+    for position in range(segments):
+        words = [
+            rng.choice(vocabulary) if rng.random() < 0.5 else rng.choice(_COMMON_WORDS)
+            for _ in range(rng.randint(8, 14))
+        ]
+        yield {"text": " ".join(words), "start": position * 3.0, "duration": 3.0}
@@ -0,0 +1,55 @@
+"""Pooled HTTP clients shared by the provider SDKs."""
+
+import importlib
+from types import ModuleType
+from typing import Type
+
+import httpx
+
+from app.core.config import settings
+
+
+def http_module(client_cls: Type) -> ModuleType:
+    """Return the httpx-compatible package a client class is built on (httpx or httpx2)."""
+    for base in client_cls.__mro__:
+        package = base.__module__.split(".")[0]
+        if package.startswith("httpx"):
+            return importlib.import_module(package)
+    return httpx
+
+
+def connection_limits(module: ModuleType = httpx):
+    """Keep-alive and connection limits from the settings, as `module`.Limits."""
+    return module.Limits(
+        max_connections=settings.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY_SECONDS,
+    )
+
+
+class HttpPool:
+    """
+    A sync and an async HTTP client with keep-alive and a connection limit.
+
+    One pool is shared by every client of a provider (e.g. the OpenAI chat
+    model and OpenAI embeddings), so requests reuse warm connections instead
+    of opening new ones, and the provider never sees more than
+    HTTP_MAX_CONNECTIONS concurrent connections from this process.
+
+    Pass the provider SDK's own client classes (e.g. openai.DefaultHttpxClient)
+    so the SDK's defaults and HTTP package are kept.
+    """
+
+    def __init__(self, client_cls: Type = httpx.Client, async_client_cls: Type = httpx.AsyncClient):
+        module = http_module(client_cls)
+        kwargs = {
+            "limits": connection_limits(module),
+            "timeout": module.Timeout(settings.HTTP_TIMEOUT_SECONDS),
+        }
+        self.client = client_cls(**kwargs)
+        self.async_client = async_client_cls(**kwargs)
+
+    async def aclose(self) -> None:
+        """Close every pooled connection."""
+        self.client.close()
+        await self.async_client.aclose()
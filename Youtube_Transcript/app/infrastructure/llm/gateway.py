@@ -0,0 +1,285 @@
+"""Gateway in front of the chat model: coalescing, concurrency and rate limits.
+
+Every answer_node call goes through the app-scoped gateway instead of calling
+the provider directly, so a burst of /message requests is shaped before it
+reaches the provider rather than turning into 429s and retries.
+"""
+
+import asyncio
+import hashlib
+import heapq
+import itertools
+import logging
+import time
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
+
+from app.core.config import settings
+from app.core.observability import LLM_GATEWAY_REQUESTS, LLM_GATEWAY_WAITING, observe
+
+
+logger = logging.getLogger(__name__)
+
+# Lower runs first: interactive turns ahead of batch work
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 10
+
+# Priority of the LLM calls made by the current request (or task)
+llm_priority: ContextVar[int] = ContextVar("llm_priority", default=PRIORITY_INTERACTIVE)
+
+
+class LLMOverloadedError(RuntimeError):
+    """Raised when the LLM queue is full or a call waited too long for a slot."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def coalesce_key(video_ids: Iterable[str], prompt: str) -> str:
+    """Key under which identical in-flight calls (same videos, same prompt) are shared."""
+    raw = "|".join([*sorted(video_ids), prompt])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class TokenBucket:
+    """Requests-per-minute limiter: refills continuously and holds at most `burst` requests."""
+
+    def __init__(self, per_minute: float, burst: int):
+        self.rate = per_minute / 60.0
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+
+    async def take(self) -> None:
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class PrioritySlots:
+    """
+    A semaphore whose waiters are admitted by priority, then arrival order.
+
+    At most max_waiting callers queue for a slot; beyond that (or after
+    timeout seconds in the queue) acquire() fails fast with LLMOverloadedError.
+    """
+
+    def __init__(self, limit: int, max_waiting: int, timeout: float):
+        self.limit = limit
+        self.max_waiting = max_waiting
+        self.timeout = timeout
+        self.active = 0
+        self._waiters: List[tuple] = []
+        self._order = itertools.count()
+
+    @property
+    def waiting(self) -> int:
+        return sum(1 for *_, future in self._waiters if not future.done())
+
+    def check(self) -> None:
+        """Fail fast if a new call could not even queue for a slot."""
+        if self.active >= self.limit and self.waiting >= self.max_waiting:
+            raise LLMOverloadedError("LLM queue is full, retry later", retry_after=self.timeout)
+
+    async def acquire(self, priority: int) -> None:
+        if self.active < self.limit and not self.waiting:
+            self.active += 1
+            return
+        self.check()
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._order), future))
+        LLM_GATEWAY_WAITING.inc()
+        try:
+            # release() hands its slot over by resolving the future
+            await asyncio.wait_for(asyncio.shield(future), self.timeout)
+        except asyncio.TimeoutError:
+            if not future.done():
+                future.cancel()
+                raise LLMOverloadedError(
+                    f"Waited {self.timeout:.0f}s for an LLM slot, retry later",
+                    retry_after=self.timeout,
+                )
+        except asyncio.CancelledError:
+            # Cancelled after being handed a slot: pass it on
+            if not future.cancel():
+                self.release()
+            raise
+        finally:
+            LLM_GATEWAY_WAITING.dec()
+
+    def release(self) -> None:
+        while self._waiters:
+            *_, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self.active -= 1
+
+
+class _Flight:
+    """One provider call and the chunks it has produced so far, shared by its subscribers."""
+
+    def __init__(self):
+        self.chunks: List[Any] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.subscribers = 0
+        self.task: Optional[asyncio.Task] = None
+        self._event = asyncio.Event()
+
+    def notify(self) -> None:
+        event, self._event = self._event, asyncio.Event()
+        event.set()
+
+    async def follow(self) -> AsyncIterator[Any]:
+        position = 0
+        while True:
+            event = self._event
+            while position < len(self.chunks):
+                yield self.chunks[position]
+                position += 1
+            if self.done:
+                if self.error is not None:
+                    raise self.error
+                return
+            await event.wait()
+
+
+class LLMStream:
+    """
+    Chunks of one gateway call; iterate it like llm.astream().
+
+    shared is True when the call was coalesced into another request's
+    in-flight call, i.e. no provider tokens were spent on it.
+    """
+
+    def __init__(self, gateway: "LLMGateway", llm: Any, prompt: Any, key: Optional[str], options: dict):
+        self.gateway = gateway
+        self.llm = llm
+        self.prompt = prompt
+        self.key = key
+        self.options = options
+        self.shared = False
+
+    def __aiter__(self) -> AsyncIterator[Any]:
+        if self.key is None or not self.gateway.coalesce:
+            return self.gateway._call(self.llm, self.prompt, llm_priority.get(), self.options)
+        return self._subscribe()
+
+    async def _subscribe(self) -> AsyncIterator[Any]:
+        flights = self.gateway._flights
+        flight = flights.get(self.key)
+        if flight is None:
+            flight = flights[self.key] = _Flight()
+            flight.task = asyncio.create_task(
+                self.gateway._run(flight, self.key, self.llm, self.prompt, llm_priority.get(), self.options)
+            )
+        else:
+            self.shared = True
+            LLM_GATEWAY_REQUESTS.labels(result="coalesced").inc()
+
+        flight.subscribers += 1
+        try:
+            async for chunk in flight.follow():
+                yield chunk
+        finally:
+            flight.subscribers -= 1
+            # Nobody is waiting for the answer any more (e.g. clients disconnected)
+            if flight.subscribers == 0 and not flight.done:
+                if flights.get(self.key) is flight:
+                    del flights[self.key]
+                flight.task.cancel()
+
+
+class LLMGateway:
+    """
+    Shapes the app's calls to the chat model.
+
+    - Coalescing: identical calls (same videos and prompt) in flight at the
+      same time share one provider call; later callers replay its chunks.
+    - Concurrency: at most max_concurrency provider calls at once, and at
+      most requests_per_minute started per minute (0 = no limit).
+    - Priority: queued calls are admitted interactive-first (llm_priority).
+    - Backpressure: beyond max_queue waiting calls, or after queue_timeout
+      seconds of waiting, calls fail fast with LLMOverloadedError.
+
+    The gateway lives in one process: with several workers, every limit
+    (and coalescing) applies per worker, not to the deployment as a whole.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        max_queue: int,
+        queue_timeout: float,
+        requests_per_minute: float = 0,
+        coalesce: bool = True,
+    ):
+        self.slots = PrioritySlots(max_concurrency, max_queue, queue_timeout)
+        self.bucket = TokenBucket(requests_per_minute, burst=max_concurrency) if requests_per_minute else None
+        self.coalesce = coalesce
+        self._flights: Dict[str, _Flight] = {}
+
+    @classmethod
+    def from_settings(cls) -> "LLMGateway":
+        return cls(
+            max_concurrency=settings.LLM_MAX_CONCURRENCY,
+            max_queue=settings.LLM_MAX_QUEUE,
+            queue_timeout=settings.LLM_QUEUE_TIMEOUT_SECONDS,
+            requests_per_minute=settings.LLM_REQUESTS_PER_MINUTE,
+            coalesce=settings.LLM_COALESCE_ENABLED,
+        )
+
+    def check_capacity(self) -> None:
+        """Raise LLMOverloadedError now if an LLM call would be rejected anyway."""
+        try:
+            self.slots.check()
+        except LLMOverloadedError:
+            LLM_GATEWAY_REQUESTS.labels(result="rejected").inc()
+            raise
+
+    def astream(self, llm: Any, prompt: Any, key: Optional[str] = None, **options: Any) -> LLMStream:
+        """
+        Stream llm's answer to prompt through the gateway (coalesced by key, if given).
+
+        options are passed on to llm.astream (e.g. provider call parameters).
+        """
+        return LLMStream(self, llm, prompt, key, options)
+
+    async def _call(self, llm: Any, prompt: Any, priority: int, options: dict) -> AsyncIterator[Any]:
+        queued = time.perf_counter()
+        try:
+            await self.slots.acquire(priority)
+        except LLMOverloadedError:
+            LLM_GATEWAY_REQUESTS.labels(result="rejected").inc()
+            raise
+        try:
+            if self.bucket is not None:
+                await self.bucket.take()
+            observe("llm_queue", time.perf_counter() - queued)
+            LLM_GATEWAY_REQUESTS.labels(result="called").inc()
+            async for chunk in llm.astream(prompt, **options):
+                yield chunk
+        finally:
+            self.slots.release()
+
+    async def _run(self, flight: _Flight, key: str, llm: Any, prompt: Any, priority: int, options: dict) -> None:
+        try:
+            async for chunk in self._call(llm, prompt, priority, options):
+                flight.chunks.append(chunk)
+                flight.notify()
+        except asyncio.CancelledError:
+            flight.error = LLMOverloadedError("LLM call was cancelled", retry_after=0)
+        except Exception as e:
+            flight.error = e
+        finally:
+            flight.done = True
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+            flight.notify()
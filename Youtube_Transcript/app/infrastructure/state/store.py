@@ -0,0 +1,120 @@
+"""SQLite store for state that every API worker must see (thread bindings, ingest jobs)."""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Optional
+
+
+class SQLiteStateStore:
+    """
+    Thread -> video bindings and ingest job snapshots in one SQLite file.
+
+    With several uvicorn workers, /init, the job status poll and /message for
+    one thread may each land on a different worker; keeping this state here
+    (WAL mode, like the embedding cache) lets any worker serve any request.
+    """
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        # Autocommit; bind() opens its own write transaction
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS thread_videos ("
+            " thread_id TEXT PRIMARY KEY, video_ids TEXT NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS ingest_jobs ("
+            " job_id TEXT PRIMARY KEY, snapshot TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+
+    def bind(self, thread_id: str, video_id: str, append: bool) -> List[str]:
+        """Bind a video to a thread atomically (across processes); return its video list."""
+        with self._lock:
+            # IMMEDIATE takes the write lock up front, so concurrent appends are not lost
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT video_ids FROM thread_videos WHERE thread_id = ?", (thread_id,)
+                ).fetchone()
+                videos = json.loads(row[0]) if row and append else []
+                if video_id not in videos:
+                    videos.append(video_id)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO thread_videos (thread_id, video_ids) VALUES (?, ?)",
+                    (thread_id, json.dumps(videos)),
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return videos
+
+    def unbind_video(self, video_id: str) -> int:
+        """Remove a video from every thread bound to it; return how many threads were affected."""
+        # "_" (common in video IDs) and "%" are LIKE wildcards: match them literally
+        needle = json.dumps(video_id).replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        affected = 0
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute(
+                    "SELECT thread_id, video_ids FROM thread_videos WHERE video_ids LIKE ? ESCAPE '\\'",
+                    (f"%{needle}%",),
+                ).fetchall()
+                for thread_id, video_ids in rows:
+                    bound = json.loads(video_ids)
+                    # LIKE is case-insensitive, so it only narrows the candidates down
+                    if video_id not in bound:
+                        continue
+                    affected += 1
+                    videos = [v for v in bound if v != video_id]
+                    if videos:
+                        self._conn.execute(
+                            "UPDATE thread_videos SET video_ids = ? WHERE thread_id = ?",
+                            (json.dumps(videos), thread_id),
+                        )
+                    else:
+                        self._conn.execute("DELETE FROM thread_videos WHERE thread_id = ?", (thread_id,))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return affected
+
+    def thread_videos(self, thread_id: str) -> List[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT video_ids FROM thread_videos WHERE thread_id = ?", (thread_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else []
+
+    def save_job(self, snapshot: dict, history: int) -> None:
+        """Store a job's status snapshot, keeping only the `history` most recent jobs."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO ingest_jobs (job_id, snapshot, updated_at) VALUES (?, ?, ?)",
+                (snapshot["job_id"], json.dumps(snapshot), time.time()),
+            )
+            self._conn.execute(
+                "DELETE FROM ingest_jobs WHERE job_id IN ("
+                " SELECT job_id FROM ingest_jobs ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+                (history,),
+            )
+
+    def get_job(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT snapshot FROM ingest_jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,61 @@
+"""Compressed on-disk cache of raw caption segments."""
+
+import gzip
+import json
+import os
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+def read_segments(path: str) -> Tuple[Optional[str], List[Dict]]:
+    """
+    Read a transcript file (.json or .json.gz).
+
+    The file holds either {"language", "segments"} or a bare list of
+    {"text", "start", "duration"} segments; returns (language, segments).
+    """
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, list):
+        return None, data
+    return data.get("language"), data["segments"]
+
+
+class TranscriptCache:
+    """
+    Raw transcripts keyed by video ID and language, one gzip JSON file each.
+
+    Files are named {video_id}.{language}.json.gz and written atomically, so
+    several worker processes can share the directory. Entries older than
+    ttl_seconds (0 = never) are ignored and refetched.
+    """
+
+    def __init__(self, directory: str, ttl_seconds: float = 0):
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+
+    def path(self, video_id: str, language: str) -> str:
+        return os.path.join(self.directory, f"{video_id}.{language}.json.gz")
+
+    def get(self, video_id: str, languages: Sequence[str]) -> Optional[Tuple[str, List[Dict]]]:
+        """Return (language, segments) for the first cached preferred language, or None."""
+        for language in languages:
+            path = self.path(video_id, language)
+            try:
+                if self.ttl_seconds and time.time() - os.path.getmtime(path) > self.ttl_seconds:
+                    continue
+                _, segments = read_segments(path)
+            except (OSError, ValueError, KeyError):
+                # Missing, or unreadable (e.g. truncated): fetch again
+                continue
+            return language, segments
+        return None
+
+    def put(self, video_id: str, language: str, segments: List[Dict]) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path(video_id, language)
+        partial = f"{path}.{os.getpid()}.tmp"
+        with gzip.open(partial, "wt", encoding="utf-8") as f:
+            json.dump({"language": language, "segments": segments}, f)
+        os.replace(partial, path)
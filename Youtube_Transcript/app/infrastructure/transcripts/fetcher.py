@@ -0,0 +1,137 @@
+"""Transcript fetching: disk cache first, then each source in turn with timeouts and retries.
+
+Fetching captions from YouTube is the slowest and flakiest ingest stage, so
+every fetched transcript is kept in a compressed on-disk cache (re-ingesting
+a video, or ingesting it on another worker, does not touch YouTube again),
+and a source that fails transiently is retried with jittered exponential
+backoff before the next source (e.g. yt-dlp subtitles) is tried.
+"""
+
+import asyncio
+import logging
+import random
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Sequence
+
+from app.core.config import settings
+from app.core.observability import TRANSCRIPT_FETCHES, count_cache
+from app.infrastructure.transcripts.cache import TranscriptCache
+from app.infrastructure.transcripts.sources import (
+    Transcript,
+    TranscriptSource,
+    TranscriptUnavailableError,
+    build_sources,
+)
+
+
+logger = logging.getLogger(__name__)
+
+# Blocking source calls run here; a timed-out call keeps its thread until
+# its own socket timeout, so this is larger than the ingest concurrency
+_FETCH_THREADS = 16
+
+
+class TranscriptFetchError(RuntimeError):
+    """Every source failed to return a transcript (after retries)."""
+
+
+class TranscriptFetcher:
+    """
+    Fetches a video's caption segments from the first source that has them.
+
+    - cache: transcripts from remote sources are stored and served from it
+    - timeout: limit on each attempt, in seconds
+    - retries: extra attempts per source after a transient error; a source
+      reporting that it has no transcript is not retried
+    """
+
+    def __init__(
+        self,
+        sources: List[TranscriptSource],
+        cache: Optional[TranscriptCache] = None,
+        timeout: float = 30.0,
+        retries: int = 2,
+        backoff_seconds: float = 1.0,
+    ):
+        self.sources = sources
+        self.cache = cache
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_seconds = backoff_seconds
+        self._pool = ThreadPoolExecutor(max_workers=_FETCH_THREADS, thread_name_prefix="transcript")
+
+    @classmethod
+    def from_settings(cls) -> "TranscriptFetcher":
+        cache = None
+        if settings.TRANSCRIPT_CACHE_DIR:
+            cache = TranscriptCache(settings.TRANSCRIPT_CACHE_DIR, settings.TRANSCRIPT_CACHE_TTL_SECONDS)
+        return cls(
+            build_sources(settings.TRANSCRIPT_SOURCE),
+            cache=cache,
+            timeout=settings.TRANSCRIPT_FETCH_TIMEOUT_SECONDS,
+            retries=settings.TRANSCRIPT_FETCH_RETRIES,
+            backoff_seconds=settings.TRANSCRIPT_FETCH_BACKOFF_SECONDS,
+        )
+
+    def _backoff(self, attempt: int) -> float:
+        return min(30.0, self.backoff_seconds * 2 ** attempt) * (0.5 + random.random() / 2)
+
+    async def _attempt(self, source: TranscriptSource, video_id: str, languages: Sequence[str]) -> Transcript:
+        loop = asyncio.get_running_loop()
+        call = loop.run_in_executor(self._pool, source.fetch, video_id, languages, self.timeout)
+        return await asyncio.wait_for(call, self.timeout)
+
+    async def _from_source(self, source: TranscriptSource, video_id: str, languages: Sequence[str]) -> Transcript:
+        for attempt in range(self.retries + 1):
+            try:
+                transcript = await self._attempt(source, video_id, languages)
+            except TranscriptUnavailableError:
+                TRANSCRIPT_FETCHES.labels(source=source.name, result="unavailable").inc()
+                raise
+            except Exception as e:
+                if attempt == self.retries:
+                    TRANSCRIPT_FETCHES.labels(source=source.name, result="failed").inc()
+                    raise
+                TRANSCRIPT_FETCHES.labels(source=source.name, result="retry").inc()
+                delay = self._backoff(attempt)
+                logger.warning(f"Transcript fetch of {video_id} from {source.name} failed ({e!r}); retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+            else:
+                TRANSCRIPT_FETCHES.labels(source=source.name, result="ok").inc()
+                return transcript
+
+    async def afetch(self, video_id: str, languages: Sequence[str]) -> Transcript:
+        """
+        Return (language, segments) of the video in the first available preferred language.
+
+        Raises TranscriptUnavailableError when no source has a transcript for
+        the video, TranscriptFetchError when some source kept failing.
+        """
+        use_cache = self.cache is not None and not all(source.local for source in self.sources)
+        if use_cache:
+            cached = await asyncio.to_thread(self.cache.get, video_id, languages)
+            count_cache("transcript", hits=int(cached is not None), misses=int(cached is None))
+            if cached is not None:
+                return cached
+
+        errors, transient = [], False
+        for source in self.sources:
+            try:
+                language, segments = await self._from_source(source, video_id, languages)
+            except TranscriptUnavailableError as e:
+                errors.append(f"{source.name}: {e}")
+                continue
+            except Exception as e:
+                errors.append(f"{source.name}: {e!r}")
+                transient = True
+                continue
+            if use_cache and not source.local:
+                await asyncio.to_thread(self.cache.put, video_id, language, segments)
+            return language, segments
+
+        message = f"Could not fetch a transcript for video {video_id} ({'; '.join(errors)})"
+        raise TranscriptFetchError(message) if transient else TranscriptUnavailableError(message)
+
+    def fetch(self, video_id: str, languages: Sequence[str]) -> Transcript:
+        """Blocking afetch() for worker threads (must not be called from a running event loop)."""
+        return asyncio.run(self.afetch(video_id, languages))
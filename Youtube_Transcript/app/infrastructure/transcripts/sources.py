@@ -0,0 +1,184 @@
+"""Places caption segments can be fetched from, tried in order by the TranscriptFetcher.
+
+Every source returns (language, segments) where segments are
+{"text", "start", "duration"} dicts (times in seconds) in playback order.
+"""
+
+import json
+import os
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Sequence, Tuple
+
+import requests
+
+from app.core.config import settings
+from app.infrastructure.fake.transcripts import synthetic_segments
+from app.infrastructure.transcripts.cache import read_segments
+
+
+Transcript = Tuple[str, List[Dict]]
+
+
+class TranscriptUnavailableError(LookupError):
+    """The source has no transcript for the video (retrying the same source will not help)."""
+
+
+class TranscriptSource(ABC):
+    """A source of caption segments."""
+
+    name = "source"
+    # Local sources are cheap to read again, so their results are not cached
+    local = False
+
+    @abstractmethod
+    def fetch(self, video_id: str, languages: Sequence[str], timeout: float) -> Transcript:
+        """
+        Return (language, segments) for the first available preferred language.
+
+        Raises TranscriptUnavailableError when the video has no such
+        transcript here; any other exception is treated as transient.
+        """
+
+
+class _TimeoutSession(requests.Session):
+    """requests session applying a default timeout to every request."""
+
+    def __init__(self, timeout: float):
+        super().__init__()
+        self.timeout = timeout
+
+    def request(self, *args, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return super().request(*args, **kwargs)
+
+
+class TranscriptApiSource(TranscriptSource):
+    """YouTube's caption tracks via youtube-transcript-api."""
+
+    name = "api"
+
+    def fetch(self, video_id: str, languages: Sequence[str], timeout: float) -> Transcript:
+        from youtube_transcript_api import (
+            CouldNotRetrieveTranscript,
+            YouTubeRequestFailed,
+            YouTubeTranscriptApi,
+        )
+
+        try:
+            transcript = YouTubeTranscriptApi(http_client=_TimeoutSession(timeout)).fetch(
+                video_id, languages=list(languages)
+            )
+        except YouTubeRequestFailed:
+            raise
+        except CouldNotRetrieveTranscript as e:
+            # Disabled, missing, unavailable video, or blocked IP: try the next source
+            raise TranscriptUnavailableError(str(e).strip().splitlines()[0]) from e
+        segments = [
+            {"text": snippet.text, "start": snippet.start, "duration": snippet.duration}
+            for snippet in transcript
+        ]
+        return transcript.language_code, segments
+
+
+def _json3_segments(payload: dict) -> List[Dict]:
+    """Segments of a YouTube json3 subtitle file."""
+    segments = []
+    for event in payload.get("events", []):
+        text = "".join(seg.get("utf8", "") for seg in event.get("segs") or []).strip()
+        if not text:
+            continue
+        segments.append({
+            "text": text,
+            "start": event.get("tStartMs", 0) / 1000,
+            "duration": event.get("dDurationMs", 0) / 1000,
+        })
+    return segments
+
+
+class YtDlpSource(TranscriptSource):
+    """Subtitles (uploaded first, then automatic) listed by yt-dlp."""
+
+    name = "ytdlp"
+
+    def fetch(self, video_id: str, languages: Sequence[str], timeout: float) -> Transcript:
+        import yt_dlp
+
+        options = {"skip_download": True, "quiet": True, "no_warnings": True, "socket_timeout": timeout}
+        with yt_dlp.YoutubeDL(options) as ydl:
+            info = ydl.extract_info(f"https://www.youtube.com/watch?v={video_id}", download=False)
+            for tracks in (info.get("subtitles") or {}, info.get("automatic_captions") or {}):
+                for language in languages:
+                    formats = {track.get("ext"): track.get("url") for track in tracks.get(language, [])}
+                    if formats.get("json3"):
+                        with ydl.urlopen(formats["json3"]) as response:
+                            payload = json.loads(response.read().decode("utf-8"))
+                        return language, _json3_segments(payload)
+        raise TranscriptUnavailableError(f"No {'/'.join(languages)} subtitles listed for video {video_id}")
+
+
+class FixtureSource(TranscriptSource):
+    """
+    Transcripts stored as files in a directory, for offline runs and tests.
+
+    Reads {video_id}.{language}.json[.gz] (the transcript cache's format, so
+    a cache directory doubles as fixtures), then {video_id}.json[.gz].
+    """
+
+    name = "fixtures"
+    local = True
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def fetch(self, video_id: str, languages: Sequence[str], timeout: float) -> Transcript:
+        stems = [(f"{video_id}.{language}", language) for language in languages] + [(video_id, None)]
+        for stem, language in stems:
+            for suffix in (".json", ".json.gz"):
+                path = os.path.join(self.directory, stem + suffix)
+                if os.path.exists(path):
+                    stored_language, segments = read_segments(path)
+                    return stored_language or language or languages[0], segments
+        raise TranscriptUnavailableError(f"No fixture for video {video_id} in {self.directory}")
+
+
+class SyntheticSource(TranscriptSource):
+    """Deterministic made-up captions per video ID (benchmarks)."""
+
+    name = "synthetic"
+    local = True
+
+    def fetch(self, video_id: str, languages: Sequence[str], timeout: float) -> Transcript:
+        return languages[0], list(synthetic_segments(video_id))
+
+
+# Source names usable in TRANSCRIPT_SOURCE; add custom ones with register_source()
+SOURCES: Dict[str, Callable[[], TranscriptSource]] = {
+    "api": TranscriptApiSource,
+    "ytdlp": YtDlpSource,
+    "fixtures": lambda: FixtureSource(settings.TRANSCRIPT_FIXTURES_DIR),
+    "synthetic": SyntheticSource,
+}
+
+
+def register_source(name: str, factory: Callable[[], TranscriptSource]) -> None:
+    """Make a custom source available as name in TRANSCRIPT_SOURCE."""
+    SOURCES[name] = factory
+
+
+def build_sources(names: str) -> List[TranscriptSource]:
+    """
+    Sources for a comma-separated TRANSCRIPT_SOURCE value, in order.
+
+    "youtube" stands for the transcript API followed by yt-dlp subtitles
+    (the latter only with TRANSCRIPT_YTDLP_FALLBACK).
+    """
+    expanded = []
+    for name in (part.strip() for part in names.split(",")):
+        if name == "youtube":
+            expanded.extend(["api", "ytdlp"] if settings.TRANSCRIPT_YTDLP_FALLBACK else ["api"])
+        elif name:
+            expanded.append(name)
+    unknown = [name for name in expanded if name not in SOURCES]
+    if unknown or not expanded:
+        raise ValueError(f"Unknown or missing transcript source in TRANSCRIPT_SOURCE={names!r}")
+    return [SOURCES[name]() for name in expanded]
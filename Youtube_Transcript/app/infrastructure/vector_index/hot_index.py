@@ -0,0 +1,218 @@
+"""In-process, quantized vector indexes for recently queried ("hot") collections.
+
+Chroma stays the durable store; a hot collection's vectors are also kept
+here as one contiguous int8 (or float16) matrix, a quarter (or half) of their
+float32 size, so a query is a single in-process matrix-vector product
+instead of a round trip through the LangChain wrapper and Chroma.
+
+Collections up to flat_max chunks are searched exhaustively. Larger ones get
+an IVF index: vectors are clustered with k-means, stored grouped by cluster,
+and a query only scans the nprobe clusters nearest to it.
+"""
+
+import glob
+import logging
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+DTYPES = ("int8", "float16")
+
+
+def quantize(vectors: np.ndarray, dtype: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Return (codes, per-row scales) approximating vectors as codes * scale.
+
+    int8 uses a symmetric scale per vector (its largest component maps to
+    127); float16 needs no scale.
+    """
+    if dtype == "float16":
+        return vectors.astype(np.float16), np.ones(len(vectors), dtype=np.float32)
+    if dtype != "int8":
+        raise ValueError(f"Unsupported hot index dtype: {dtype}")
+    peaks = np.abs(vectors).max(axis=1)
+    scales = np.where(peaks == 0, 1, peaks / 127).astype(np.float32)
+    codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales
+
+
+def kmeans(vectors: np.ndarray, clusters: int, iterations: int = 10) -> Tuple[np.ndarray, np.ndarray]:
+    """Plain Lloyd's k-means; returns (centroids, cluster of each vector). Seeded, so deterministic."""
+    rng = np.random.default_rng(0)
+    centroids = vectors[rng.choice(len(vectors), clusters, replace=False)].copy()
+    for _ in range(iterations):
+        # argmin ||x - c||^2 == argmax (2 x.c - ||c||^2)
+        assignment = np.argmax(2 * vectors @ centroids.T - (centroids ** 2).sum(axis=1), axis=1)
+        for cluster in range(clusters):
+            members = vectors[assignment == cluster]
+            if len(members):
+                centroids[cluster] = members.mean(axis=0)
+    assignment = np.argmax(2 * vectors @ centroids.T - (centroids ** 2).sum(axis=1), axis=1)
+    return centroids, assignment
+
+
+class QuantizedIndex:
+    """
+    A collection's chunks and their quantized vectors, searchable in-process.
+
+    Scores are on the scale the Chroma wrapper reports (squared L2 distance
+    mapped to 1 - d / sqrt(2)), so the relevance gate's calibrated threshold
+    applies unchanged. Squared norms are kept exactly; only the dot products
+    are approximated.
+
+    With a path, the codes are written there once and memory-mapped, so
+    every worker process on the host shares one copy of the pages.
+
+    The memory saving is at rest only: search() multiplies the probed codes
+    by a float32 query, which materializes those rows as a float32
+    temporary for the duration of the query.
+    """
+
+    def __init__(
+        self,
+        documents: List[Any],
+        vectors: List[List[float]],
+        target: str,
+        dtype: str = "int8",
+        flat_max: int = 4096,
+        nprobe: int = 8,
+        directory: Optional[str] = None,
+    ):
+        matrix = np.asarray(vectors, dtype=np.float32)
+        self.target = target
+        self.nprobe = nprobe
+        self.centroids: Optional[np.ndarray] = None
+        # Rows [offsets[i], offsets[i + 1]) belong to cluster i
+        self.offsets = np.array([0, len(matrix)])
+
+        if len(matrix) > flat_max:
+            clusters = max(1, int(math.sqrt(len(matrix))))
+            self.centroids, assignment = kmeans(matrix, clusters)
+            order = np.argsort(assignment, kind="stable")
+            self.offsets = np.searchsorted(assignment[order], np.arange(clusters + 1))
+            matrix = matrix[order]
+            documents = [documents[i] for i in order]
+
+        self.documents = list(documents)
+        self.norms = (matrix ** 2).sum(axis=1)
+        codes, self.scales = quantize(matrix, dtype)
+        self.path: Optional[str] = None
+        self.codes = self._mapped(codes, directory, dtype) if directory else codes
+
+    def _mapped(self, codes: np.ndarray, directory: str, dtype: str) -> np.ndarray:
+        clusters = len(self.offsets) - 1
+        path = self.path = os.path.join(directory, f"{self.target}-{len(codes)}-{clusters}-{dtype}.npy")
+        if not os.path.exists(path):
+            os.makedirs(directory, exist_ok=True)
+            partial = f"{path}.{os.getpid()}.tmp"
+            with open(partial, "wb") as f:
+                np.save(f, codes)
+            # Another worker may have written the same (deterministic) file meanwhile
+            os.replace(partial, path)
+        return np.load(path, mmap_mode="r")
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes + self.scales.nbytes + self.norms.nbytes
+
+    def _spans(self, query: np.ndarray) -> List[Tuple[int, int]]:
+        if self.centroids is None:
+            return [(0, len(self.documents))]
+        distances = (self.centroids ** 2).sum(axis=1) - 2 * self.centroids @ query
+        # Clusters k-means left empty are never probed
+        distances[self.offsets[1:] == self.offsets[:-1]] = np.inf
+        probed = np.argsort(distances)[:self.nprobe]
+        return [(self.offsets[c], self.offsets[c + 1]) for c in probed if self.offsets[c] < self.offsets[c + 1]]
+
+    def search(self, query_vector: List[float], k: int) -> List[Tuple[Any, float]]:
+        """The k most relevant chunks with their relevance scores, best first."""
+        query = np.asarray(query_vector, dtype=np.float32)
+        if k <= 0:
+            return []
+        rows, dots = [], []
+        for start, end in self._spans(query):
+            rows.append(np.arange(start, end))
+            dots.append((self.codes[start:end] @ query) * self.scales[start:end])
+        if not rows:
+            return []
+        rows, dots = np.concatenate(rows), np.concatenate(dots)
+
+        distances = np.maximum(query @ query + self.norms[rows] - 2 * dots, 0)
+        scores = 1.0 - distances / math.sqrt(2)
+        top = np.argpartition(-scores, k - 1)[:k] if k < len(scores) else np.arange(len(scores))
+        top = top[np.argsort(-scores[top])]
+        return [(self.documents[rows[i]], float(scores[i])) for i in top]
+
+
+class HotIndexCache:
+    """
+    LRU of the QuantizedIndex of up to max_collections collections.
+
+    get() only returns an index verified within revalidate_seconds, so an
+    index rebuilt by another worker process is noticed within that time;
+    peek() returns it regardless, for the caller to revalidate.
+    """
+
+    def __init__(self, max_collections: int, revalidate_seconds: float, directory: Optional[str] = None):
+        self.max_collections = max_collections
+        self.revalidate_seconds = revalidate_seconds
+        self.directory = directory
+        self._entries: "OrderedDict[str, Tuple[QuantizedIndex, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, collection_name: str) -> Optional[QuantizedIndex]:
+        with self._lock:
+            entry = self._entries.get(collection_name)
+            if entry is None or time.monotonic() - entry[1] > self.revalidate_seconds:
+                return None
+            self._entries.move_to_end(collection_name)
+            return entry[0]
+
+    def peek(self, collection_name: str) -> Optional[QuantizedIndex]:
+        with self._lock:
+            entry = self._entries.get(collection_name)
+            return entry[0] if entry is not None else None
+
+    def put(self, collection_name: str, index: QuantizedIndex) -> None:
+        """Store (or mark as verified just now) a collection's index, evicting the least recently used."""
+        with self._lock:
+            replaced = self._entries.get(collection_name)
+            self._entries[collection_name] = (index, time.monotonic())
+            self._entries.move_to_end(collection_name)
+            evicted = []
+            while len(self._entries) > self.max_collections:
+                evicted.append(self._entries.popitem(last=False)[1][0])
+        if replaced is not None and replaced[0] is not index:
+            evicted.append(replaced[0])
+        for old in evicted:
+            if old.path and old.path != index.path:
+                self._remove(old.path)
+
+    def invalidate(self, collection_name: str) -> None:
+        """Drop a collection's index and its memory-mapped files (its contents changed)."""
+        with self._lock:
+            self._entries.pop(collection_name, None)
+        if self.directory:
+            # Files of every version of the collection
+            for path in glob.glob(os.path.join(self.directory, f"{collection_name}*.npy")):
+                self._remove(path)
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        # Pages already mapped (here or by another worker) stay valid until unmapped;
+        # a worker that still needs the file rewrites it on its next build
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -1,16 +1,42 @@
 """FastAPI entrypoint for the YouTube Transcript RAG backend."""
 
+import asyncio
+from contextlib import asynccontextmanager
 from pathlib import Path
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 
 from app.api.routes import router
+from app.core.factory import warmup_embeddings
+from app.core.observability import new_request_id, request_id_var
+from app.core.resources import close_resources, get_resources
+from app.services.graph.youtube_transcript_graph import close_graph, get_graph
+from app.services.bulk_ingest_service import bulk_ingests
+from app.services.ingest_service import ingest_jobs
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the shared clients and the chat graph on startup, close them on shutdown."""
+    # Provider clients (pooled HTTP), embeddings and the vector repository
+    await asyncio.to_thread(get_resources)
+    # Load a local embedding model before the first request needs it
+    await asyncio.to_thread(warmup_embeddings)
+    await get_graph()
+    yield
+    # Let running ingest jobs and bulk runs finish before their clients are closed
+    await asyncio.to_thread(bulk_ingests.shutdown)
+    await asyncio.to_thread(ingest_jobs.shutdown)
+    await close_graph()
+    await close_resources()
 
 
 # Main FastAPI application instance
 app = FastAPI(
     title="YouTube RAG API",
+    lifespan=lifespan,
     version="1.0.0",
     contact={
         "name": "API Support",
@@ -27,6 +53,19 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def request_id_middleware(request: Request, call_next):
+    """Tag each request with an ID (X-Request-ID) that flows into the graph state."""
+    request_id = request.headers.get("X-Request-ID") or new_request_id()
+    token = request_id_var.set(request_id)
+    try:
+        response = await call_next(request)
+    finally:
+        request_id_var.reset(token)
+    response.headers["X-Request-ID"] = request_id
+    return response
+
+
 # Mount versioned API routes under /api/v1
 app.include_router(router, prefix="/api/v1")
 
@@ -37,6 +76,12 @@ def health_check() -> dict:
     return {"status": "ok"}
 
 
+@app.get("/metrics", tags=["Health"], summary="Prometheus metrics")
+def metrics() -> Response:
+    """Stage latency histograms, LLM token counts and cache hit/miss counters."""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
 # Serve static files (frontend) from the frontend directory
 frontend_dir = Path(__file__).parent.parent / "frontend"
 if frontend_dir.exists():
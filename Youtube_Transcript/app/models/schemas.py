@@ -1,14 +1,26 @@
 """Pydantic request / response models used by the FastAPI layer."""
 
-from pydantic import BaseModel, HttpUrl
+from typing import List
+
+from pydantic import BaseModel, Field, HttpUrl
+
+from app.core.config import settings
 
 
 class InitChatRequest(BaseModel):
     """Request body for initializing the knowledge base with a video URL."""
 
     url: HttpUrl
-    # Optional logical thread identifier (useful if you later separate users)
+    # Thread (conversation) that will query this video
     thread_id: str = "default_user"
+    # Keep the thread's previously bound videos instead of replacing them
+    append: bool = False
+
+
+class BulkIngestRequest(BaseModel):
+    """Request body for preloading many videos, playlists or channels."""
+
+    urls: List[HttpUrl] = Field(..., min_length=1)
 
 
 class ChatRequest(BaseModel):
@@ -18,6 +30,13 @@ class ChatRequest(BaseModel):
     thread_id: str = "default_user"
 
 
+class BatchChatRequest(BaseModel):
+    """Many independent questions about the videos bound to a thread."""
+
+    questions: List[str] = Field(..., min_length=1, max_length=settings.BATCH_MAX_QUESTIONS)
+    thread_id: str = "default_user"
+
+
 class ChatResponse(BaseModel):
     """Example of a typed response schema (not currently used directly)."""
 
@@ -0,0 +1,151 @@
+"""Semantic cache of answers to first-turn questions about the same video(s).
+
+Users often ask near-identical opening questions ("what is this video
+about?"). Answers are cached per set of bound videos together with the
+question embedding, and a new question whose embedding is close enough
+(cosine similarity >= ANSWER_CACHE_THRESHOLD) reuses the stored answer
+instead of running retrieval and the LLM again. Answers are stored with the
+index versions of the videos and are dropped once those change, so a video
+re-indexed by another worker process does not keep serving old answers.
+"""
+
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.observability import count_cache
+
+
+class CachedAnswer(NamedTuple):
+    question: str
+    answer: str
+    vector: np.ndarray  # L2-normalized question embedding
+    created_at: float
+    sources: Sequence[dict] = ()
+    version: str = ""
+
+
+def scope_key(video_ids: List[str]) -> str:
+    """Cache scope for a set of videos (order-independent)."""
+    return ",".join(sorted(video_ids))
+
+
+class SemanticAnswerCache:
+    """
+    Size- and TTL-bounded semantic cache with hit/miss counters.
+
+    Entries are grouped by scope so a lookup only compares against answers
+    about the same videos; a global LRU order enforces max_entries.
+    """
+
+    def __init__(
+        self,
+        threshold: Optional[float] = None,
+        ttl_seconds: Optional[int] = None,
+        max_entries: Optional[int] = None,
+    ):
+        self.threshold = threshold or settings.ANSWER_CACHE_THRESHOLD
+        self.ttl_seconds = ttl_seconds or settings.ANSWER_CACHE_TTL_SECONDS
+        self.max_entries = max_entries or settings.ANSWER_CACHE_MAX_ENTRIES
+        self.hits = 0
+        self.misses = 0
+
+        self._by_scope: Dict[str, "OrderedDict[int, CachedAnswer]"] = {}
+        self._lru: "OrderedDict[int, str]" = OrderedDict()
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(vector: List[float]) -> np.ndarray:
+        array = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(array)
+        return array / norm if norm else array
+
+    def _remove(self, entry_id: int) -> None:
+        scope = self._lru.pop(entry_id)
+        entries = self._by_scope[scope]
+        entries.pop(entry_id, None)
+        if not entries:
+            del self._by_scope[scope]
+
+    def lookup(self, video_ids: List[str], vector: List[float], version: str = "") -> Optional[CachedAnswer]:
+        """Return the closest fresh cached answer above the threshold, if any."""
+        scope = scope_key(video_ids)
+        query = self._normalize(vector)
+        now = time.time()
+
+        with self._lock:
+            entries = self._by_scope.get(scope, {})
+            stale = [
+                i for i, e in entries.items()
+                if now - e.created_at > self.ttl_seconds or e.version != version
+            ]
+            for entry_id in stale:
+                self._remove(entry_id)
+
+            entries = self._by_scope.get(scope)
+            if entries:
+                ids = list(entries)
+                matrix = np.stack([entries[i].vector for i in ids])
+                scores = matrix @ query
+                best = int(np.argmax(scores))
+                if scores[best] >= self.threshold:
+                    self._lru.move_to_end(ids[best])
+                    self.hits += 1
+                    count_cache("answer", hits=1, misses=0)
+                    return entries[ids[best]]
+
+            self.misses += 1
+            count_cache("answer", hits=0, misses=1)
+            return None
+
+    def store(
+        self,
+        video_ids: List[str],
+        question: str,
+        vector: List[float],
+        answer: str,
+        sources: Sequence[dict] = (),
+        version: str = "",
+    ) -> None:
+        """
+        Cache an answer (and its sources), evicting the least recently used entries if full.
+
+        version identifies the indexes the answer was computed from; it must
+        be read before retrieval, so a re-index during the turn makes the
+        entry stale rather than current.
+        """
+        scope = scope_key(video_ids)
+        entry = CachedAnswer(question, answer, self._normalize(vector), time.time(), tuple(sources), version)
+        with self._lock:
+            entry_id = next(self._ids)
+            self._by_scope.setdefault(scope, OrderedDict())[entry_id] = entry
+            self._lru[entry_id] = scope
+            while len(self._lru) > self.max_entries:
+                self._remove(next(iter(self._lru)))
+
+    def invalidate(self, video_id: str) -> None:
+        """Drop every answer that involves a video, e.g. after it was re-ingested."""
+        with self._lock:
+            for entry_id, scope in list(self._lru.items()):
+                if video_id in scope.split(","):
+                    self._remove(entry_id)
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._lru),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+# Shared cache used by the chat entrypoint and invalidated by ingestion
+answer_cache = SemanticAnswerCache()
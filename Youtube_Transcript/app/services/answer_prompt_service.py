@@ -0,0 +1,105 @@
+"""Answer prompt assembly with a stable, provider-cacheable prefix.
+
+Providers cache prompt prefixes: OpenAI and Gemini automatically once a
+prefix of 1024+ tokens repeats, Anthropic for blocks marked with
+cache_control. Only a byte-identical prefix can hit, so the prompt is laid
+out static-first:
+
+1. system: the answering rules and the videos' overview (digest), identical
+   for every turn about the same videos
+2. the thread's recent history
+3. user: this turn's retrieved context, then the question.
+
+The system message is built once per set of videos and memoized.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+
+from app.core.config import settings
+from app.services.answer_cache_service import scope_key
+
+
+INSTRUCTIONS = (
+    "Answer ONLY using the video overview below and the retrieved context "
+    "sent with each question.\n"
+    "If a question is not related to the video, please respond I don't know."
+)
+
+# Start of the per-turn user message (the fake LLM answers from what follows)
+CONTEXT_HEADER = "RETRIEVED CONTEXT (each passage starts with its [m:ss] time in the video):"
+
+
+def prompt_cache_key(video_ids: List[str]) -> str:
+    """Short stable key for a set of videos, e.g. for OpenAI's prompt_cache_key routing hint."""
+    return hashlib.sha256(scope_key(video_ids).encode("utf-8")).hexdigest()[:32]
+
+
+class PromptPrefixCache:
+    """
+    Memoized system message (rules + overview) per set of videos.
+
+    An entry is rebuilt when the overview changes (e.g. after a re-ingest);
+    at most max_entries sets of videos are kept, least recently used first out.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[str, SystemMessage]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _build(overview: str) -> SystemMessage:
+        text = f"{INSTRUCTIONS}\n\nVIDEO OVERVIEW:\n{overview or '(not available)'}"
+        if settings.LLM_PROVIDER == "anthropic" and settings.LLM_PROMPT_CACHING:
+            # Anthropic only caches up to an explicit breakpoint
+            return SystemMessage(content=[
+                {"type": "text", "text": text, "cache_control": {"type": "ephemeral"}},
+            ])
+        return SystemMessage(content=text)
+
+    def get(self, video_ids: List[str], overview: str) -> SystemMessage:
+        key = scope_key(video_ids)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == overview:
+                self._entries.move_to_end(key)
+                return entry[1]
+            message = self._build(overview)
+            self._entries[key] = (overview, message)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return message
+
+
+prompt_prefixes = PromptPrefixCache()
+
+
+def build_answer_messages(
+    video_ids: List[str],
+    overview: str,
+    context: str,
+    history: List[BaseMessage],
+) -> List[BaseMessage]:
+    """
+    Messages for one answer: cached prefix, earlier turns, then context + question.
+
+    history ends with the current question. Earlier questions are replayed
+    without their retrieved context, which keeps the prompt bounded.
+    """
+    *earlier, question = history
+    turn = HumanMessage(content=f"{CONTEXT_HEADER}\n{context}\n\nQUESTION: {question.content}")
+    return [prompt_prefixes.get(video_ids, overview), *earlier, turn]
+
+
+def call_options(video_ids: List[str]) -> Dict[str, str]:
+    """Per-call LLM options that raise the provider's prompt cache hit rate."""
+    if settings.LLM_PROVIDER == "openai" and settings.LLM_PROMPT_CACHING:
+        # Routes requests sharing a prefix to the same cache
+        return {"prompt_cache_key": prompt_cache_key(video_ids)}
+    return {}
@@ -0,0 +1,233 @@
+"""Answer many independent questions about a thread's videos in one pass.
+
+Bulk Q&A (e.g. a fixed question list per upload) sent through /message pays
+for a query embedding, a retrieval and an LLM call per request. A batch
+instead reads each video's chunks and vectors once, embeds every question in
+one call and scores them all with a single matrix product; the LLM calls,
+which share the same video overview, then run concurrently through the LLM
+gateway at batch priority.
+
+Batch questions are answered like first turns: they do not read or extend
+the thread's conversation history.
+"""
+
+import asyncio
+import logging
+import math
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.messages import HumanMessage
+
+from app.core.config import settings
+from app.core.observability import TURNS, observe, timed
+from app.core.resources import get_resources
+from app.infrastructure.embeddings.cached import CachedEmbeddings
+from app.infrastructure.llm.gateway import PRIORITY_BATCH, llm_priority
+from app.services.answer_cache_service import answer_cache
+from app.services.graph.main import ThreadNotInitializedError
+from app.services.answer_prompt_service import build_answer_messages
+from app.services.graph.nodes.answer_node import generate_answer
+from app.services.graph.nodes.rerank_node import (
+    NO_ANSWER,
+    fit_token_budget,
+    format_context,
+    mmr_rank,
+    sources_for,
+)
+from app.services.graph.nodes.retrieve_node import chunk_key, fuse_hybrid
+from app.services.lexical_index_service import BM25Index, is_decisive, lexical_indexes
+from app.services.relevance_gate_service import relevance_gate, retrieval_features
+from app.services.video_digest_service import VideoDigestBuilder, digest_cache
+from app.services.video_registry_service import collection_name_for, thread_registry
+
+
+logger = logging.getLogger(__name__)
+
+digest_builder = VideoDigestBuilder()
+
+
+class VideoIndex:
+    """One video's chunks, their embedding matrix, BM25 index and digest, loaded once per batch."""
+
+    def __init__(self, video_id: str):
+        collection_name = collection_name_for(video_id)
+        vector_repo = get_resources().vector_repo
+        # Read before the chunks, so a re-index in between only costs a rebuild later
+        self.version = vector_repo.index_version(collection_name)
+        chunks, vectors = vector_repo.get_chunks(collection_name)
+        order = sorted(range(len(chunks)), key=lambda i: chunks[i].metadata.get("chunk_index", 0))
+        self.chunks: List[Document] = [chunks[i] for i in order]
+        self.vectors = np.asarray([vectors[i] for i in order], dtype=np.float32)
+        self.rows = {chunk_key(c): i for i, c in enumerate(self.chunks)}
+
+        self.lexical = lexical_indexes.get(collection_name, self.version)
+        if self.lexical is None:
+            self.lexical = BM25Index(self.chunks)
+            lexical_indexes.save(collection_name, self.lexical, self.version)
+        self.digest = digest_cache.get(collection_name, self.version)
+        if self.digest is None:
+            self.digest = digest_builder.build([chunk.page_content for chunk in self.chunks])
+            digest_cache.set(collection_name, self.digest, self.version)
+
+    def relevance(self, queries: np.ndarray) -> np.ndarray:
+        """
+        Relevance of every chunk to every query, on Chroma's scale.
+
+        Chroma's default collections rank by squared L2 distance and LangChain
+        maps it to 1 - d / sqrt(2); the same scores keep the relevance gate's
+        calibrated threshold valid.
+        """
+        if not len(self.chunks):
+            return np.zeros((len(queries), 0), dtype=np.float32)
+        distances = (
+            (queries ** 2).sum(axis=1)[:, None]
+            + (self.vectors ** 2).sum(axis=1)[None, :]
+            - 2 * queries @ self.vectors.T
+        )
+        return 1.0 - np.maximum(distances, 0) / math.sqrt(2)
+
+    def vector_of(self, doc: Document) -> np.ndarray:
+        return self.vectors[self.rows[chunk_key(doc)]]
+
+
+async def _embed_questions(questions: List[str]) -> List[List[float]]:
+    """Embed all questions in one batched call (cached questions are free)."""
+    embeddings = get_resources().embeddings
+    if isinstance(embeddings, CachedEmbeddings):
+        return await embeddings.aembed_queries(questions)
+    return list(await asyncio.gather(*(embeddings.aembed_query(q) for q in questions)))
+
+
+def _select_all(
+    questions: List[str],
+    indexes: List[VideoIndex],
+    vectors: List[List[float]],
+) -> List[Optional[List[Dict]]]:
+    """Score every question against every chunk and select each question's chunks (CPU-bound)."""
+    if not questions:
+        return []
+    query_matrix = np.asarray(vectors, dtype=np.float32)
+    # One matrix product per video scores every question against every chunk
+    scores = [index.relevance(query_matrix) for index in indexes]
+    return [
+        _select(question, row, indexes, scores, vectors[row])
+        for row, question in enumerate(questions)
+    ]
+
+
+def _select(
+    question: str,
+    row: int,
+    indexes: List[VideoIndex],
+    scores: List[np.ndarray],
+    query_vector: List[float],
+) -> Optional[List[Dict]]:
+    """
+    Retrieve, gate and rerank one question's chunks, like the chat graph does.
+
+    Returns the selected chunks, or None when the question is refused.
+    """
+    k = settings.RETRIEVAL_CANDIDATES
+    lexical_hits = [index.lexical.search(question, k=k) for index in indexes]
+    merged_lexical = sorted((hit for hits in lexical_hits for hit in hits), key=lambda hit: -hit[1])
+    fast_path = is_decisive(merged_lexical)
+
+    dense_scores = []
+    if fast_path:
+        docs = [doc for doc, _ in merged_lexical[:settings.RERANK_CANDIDATES]]
+    else:
+        per_video = []
+        for index, relevance, hits in zip(indexes, scores, lexical_hits):
+            top = np.argsort(-relevance[row])[:k]
+            dense = [(index.chunks[i], float(relevance[row, i])) for i in top]
+            dense_scores.extend(score for _, score in dense)
+            per_video.append((dense, hits))
+        docs = fuse_hybrid(per_video)
+
+    features = retrieval_features(dense_scores, [score for _, score in merged_lexical])
+    if not fast_path and not relevance_gate.is_relevant(features):
+        return None
+
+    candidates = [{"text": d.page_content, "metadata": d.metadata or {}} for d in docs]
+    if candidates and not fast_path:
+        # Candidate vectors come from the loaded collections: no embedding calls
+        by_video = {index.chunks[0].metadata.get("video_id"): index for index in indexes if index.chunks}
+        doc_vectors = [by_video[(d.metadata or {}).get("video_id")].vector_of(d) for d in docs]
+        candidates = mmr_rank(candidates, query_vector, doc_vectors)
+    selected, _ = fit_token_budget(candidates)
+    return selected or None
+
+
+async def answer_batch(questions: List[str], thread_id: str) -> dict:
+    """
+    Answer every question about the thread's videos and return one result per question.
+
+    Each result has the question, answer, sources and outcome (llm, refused
+    or cached); a question whose LLM call failed gets an error instead of
+    failing the whole batch.
+    """
+    video_ids = thread_registry.get(thread_id)
+    if not video_ids:
+        raise ThreadNotInitializedError(f"No video has been initialized for thread '{thread_id}'")
+    started = time.perf_counter()
+
+    with timed("batch_retrieve"):
+        indexes, vectors = await asyncio.gather(
+            asyncio.gather(*(asyncio.to_thread(VideoIndex, video_id) for video_id in video_ids)),
+            _embed_questions(questions),
+        )
+        overview = "\n===\n".join(index.digest for index in indexes if index.digest)
+        # The answer cache's version of these videos (see index_version_of)
+        index_version = ",".join(index.version for _, index in sorted(zip(video_ids, indexes), key=lambda p: p[0]))
+        # Cached questions skip retrieval altogether
+        cached = [
+            answer_cache.lookup(video_ids, vector, index_version) if settings.ANSWER_CACHE_ENABLED else None
+            for vector in vectors
+        ]
+        pending = [row for row, hit in enumerate(cached) if hit is None]
+        # Scoring and reranking a whole batch would stall the event loop's other requests
+        selected_rows = await asyncio.to_thread(
+            _select_all, [questions[row] for row in pending], indexes, [vectors[row] for row in pending]
+        )
+        selections: Dict[int, Optional[List[Dict]]] = dict(zip(pending, selected_rows))
+
+    # Batch work queues behind interactive turns in the LLM gateway
+    llm_priority.set(PRIORITY_BATCH)
+    semaphore = asyncio.Semaphore(settings.BATCH_LLM_CONCURRENCY)
+
+    async def answer(row: int) -> dict:
+        question, vector = questions[row], vectors[row]
+        if cached[row] is not None:
+            TURNS.labels(outcome="cached").inc()
+            return {"question": question, "answer": cached[row].answer, "sources": list(cached[row].sources), "outcome": "cached"}
+        selected = selections[row]
+        if selected is None:
+            result = {"question": question, "answer": NO_ANSWER, "sources": [], "outcome": "refused"}
+        else:
+            # Every question shares the cached prefix: rules + overview
+            messages = build_answer_messages(
+                video_ids, overview, format_context(selected), [HumanMessage(content=question)]
+            )
+            try:
+                async with semaphore:
+                    response = await generate_answer(messages, video_ids)
+            except Exception as e:
+                logger.warning(f"Batch question failed: {e}")
+                return {"question": question, "answer": None, "sources": [], "outcome": "error", "error": str(e)}
+            result = {
+                "question": question,
+                "answer": str(response.content),
+                "sources": sources_for(selected),
+                "outcome": "llm",
+            }
+        TURNS.labels(outcome=result["outcome"]).inc()
+        if settings.ANSWER_CACHE_ENABLED:
+            answer_cache.store(video_ids, question, vector, result["answer"], result["sources"], index_version)
+        return result
+
+    results = await asyncio.gather(*(answer(row) for row in range(len(questions))))
+    observe("batch_total", time.perf_counter() - started)
+    return {"video_ids": video_ids, "answers": results}
@@ -0,0 +1,249 @@
+"""Bulk ingestion of many videos (playlists, channels, URL lists).
+
+A bulk run expands its URLs to video IDs and ingests them on a bounded worker
+pool, so transcript downloads overlap instead of running one after another.
+Videos already in the ingest cache are skipped, a failing video is recorded
+without aborting the run, and throughput statistics are kept as it goes.
+"""
+
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional
+
+from app.core.config import settings
+from app.services.ingest_service import IngestJob, IngestPipeline, ingest_jobs
+from app.services.youtube_loader_service import expand_video_ids
+
+
+logger = logging.getLogger(__name__)
+
+
+def _percentile(values: List[float], fraction: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class BulkIngestRun:
+    """Progress and throughput record of one bulk ingest."""
+
+    def __init__(self, urls: List[str]):
+        self.id = uuid.uuid4().hex
+        self.urls = list(urls)
+
+        self.status = "queued"  # queued, running, done, failed
+        self.error: Optional[str] = None
+        self.videos_total = 0
+        self.videos_done = 0
+        self.videos_skipped = 0
+        self.chunks = 0
+        self.failures: Dict[str, str] = {}  # video ID or URL -> error message
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._embed_seconds: List[float] = []
+        self._lock = threading.Lock()
+
+    def record(self, job: IngestJob) -> None:
+        """Account for a finished per-video job."""
+        with self._lock:
+            if job.error is not None:
+                self.failures[job.video_id] = job.error
+            elif job.cached:
+                self.videos_skipped += 1
+            else:
+                self.videos_done += 1
+                self.chunks += job.chunks_indexed
+                if job.stages["embed"]["seconds"] is not None:
+                    self._embed_seconds.append(job.stages["embed"]["seconds"])
+
+    def record_failure(self, source: str, error: str) -> None:
+        with self._lock:
+            self.failures[source] = error
+
+    def to_dict(self) -> dict:
+        """Serializable snapshot including videos/s, chunks/s and embed latency."""
+        with self._lock:
+            end = self.finished_at or time.time()
+            elapsed = end - self.started_at if self.started_at else 0.0
+            processed = self.videos_done + self.videos_skipped + len(self.failures)
+            return {
+                "run_id": self.id,
+                "status": self.status,
+                "error": self.error,
+                "videos_total": self.videos_total,
+                "videos_done": self.videos_done,
+                "videos_skipped": self.videos_skipped,
+                "videos_failed": len(self.failures),
+                "chunks": self.chunks,
+                "failures": dict(self.failures),
+                "elapsed_seconds": round(elapsed, 3),
+                "videos_per_second": round(processed / elapsed, 3) if elapsed else 0.0,
+                "chunks_per_second": round(self.chunks / elapsed, 3) if elapsed else 0.0,
+                "embed_seconds_mean": (
+                    round(sum(self._embed_seconds) / len(self._embed_seconds), 3)
+                    if self._embed_seconds else None
+                ),
+                "embed_seconds_p95": _percentile(self._embed_seconds, 0.95),
+                "created_at": self.created_at,
+                "finished_at": self.finished_at,
+            }
+
+
+class BulkIngestor:
+    """
+    Runs bulk ingests through the shared IngestPipeline.
+
+    Each video goes through the same cached, per-video-locked path as /init,
+    so a bulk run and concurrent /init requests never index a video twice.
+    """
+
+    def __init__(self, pipeline: IngestPipeline, workers: Optional[int] = None):
+        self.pipeline = pipeline
+        self.workers = workers or settings.BULK_INGEST_WORKERS
+        # Set on shutdown: videos not started yet are dropped instead of ingested
+        self.stopping = threading.Event()
+
+    def expand(self, run: BulkIngestRun) -> List[str]:
+        """Resolve the run's URLs to unique video IDs, recording unresolvable ones."""
+        video_ids: List[str] = []
+        seen = set()
+        for url in run.urls:
+            try:
+                found = expand_video_ids(url, limit=settings.BULK_INGEST_MAX_VIDEOS)
+            except Exception as e:
+                logger.warning(f"Could not expand '{url}': {e}")
+                run.record_failure(url, str(e))
+                continue
+            for video_id in found:
+                if video_id not in seen and len(video_ids) < settings.BULK_INGEST_MAX_VIDEOS:
+                    seen.add(video_id)
+                    video_ids.append(video_id)
+        return video_ids
+
+    def _ingest_one(self, video_id: str) -> IngestJob:
+        job = IngestJob(f"https://www.youtube.com/watch?v={video_id}", video_id, None, False)
+        if self.stopping.is_set():
+            job.status = "failed"
+            job.error = "Cancelled: the server shut down before the video was ingested"
+            job.finished_at = time.time()
+            return job
+        job.status = "running"
+        try:
+            self.pipeline.ingest(job)
+            job.status = "ready"
+        except Exception as e:
+            logger.warning(f"Bulk ingest of video {video_id} failed: {e}")
+            job.error = str(e)
+            job.status = "failed"
+        job.finished_at = time.time()
+        return job
+
+    def run(self, run: BulkIngestRun, on_video: Optional[Callable[[IngestJob], None]] = None) -> None:
+        """Ingest every video of the run (blocking); on_video is called per finished video."""
+        run.status = "running"
+        run.started_at = time.time()
+        try:
+            video_ids = self.expand(run)
+            run.videos_total = len(video_ids)
+
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bulk-ingest") as pool:
+                futures = [pool.submit(self._ingest_one, video_id) for video_id in video_ids]
+                for future in as_completed(futures):
+                    job = future.result()
+                    run.record(job)
+                    if on_video is not None:
+                        on_video(job)
+
+            if self.stopping.is_set():
+                run.error = "Cancelled: the server shut down during the run"
+                run.status = "failed"
+                return
+
+            # Keep the persist dir bounded once, rather than after every video,
+            # without dropping the videos this run was asked to preload
+            if len(video_ids) > self.pipeline.ingest_cache.max_videos:
+                logger.warning(
+                    f"Bulk ingest run {run.id} indexed {len(video_ids)} videos, more than "
+                    f"INGEST_CACHE_MAX_VIDEOS={self.pipeline.ingest_cache.max_videos}; "
+                    "the least recently used are evicted by later ingests"
+                )
+            self.pipeline.ingest_cache.evict(keep=set(video_ids), cancel=self.pipeline.stopping)
+            run.status = "done"
+        except Exception as e:
+            logger.exception(f"Bulk ingest run {run.id} failed")
+            run.error = str(e)
+            run.status = "failed"
+        finally:
+            run.finished_at = time.time()
+
+
+class BulkIngestManager:
+    """Runs bulk ingests in the background and keeps a bounded run history."""
+
+    def __init__(self, ingestor: BulkIngestor, history: int):
+        self.ingestor = ingestor
+        self.history = history
+        self._executor = self._new_executor()
+        self._runs: "OrderedDict[str, BulkIngestRun]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _new_executor() -> ThreadPoolExecutor:
+        # Runs are queued one at a time; each run is parallel internally
+        return ThreadPoolExecutor(max_workers=1, thread_name_prefix="bulk-run")
+
+    def submit(self, urls: List[str]) -> BulkIngestRun:
+        run = BulkIngestRun(urls)
+        with self._lock:
+            self._runs[run.id] = run
+            for run_id in list(self._runs):
+                if len(self._runs) <= self.history:
+                    break
+                if self._runs[run_id].status in ("done", "failed"):
+                    del self._runs[run_id]
+        self._executor.submit(self.ingestor.run, run)
+        return run
+
+    def get(self, run_id: str) -> Optional[BulkIngestRun]:
+        with self._lock:
+            return self._runs.get(run_id)
+
+    def shutdown(self) -> None:
+        """
+        Drop queued runs and the unstarted videos of the running one, then wait for it.
+
+        Videos already being ingested finish (the shared clients must still be
+        open); every dropped video and run is marked failed. A fresh executor
+        takes over, so the manager stays usable if the app is started again.
+        """
+        executor, self._executor = self._executor, self._new_executor()
+        self.ingestor.stopping.set()
+        # Videos waiting for another worker's write lock give up too
+        self.ingestor.pipeline.stopping.set()
+        try:
+            executor.shutdown(wait=True, cancel_futures=True)
+        finally:
+            self.ingestor.stopping.clear()
+            self.ingestor.pipeline.stopping.clear()
+
+        with self._lock:
+            dropped = [run for run in self._runs.values() if run.status == "queued"]
+        for run in dropped:
+            run.status = "failed"
+            run.error = "Cancelled: the server shut down before the run started"
+            run.finished_at = time.time()
+        if dropped:
+            logger.info(f"Cancelled {len(dropped)} queued bulk ingest run(s) on shutdown")
+
+
+# Shared bulk ingest manager; reuses the /init pipeline and its caches
+bulk_ingests = BulkIngestManager(
+    BulkIngestor(ingest_jobs.pipeline),
+    history=settings.INGEST_JOB_HISTORY,
+)
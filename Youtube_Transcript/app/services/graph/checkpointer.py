@@ -0,0 +1,153 @@
+"""Checkpointer construction and idle-thread eviction for the chat graph.
+
+The checkpointer stores every thread's message history. The default SQLite
+backend survives restarts and can be shared by several uvicorn workers on the
+same host; "memory" keeps the old in-process MemorySaver behavior.
+"""
+
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import List
+
+import aiosqlite
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+from app.core.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+async def create_checkpointer() -> BaseCheckpointSaver:
+    """Build the checkpointer selected by CHECKPOINTER_BACKEND (needs a running loop)."""
+    if settings.CHECKPOINTER_BACKEND == "memory":
+        return MemorySaver()
+    elif settings.CHECKPOINTER_BACKEND == "sqlite":
+        directory = os.path.dirname(os.path.abspath(settings.CHECKPOINT_DB_PATH))
+        os.makedirs(directory, exist_ok=True)
+        conn = await aiosqlite.connect(settings.CHECKPOINT_DB_PATH)
+        saver = AsyncSqliteSaver(conn)
+        await saver.setup()
+        return saver
+    else:
+        raise ValueError(f"Unsupported checkpointer backend: {settings.CHECKPOINTER_BACKEND}")
+
+
+class MemoryThreadActivity:
+    """Last-activity times of threads, kept in process (for MemorySaver)."""
+
+    def __init__(self):
+        self._last_seen: "OrderedDict[str, float]" = OrderedDict()
+
+    async def touch(self, thread_id: str, now: float) -> None:
+        self._last_seen[thread_id] = now
+        self._last_seen.move_to_end(thread_id)
+
+    async def stale(self, max_threads: int, cutoff: float) -> List[str]:
+        """Threads idle since before cutoff, plus the oldest ones beyond max_threads."""
+        overflow = max(0, len(self._last_seen) - max_threads)
+        return [
+            thread_id
+            for position, (thread_id, last_seen) in enumerate(self._last_seen.items())
+            if position < overflow or last_seen < cutoff
+        ]
+
+    async def forget(self, thread_ids: List[str]) -> None:
+        for thread_id in thread_ids:
+            self._last_seen.pop(thread_id, None)
+
+
+class SqliteThreadActivity:
+    """
+    Last-activity times of threads, stored next to the SQLite checkpoints.
+
+    Shares the saver's connection, so every statement runs under the saver's
+    lock to avoid committing in the middle of one of its transactions.
+    """
+
+    def __init__(self, saver: AsyncSqliteSaver):
+        self.saver = saver
+        self._ready = False
+
+    async def _execute(self, sql: str, params=()) -> List[tuple]:
+        async with self.saver.lock:
+            if not self._ready:
+                await self.saver.conn.execute(
+                    "CREATE TABLE IF NOT EXISTS thread_activity ("
+                    " thread_id TEXT PRIMARY KEY, last_seen REAL NOT NULL)"
+                )
+                self._ready = True
+            async with self.saver.conn.execute(sql, params) as cursor:
+                rows = await cursor.fetchall()
+            await self.saver.conn.commit()
+            return rows
+
+    async def touch(self, thread_id: str, now: float) -> None:
+        await self._execute(
+            "INSERT INTO thread_activity (thread_id, last_seen) VALUES (?, ?) "
+            "ON CONFLICT(thread_id) DO UPDATE SET last_seen = excluded.last_seen",
+            (thread_id, now),
+        )
+
+    async def stale(self, max_threads: int, cutoff: float) -> List[str]:
+        """Threads idle since before cutoff, plus the oldest ones beyond max_threads."""
+        rows = await self._execute(
+            "SELECT thread_id FROM thread_activity WHERE last_seen < ? "
+            "UNION SELECT thread_id FROM ("
+            " SELECT thread_id FROM thread_activity ORDER BY last_seen DESC LIMIT -1 OFFSET ?)",
+            (cutoff, max_threads),
+        )
+        return [row[0] for row in rows]
+
+    async def forget(self, thread_ids: List[str]) -> None:
+        for thread_id in thread_ids:
+            await self._execute("DELETE FROM thread_activity WHERE thread_id = ?", (thread_id,))
+
+
+class IdleThreadEvictor:
+    """
+    Bounds checkpointer storage by deleting idle and least recently used threads.
+
+    Every turn records the thread's activity; at most once per sweep interval
+    threads idle longer than THREAD_IDLE_TTL_SECONDS, and the least recently
+    used beyond THREAD_MAX_ACTIVE, have their checkpoints deleted.
+    """
+
+    def __init__(self, checkpointer: BaseCheckpointSaver, sweep_interval: float = 60.0):
+        self.checkpointer = checkpointer
+        self.sweep_interval = sweep_interval
+        self._last_sweep = 0.0
+        if isinstance(checkpointer, AsyncSqliteSaver):
+            self.activity = SqliteThreadActivity(checkpointer)
+        else:
+            self.activity = MemoryThreadActivity()
+
+    async def touch(self, thread_id: str) -> None:
+        now = time.time()
+        await self.activity.touch(thread_id, now)
+        if now - self._last_sweep >= self.sweep_interval:
+            self._last_sweep = now
+            await self.sweep(now)
+
+    async def sweep(self, now: float) -> int:
+        """Delete the checkpoints of stale threads; return how many were evicted."""
+        stale = await self.activity.stale(
+            settings.THREAD_MAX_ACTIVE,
+            now - settings.THREAD_IDLE_TTL_SECONDS,
+        )
+        for thread_id in stale:
+            await self.checkpointer.adelete_thread(thread_id)
+        if stale:
+            await self.activity.forget(stale)
+            logger.info(f"Evicted {len(stale)} idle chat thread(s)")
+        return len(stale)
+
+
+async def close_checkpointer(checkpointer: BaseCheckpointSaver) -> None:
+    """Release the checkpointer's resources (the SQLite connection, if any)."""
+    if isinstance(checkpointer, AsyncSqliteSaver):
+        await checkpointer.conn.close()
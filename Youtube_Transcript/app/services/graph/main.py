@@ -1,24 +1,230 @@
 """Public entrypoint for executing the YouTube transcript RAG graph."""
 
-from langchain_core.messages import HumanMessage
+import time
+from typing import AsyncIterator, List, Optional, Tuple
 
-from app.services.graph.youtube_transcript_graph import graph
+from langchain_core.messages import AIMessage, HumanMessage
 
+from app.core.config import settings
+from app.core.observability import TURNS, current_request_id, observe
+from app.core.resources import get_resources
+from app.services.answer_cache_service import CachedAnswer, answer_cache
+from app.services.graph.nodes.answer_node import ANSWER_TOKEN_EVENT
+from app.services.graph.youtube_transcript_graph import get_graph, touch_thread
+from app.services.video_registry_service import collection_name_for, thread_registry
 
-async def chat(message: str, thread_id: str) -> str:
+
+class ThreadNotInitializedError(LookupError):
+    """Raised when a thread asks a question before any video was bound to it."""
+
+
+def build_turn_input(message: str, thread_id: str) -> dict:
+    """
+    Build the graph input for one turn, scoped to the thread's bound videos.
+
+    Raises ThreadNotInitializedError if /init was never called for the thread.
+    """
+    video_ids = thread_registry.get(thread_id)
+    if not video_ids:
+        raise ThreadNotInitializedError(
+            f"No video has been initialized for thread '{thread_id}'"
+        )
+    return {
+        "request_id": current_request_id(),
+        "messages": [HumanMessage(content=message)],
+        "video_ids": video_ids,
+    }
+
+
+def index_version_of(video_ids: List[str]) -> str:
+    """Combined index version of a set of videos (order-independent), for the answer cache."""
+    vector_repo = get_resources().vector_repo
+    return ",".join(vector_repo.index_version(collection_name_for(video_id)) for video_id in sorted(video_ids))
+
+
+async def _cached_answer(
+    graph, config: dict, turn_input: dict
+) -> Tuple[Optional[CachedAnswer], Optional[List[float]], str]:
+    """
+    Look the question up in the semantic answer cache.
+
+    Only first-turn questions qualify: a follow-up's correct answer depends on
+    the thread's history. Returns (cached answer, question vector, index
+    version of the videos); the vector is None when the cache does not apply,
+    and the answer is None on a miss. The version is read before retrieval
+    runs and is stored with the answer on a miss.
+    On a hit the turn is recorded in the thread so follow-ups see it.
     """
-    Run a single turn of the chat graph and return the final answer text.
+    if not settings.ANSWER_CACHE_ENABLED:
+        return None, None, ""
+
+    state = await graph.aget_state(config)
+    if state.values.get("messages"):
+        return None, None, ""
+
+    question = turn_input["messages"][-1].content
+    # Same app-scoped embeddings client as retrieval, to key the semantic answer cache
+    vector = await get_resources().embeddings.aembed_query(question)
+    version = index_version_of(turn_input["video_ids"])
+    hit = answer_cache.lookup(turn_input["video_ids"], vector, version)
+    if hit is None:
+        return None, vector, version
+
+    await graph.aupdate_state(
+        config,
+        {
+            **turn_input,
+            "messages": [*turn_input["messages"], AIMessage(content=hit.answer)],
+            "sources": list(hit.sources),
+        },
+        as_node="answer",
+    )
+    return hit, vector, version
+
+
+async def chat(message: str, thread_id: str) -> dict:
+    """
+    Run a single turn of the chat graph and return the answer with its sources.
 
     The thread_id is passed through to LangGraph's configurable state to enable
-    per‑thread memory via the MemorySaver checkpointer.
+    per‑thread memory via the configured checkpointer, and selects which
+    videos the retrieval step searches. Near-duplicate first-turn questions
+    are answered from the semantic answer cache without running the graph.
     """
     config = {"configurable": {"thread_id": thread_id}}
+    turn_input = build_turn_input(message, thread_id)
+    graph = await get_graph()
+    await touch_thread(thread_id)
+    started = time.perf_counter()
+
+    cached, vector, index_version = await _cached_answer(graph, config, turn_input)
+    if cached is not None:
+        _record_turn(started, cached=True, answer_node_ran=False)
+        return {"answer": cached.answer, "sources": list(cached.sources)}
+
+    # Shed load before doing any retrieval work if the LLM queue is full
+    get_resources().llm_gateway.check_capacity()
 
     # Kick off the graph with the latest user message
-    result = await graph.ainvoke(
-        {"messages": [HumanMessage(content=message)]},
-        config,
-    )
+    result = await graph.ainvoke(turn_input, config)
+    # no_answer clears the context, so it is only set when the LLM answered
+    _record_turn(started, cached=False, answer_node_ran=bool(result.get("context")))
 
     # The answer_node appends the final LLM response to the messages list
-    return result["messages"][-1].content
\ No newline at end of file
+    answer = result["messages"][-1].content
+    sources = result.get("sources", [])
+    if vector is not None:
+        answer_cache.store(turn_input["video_ids"], message, vector, answer, sources, index_version)
+    return {"answer": answer, "sources": sources}
+
+
+def _record_turn(started: float, cached: bool, answer_node_ran: bool) -> None:
+    """Count a finished turn by outcome and record its total duration."""
+    observe("total", time.perf_counter() - started)
+    outcome = "cached" if cached else ("llm" if answer_node_ran else "refused")
+    TURNS.labels(outcome=outcome).inc()
+
+
+def _chunk_text(content) -> str:
+    """Normalize a streamed message chunk (str or content blocks) to text."""
+    if isinstance(content, str):
+        return content
+    return "".join(
+        block.get("text", "") for block in content if isinstance(block, dict)
+    )
+
+
+async def chat_stream(message: str, thread_id: str) -> AsyncIterator[dict]:
+    """
+    Run a single chat turn and yield events as the graph makes progress.
+
+    Yields dicts of the form {"event": name, "data": payload}:
+    - retrieval: emitted once retrieval and reranking finish, with their
+      duration and the timestamped sources of the selected chunks
+    - token: each LLM token produced inside answer_node, as it arrives
+    - done: the full answer text and its sources, once the graph has completed
+
+    A semantic answer cache hit skips straight to "done" (with cached=True).
+    """
+    config = {"configurable": {"thread_id": thread_id}}
+    turn_input = build_turn_input(message, thread_id)
+    graph = await get_graph()
+    await touch_thread(thread_id)
+    started = time.perf_counter()
+
+    cached, vector, index_version = await _cached_answer(graph, config, turn_input)
+    if cached is not None:
+        _record_turn(started, cached=True, answer_node_ran=False)
+        yield {
+            "event": "done",
+            "data": {
+                "answer": cached.answer,
+                "sources": list(cached.sources),
+                "cached": True,
+                "total_ms": round((time.perf_counter() - started) * 1000, 1),
+            },
+        }
+        return
+
+    # Shed load before doing any retrieval work if the LLM queue is full
+    get_resources().llm_gateway.check_capacity()
+
+    retrieve_started = started
+    retrieval_reported = False
+    answer_node_ran = False
+    answer_parts = []
+    final_answer = None
+    sources = []
+
+    events = graph.astream_events(turn_input, config, version="v2")
+    async for event in events:
+        kind = event["event"]
+        node = event.get("metadata", {}).get("langgraph_node")
+
+        if kind == "on_chain_start" and event["name"] == "retrieve":
+            retrieve_started = time.perf_counter()
+
+        elif (
+            (kind == "on_chain_end" and event["name"] == "rerank")
+            # Off-topic questions skip rerank and go straight to no_answer
+            or (kind == "on_chain_start" and event["name"] == "no_answer" and not retrieval_reported)
+        ):
+            output = (event["data"].get("output") or {}) if kind == "on_chain_end" else {}
+            sources = output.get("sources", [])
+            retrieval_reported = True
+            yield {
+                "event": "retrieval",
+                "data": {
+                    "retrieval_ms": round((time.perf_counter() - retrieve_started) * 1000, 1),
+                    "context_chars": len(output.get("context", "")),
+                    "sources": sources,
+                },
+            }
+
+        elif kind == "on_custom_event" and event["name"] == ANSWER_TOKEN_EVENT and node == "answer":
+            token = _chunk_text(event["data"]["content"])
+            if token:
+                answer_parts.append(token)
+                yield {"event": "token", "data": {"token": token}}
+
+        elif kind == "on_chain_end" and event["name"] in ("answer", "no_answer"):
+            answer_node_ran = event["name"] == "answer"
+            # Providers that cannot stream (and the no-LLM refusal) deliver the final message here
+            messages = (event["data"].get("output") or {}).get("messages") or []
+            if messages:
+                final_answer = _chunk_text(messages[-1].content)
+
+    answer = final_answer if final_answer is not None else "".join(answer_parts)
+    if vector is not None:
+        answer_cache.store(turn_input["video_ids"], message, vector, answer, sources, index_version)
+    _record_turn(started, cached=False, answer_node_ran=answer_node_ran)
+
+    yield {
+        "event": "done",
+        "data": {
+            "answer": answer,
+            "sources": sources,
+            "cached": False,
+            "total_ms": round((time.perf_counter() - started) * 1000, 1),
+        },
+    }
@@ -1,45 +1,126 @@
 """Graph node that generates an answer strictly from retrieved video context."""
 
 import logging
-from langchain_core.prompts import ChatPromptTemplate
+import time
+from typing import Any, Awaitable, Callable, List, Optional
 
-from app.core.factory import get_llm
+from langchain_core.callbacks.manager import adispatch_custom_event
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    HumanMessage,
+    RemoveMessage,
+    get_buffer_string,
+    message_chunk_to_message,
+)
+
+from app.core.config import settings
+from app.core.observability import LLM_TOKENS, observe, timed
+from app.core.resources import get_resources
+from app.infrastructure.llm.gateway import coalesce_key
+from app.services.answer_prompt_service import build_answer_messages, call_options
 from app.services.graph.youtube_transcript_graph_state import RAGState
+from app.services.video_digest_service import estimate_tokens
 
-# Reuse a single logger and LLM client across invocations
+# Reuse a single logger across invocations (the LLM client is app-scoped)
 logger = logging.getLogger(__name__)
-llm = get_llm()
+
+# Custom graph event carrying each answer token (see chat_stream)
+ANSWER_TOKEN_EVENT = "answer_token"
+
+
+def history_window(messages: List[BaseMessage], size: int) -> List[BaseMessage]:
+    """
+    Return the most recent `size` messages, starting on a user turn.
+
+    Bounds the history replayed into the prompt no matter how long the
+    thread has been running.
+    """
+    window = list(messages[-size:]) if size > 0 else list(messages[-1:])
+    while len(window) > 1 and not isinstance(window[0], HumanMessage):
+        window.pop(0)
+    return window
+
+
+async def generate_answer(
+    messages: List[BaseMessage],
+    video_ids: List[str],
+    on_token: Optional[Callable[[Any], Awaitable[None]]] = None,
+) -> AIMessage:
+    """
+    Stream the LLM's answer to a prompt through the app's LLM gateway.
+
+    Streaming lets time-to-first-token be measured; on_token, if given, is
+    awaited with each non-empty chunk's content. Identical prompts about the
+    same videos in flight at once share one provider call, whose tokens are
+    only counted once. Prompt cache reads and writes reported by the
+    provider are counted too.
+    """
+    resources = get_resources()
+    prompt_text = get_buffer_string(messages)
+    stream = resources.llm_gateway.astream(
+        resources.llm,
+        messages,
+        key=coalesce_key(video_ids, prompt_text),
+        **call_options(video_ids),
+    )
+    started = time.perf_counter()
+    response = None
+    first_token = True
+    async for chunk in stream:
+        response = chunk if response is None else response + chunk
+        if not chunk.content:
+            # Role headers, tool-call deltas and usage-only chunks carry no text
+            continue
+        if first_token:
+            observe("llm_ttft", time.perf_counter() - started)
+            first_token = False
+        if on_token is not None:
+            await on_token(chunk.content)
+    observe("llm", time.perf_counter() - started)
+    response = message_chunk_to_message(response) if response is not None else AIMessage(content="")
+
+    if not stream.shared:
+        # Providers that do not report usage get a cheap estimate instead
+        usage = getattr(response, "usage_metadata", None) or {
+            "input_tokens": estimate_tokens(prompt_text),
+            "output_tokens": estimate_tokens(str(response.content)),
+        }
+        LLM_TOKENS.labels(kind="input").inc(usage["input_tokens"])
+        LLM_TOKENS.labels(kind="output").inc(usage["output_tokens"])
+        details = usage.get("input_token_details") or {}
+        for kind in ("cache_read", "cache_creation"):
+            if details.get(kind):
+                LLM_TOKENS.labels(kind=kind).inc(details[kind])
+    return response
+
 
 async def answer_node(state: RAGState) -> dict:
     """
-    Take the retrieved context + full context and produce a guarded LLM answer.
+    Take the retrieved context + video digest and produce a guarded LLM answer.
 
-    The prompt:
+    The prompt (see answer_prompt_service for its cache-friendly layout):
     - strictly instructs the model to only use transcript content
     - asks it to refuse questions that are unrelated to the video
-    - appends the new assistant message back into the graph state.
+    - only replays the last HISTORY_WINDOW_MESSAGES messages of the thread
+    - appends the new assistant message back into the graph state, removing
+      messages that fell out of the window so checkpoints stay bounded too.
     """
 
-    # System prompt that enforces \"only answer from video context\" behavior
-    prompt = ChatPromptTemplate.from_messages([
-        (
-            "system",
-            "Answer ONLY using the information below.\n\n"
-            "FULL CONTEXT:\n{all_context}\n\n"
-            "RETRIEVED CONTEXT:\n{context}\n"
-            "If query is not related to the context, please respond I don't know."
-        ),
-        ("placeholder", "{messages}")
-    ])
-
-    # Simple LCEL chain: prompt -> LLM
-    chain = prompt | llm
-
-    # Invoke the chain with the current graph state
-    response = await chain.ainvoke({
-        "context": state["context"],
-        "all_context": state["all_context"],
-        "messages": state["messages"]
-    })
-
-    return {"messages": [response]}
+    video_ids = state.get("video_ids") or []
+    with timed("prompt_build"):
+        history = history_window(state["messages"], settings.HISTORY_WINDOW_MESSAGES)
+        messages = build_answer_messages(video_ids, state["all_context"], state["context"], history)
+
+    # Chunks are re-emitted as custom events: a coalesced call runs no model
+    # of its own, so only custom events reach every stream sharing it
+    async def emit(content) -> None:
+        await adispatch_custom_event(ANSWER_TOKEN_EVENT, {"content": content})
+
+    response = await generate_answer(messages, video_ids, on_token=emit)
+
+    # Older messages are no longer needed in the persisted thread state
+    kept_ids = {message.id for message in history}
+    stale = [RemoveMessage(id=m.id) for m in state["messages"] if m.id not in kept_ids]
+
+    return {"messages": [*stale, response]}
@@ -0,0 +1,177 @@
+"""Graph node that reranks retrieved candidates and trims them to a token budget."""
+
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.messages import AIMessage
+
+from app.core.config import settings
+from app.core.observability import timed
+from app.core.resources import get_resources
+from app.services.graph.youtube_transcript_graph_state import RAGState
+from app.services.transcript_splitter_service import format_timestamp
+from app.services.video_digest_service import estimate_tokens
+from app.services.video_registry_service import collection_name_for
+
+
+logger = logging.getLogger(__name__)
+
+# Reply used when no retrieved chunk is relevant to the question
+NO_ANSWER = "I don't know. The video doesn't seem to cover that."
+
+
+def _normalize(vectors: List[List[float]]) -> np.ndarray:
+    matrix = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+def mmr_order(relevance: np.ndarray, doc_vectors: np.ndarray, mmr_lambda: float) -> List[int]:
+    """
+    Order candidates by maximal marginal relevance.
+
+    Each pick maximizes lambda * relevance - (1 - lambda) * (max similarity to
+    the chunks already picked), so near-duplicate (e.g. overlapping) chunks
+    do not crowd out other relevant parts of the video.
+    """
+    remaining = list(range(len(relevance)))
+    order: List[int] = []
+    redundancy = np.zeros(len(relevance), dtype=np.float32)
+    while remaining:
+        scores = mmr_lambda * relevance[remaining] - (1 - mmr_lambda) * redundancy[remaining]
+        best = remaining.pop(int(np.argmax(scores)))
+        order.append(best)
+        redundancy = np.maximum(redundancy, doc_vectors @ doc_vectors[best])
+    return order
+
+
+def _source(candidate: Dict) -> Dict:
+    """Citation for a chunk: its video, time range and a deep link to the start."""
+    metadata = candidate["metadata"]
+    video_id = metadata.get("video_id")
+    start = metadata.get("start_seconds")
+    source = {"video_id": video_id, "start": start, "end": metadata.get("end_seconds")}
+    if video_id:
+        url = f"https://www.youtube.com/watch?v={video_id}"
+        source["url"] = f"{url}&t={int(start)}s" if start is not None else url
+    return source
+
+
+def _format_chunk(candidate: Dict) -> str:
+    """Prefix a chunk with its start time so the LLM can cite moments."""
+    start = candidate["metadata"].get("start_seconds")
+    if start is None:
+        return candidate["text"]
+    return f"[{format_timestamp(start)}] {candidate['text']}"
+
+
+def mmr_rank(candidates: List[Dict], query_vector: List[float], doc_vectors: List[List[float]]) -> List[Dict]:
+    """Drop candidates below RERANK_MIN_RELEVANCE (cosine) and order the rest by MMR."""
+    query = _normalize([query_vector])[0]
+    docs = _normalize(doc_vectors)
+    relevance = docs @ query
+
+    relevant = [i for i in range(len(candidates)) if relevance[i] >= settings.RERANK_MIN_RELEVANCE]
+    if not relevant:
+        return []
+    order = mmr_order(relevance[relevant], docs[relevant], settings.RERANK_MMR_LAMBDA)
+    return [candidates[relevant[i]] for i in order]
+
+
+def stored_vectors(candidates: List[Dict]) -> List[Optional[List[float]]]:
+    """Embeddings of the candidates stored at ingest time, one read per video (None where not found)."""
+    ids_by_collection = defaultdict(list)
+    for candidate in candidates:
+        video_id = candidate["metadata"].get("video_id")
+        if candidate.get("id") and video_id:
+            ids_by_collection[collection_name_for(video_id)].append(candidate["id"])
+    vector_repo = get_resources().vector_repo
+    found: Dict[str, List[float]] = {}
+    for collection_name, ids in ids_by_collection.items():
+        found.update(vector_repo.get_vectors(collection_name, ids))
+    return [found.get(candidate.get("id")) for candidate in candidates]
+
+
+def fit_token_budget(ranked: List[Dict]) -> Tuple[List[Dict], int]:
+    """Take ranked candidates until RERANK_TOKEN_BUDGET is reached; return them and their tokens."""
+    selected, used = [], 0
+    for candidate in ranked:
+        cost = estimate_tokens(candidate["text"])
+        # Always keep the best chunk, even if it alone exceeds the budget
+        if selected and used + cost > settings.RERANK_TOKEN_BUDGET:
+            break
+        selected.append(candidate)
+        used += cost
+    return selected, used
+
+
+def format_context(selected: List[Dict]) -> str:
+    """The prompt's retrieved-context section: selected chunks tagged with their timestamps."""
+    return "\n---\n".join(_format_chunk(c) for c in selected)
+
+
+def sources_for(selected: List[Dict]) -> List[Dict]:
+    """Citations (video, time range, deep link) of the selected chunks."""
+    return [_source(c) for c in selected]
+
+
+async def rerank_node(state: RAGState) -> dict:
+    """
+    Rescore the over-fetched candidates and keep what fits the token budget.
+
+    Candidates are scored by cosine similarity to the question; those below
+    RERANK_MIN_RELEVANCE are dropped and the rest are taken in MMR order until
+    RERANK_TOKEN_BUDGET is reached. The candidates' vectors are read back from
+    Chroma rather than embedded again. Lexical fast-path candidates are
+    already known to match, so they keep their order and skip this step.
+
+    Returns:
+        dict with:
+        - context: the selected chunks, tagged with their timestamps
+          (empty when nothing is relevant, which routes to no_answer)
+        - sources: time range and deep link of each selected chunk
+        - candidates: cleared, so they are not kept in the checkpoint.
+    """
+    with timed("rerank"):
+        candidates = state.get("candidates") or []
+        query = state["messages"][-1].content
+
+        if candidates and not state.get("fast_path"):
+            # Retrieval embedded the same query, so this is a cache hit
+            embeddings = get_resources().embeddings
+            query_vector = await embeddings.aembed_query(query)
+            doc_vectors = await asyncio.to_thread(stored_vectors, candidates)
+            missing = [i for i, vector in enumerate(doc_vectors) if vector is None]
+            if missing:
+                # Chunks without an ID (older lexical index files) or swapped out since retrieval
+                embedded = await embeddings.aembed_documents([candidates[i]["text"] for i in missing])
+                for i, vector in zip(missing, embedded):
+                    doc_vectors[i] = vector
+            ranked = mmr_rank(candidates, query_vector, doc_vectors)
+        else:
+            ranked = candidates
+
+        selected, used = fit_token_budget(ranked)
+
+    logger.info(
+        f"[{state.get('request_id', '-')}] Reranked {len(candidates)} candidates "
+        f"to {len(selected)} chunks (~{used} tokens)"
+    )
+    return {
+        "context": format_context(selected),
+        "sources": sources_for(selected),
+        "candidates": [],
+    }
+
+
+def route_after_rerank(state: RAGState) -> str:
+    """Send the turn to the LLM only when some retrieved context is relevant."""
+    return "answer" if state.get("context") else "no_answer"
+
+
+async def no_answer_node(state: RAGState) -> dict:
+    """Answer "I don't know" without calling the LLM."""
+    return {"messages": [AIMessage(content=NO_ANSWER)], "context": "", "sources": []}
@@ -1,59 +1,190 @@
 """Graph node that retrieves relevant transcript chunks from Chroma."""
 
+import asyncio
 import logging
+import time
+from typing import List, Tuple
+
+from chromadb.errors import NotFoundError
+from langchain_core.documents import Document
 
 from app.core.config import settings
-from app.core.factory import get_embeddings
-from app.infrastructure.chroma.repository import ChromaVectorRepository
+from app.core.observability import observe, timed
+from app.core.resources import get_resources
 from app.services.graph.youtube_transcript_graph_state import RAGState
+from app.services.lexical_index_service import (
+    BM25Index,
+    is_decisive,
+    lexical_indexes,
+    reciprocal_rank_fusion,
+)
+from app.services.relevance_gate_service import relevance_gate, retrieval_features
+from app.services.video_digest_service import VideoDigestBuilder, digest_cache
+from app.services.video_registry_service import collection_name_for
 
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Shared vector repository reused across node invocations
-vector_repo = ChromaVectorRepository(
-    embeddings=get_embeddings(),
-    persist_dir=settings.CHROMA_PERSIST_DIR if settings.IS_CHROMA_PERSISTENT else None,
-)
+digest_builder = VideoDigestBuilder()
+
+
+def _stored_chunks(vector_store) -> List[Document]:
+    """Read every chunk of a collection back in transcript order."""
+    with timed("chroma_get"):
+        result = vector_store.get(include=["documents", "metadatas"])
+    chunks = [
+        Document(id=chunk_id, page_content=text, metadata=metadata or {})
+        for chunk_id, text, metadata in zip(result["ids"], result["documents"], result["metadatas"])
+    ]
+    chunks.sort(key=lambda chunk: chunk.metadata.get("chunk_index", 0))
+    return chunks
+
+
+def _load_video(vector_repo, vector_store, collection_name: str) -> Tuple[BM25Index, str]:
+    version = vector_repo.index_version(collection_name)
+    index = lexical_indexes.get(collection_name, version)
+    digest = digest_cache.get(collection_name, version)
+    if index is not None and digest is not None:
+        return index, digest
+
+    # Read the chunks once for whichever of the two is missing
+    chunks = _stored_chunks(vector_store)
+    if index is None:
+        index = BM25Index(chunks)
+        lexical_indexes.save(collection_name, index, version)
+        logger.info(f"Rebuilt BM25 index for '{collection_name}'")
+    if digest is None:
+        digest = digest_builder.build([chunk.page_content for chunk in chunks])
+        digest_cache.set(collection_name, digest, version)
+        logger.info(f"Rebuilt digest for '{collection_name}' from {len(chunks)} chunks")
+    return index, digest
+
+
+def load_video(vector_repo, collection_name: str) -> Tuple[BM25Index, str]:
+    """
+    Return a collection's BM25 index and digest (blocking; run it off the event loop).
+
+    Both are cached per index version (read first, so a re-index in between
+    only costs a rebuild later). A miss only happens after a restart
+    (persistent mode) or when ingestion ran in another process; the
+    collection's chunks are then read once and whatever was missing is
+    rebuilt from them and cached for later turns.
+    """
+    try:
+        return _load_video(vector_repo, vector_repo.get_vector_store(collection_name), collection_name)
+    except NotFoundError:
+        # Another worker rebuilt the collection since its handle was cached
+        return _load_video(vector_repo, vector_repo.refresh_vector_store(collection_name), collection_name)
+
+
+def chunk_key(doc: Document) -> str:
+    """Identity of a chunk across the dense and lexical result lists."""
+    metadata = doc.metadata or {}
+    if "chunk_index" in metadata:
+        return f"{metadata.get('video_id')}:{metadata['chunk_index']}"
+    return doc.page_content
+
+
+def fuse_hybrid(per_video: List[Tuple[List, List]]) -> List[Document]:
+    """
+    Merge each video's (dense hits, lexical hits) with reciprocal rank fusion.
+
+    Returns the RERANK_CANDIDATES best chunks across all videos.
+    """
+    fused_scores = {}
+    chunks_by_key = {}
+    for dense, hits in per_video:
+        rankings = [
+            [chunk_key(doc) for doc, _ in dense],
+            [chunk_key(doc) for doc, _ in hits],
+        ]
+        for doc, _ in [*dense, *hits]:
+            chunks_by_key.setdefault(chunk_key(doc), doc)
+        fused_scores.update(reciprocal_rank_fusion(rankings))
+
+    ranked = sorted(fused_scores, key=fused_scores.get, reverse=True)
+    return [chunks_by_key[key] for key in ranked[:settings.RERANK_CANDIDATES]]
 
 
 async def retrieve_node(state: RAGState) -> dict:
     """
-    Retrieve relevant chunks from the vector store for the latest user message.
+    Retrieve relevant chunks for the latest user message from the thread's videos.
+
+    Only the collections of the videos bound to the thread are searched, so
+    the cost of a turn does not depend on how many videos are indexed overall.
+    Each video is searched lexically (BM25) first; when the lexical scores are
+    decisive the dense search (and its embedding round-trip) is skipped,
+    otherwise dense and lexical rankings are merged with reciprocal rank fusion.
 
     Returns:
         dict with:
-        - context: joined content of top‑k retrieved chunks
-        - all_context: concatenation of all stored documents, used as a
+        - candidates: up to RERANK_CANDIDATES chunks for the rerank node
+        - fast_path: whether the candidates come from the lexical fast path
+        - relevance: retrieval score features used by the off-topic gate
+        - all_context: the bounded digest of each bound video, used as a
           stronger guardrail in the answer node.
     """
-    logger.info("=== RETRIEVE NODE CALLED ===")
+    started = time.perf_counter()
+    request_id = state.get("request_id", "-")
 
     # Use the latest message text as the retrieval query
     query = state["messages"][-1].content
+    candidates = settings.RETRIEVAL_CANDIDATES
+
+    # Shared repository; collection handles are cached across turns
+    vector_repo = get_resources().vector_repo
+    # Version reads and cache misses hit Chroma (and disk): keep them off the event loop
+    loaded = await asyncio.gather(*(
+        asyncio.to_thread(load_video, vector_repo, collection_name_for(video_id))
+        for video_id in state["video_ids"]
+    ))
+    lexical_hits = [index.search(query, k=candidates) for index, _ in loaded]
+    # Precomputed, size-bounded overview of each video for off‑topic detection
+    digests = [digest for _, digest in loaded]
+
+    merged_lexical = sorted((hit for hits in lexical_hits for hit in hits), key=lambda hit: -hit[1])
+    fast_path = is_decisive(merged_lexical)
+    dense_scores = []
+    if fast_path:
+        # Fast path: keyword match is unambiguous, no embedding call needed
+        docs = [doc for doc, _ in merged_lexical[:settings.RERANK_CANDIDATES]]
+        logger.info(f"[{request_id}] Lexical fast path: {len(docs)} documents")
+    else:
+        per_video = []
+        for video_id, hits in zip(state["video_ids"], lexical_hits):
+            with timed("chroma_query"):
+                collection_name = collection_name_for(video_id)
+                try:
+                    # In-process hot index when enabled, Chroma otherwise
+                    dense = await vector_repo.asimilarity_search(collection_name, query, k=candidates)
+                except NotFoundError:
+                    vector_repo.refresh_vector_store(collection_name)
+                    dense = await vector_repo.asimilarity_search(collection_name, query, k=candidates)
+            dense_scores.extend(score for _, score in dense)
+            per_video.append((dense, hits))
+        docs = fuse_hybrid(per_video)
+        logger.info(f"[{request_id}] Hybrid retrieval: {len(docs)} documents from {len(state['video_ids'])} video(s)")
+
+    all_context = "\n===\n".join(d for d in digests if d)
+
+    observe("retrieve", time.perf_counter() - started)
+    return {
+        "candidates": [{"id": d.id, "text": d.page_content, "metadata": d.metadata or {}} for d in docs],
+        "fast_path": fast_path,
+        "relevance": retrieval_features(dense_scores, [score for _, score in merged_lexical]),
+        "all_context": all_context,
+    }
+
+
+def route_after_retrieve(state: RAGState) -> str:
+    """
+    Refuse clearly off-topic questions before reranking or the LLM run.
 
-    vector_store = vector_repo.get_vector_store(collection_name="youtube_transcripts")
-
-    # Asynchronous retriever over Chroma via LangChain
-    retriever = vector_store.as_retriever(search_kwargs={"k": 5})
-    docs = await retriever.ainvoke(query)
-    logger.info(f"Retrieved {len(docs)} documents from vector store")
-
-    # Join retrieved pages into a single context string
-    context = "\n---\n".join(d.page_content for d in docs)
-    logger.info(f"retrieved data : {context}")
-
-    try:
-        # Optionally pull all stored documents for stricter off‑topic detection
-        all_docs_result = vector_store.get(include=["documents"])
-        all_context = "\n---\n".join(all_docs_result["documents"])
-
-        logger.info(f"Retrieved total {len(all_docs_result['documents'])} documents for all_context")
-
-    except Exception as e:
-        logger.warning(f"Could not retrieve all context: {e}")
-        all_context = context
-
-    logger.info("Retrieved relevant + full context")
-    return {"context": context, "all_context": all_context}
\ No newline at end of file
+    A decisive keyword match is on topic by definition; otherwise the
+    relevance gate judges the dense and lexical retrieval scores.
+    """
+    if state.get("fast_path") or relevance_gate.is_relevant(state["relevance"]):
+        return "rerank"
+    logger.info(f"[{state.get('request_id', '-')}] Off-topic question refused by the relevance gate: {state['relevance']}")
+    return "no_answer"
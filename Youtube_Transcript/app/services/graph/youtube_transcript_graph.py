@@ -1,28 +1,78 @@
 """LangGraph definition for the YouTube transcript RAG pipeline.
 
 The graph is intentionally simple:
-- retrieve_node: pulls relevant chunks from the vector store
-- answer_node: calls the LLM with strict context-only instructions.
+- retrieve_node: pulls candidate chunks from the vector store; clearly
+  off-topic questions are routed straight to no_answer by the relevance gate
+- rerank_node: rescores candidates and trims them to a token budget
+- answer_node: calls the LLM with strict context-only instructions
+- no_answer_node: replies "I don't know" when nothing relevant was found.
 """
 
-from langgraph.checkpoint.memory import MemorySaver
+import asyncio
+from typing import Optional
+
 from langgraph.graph import END, START, StateGraph
+from langgraph.graph.state import CompiledStateGraph
 
+from app.services.graph.checkpointer import (
+    IdleThreadEvictor,
+    close_checkpointer,
+    create_checkpointer,
+)
 from app.services.graph.nodes.answer_node import answer_node
-from app.services.graph.nodes.retrieve_node import retrieve_node
+from app.services.graph.nodes.rerank_node import (
+    no_answer_node,
+    rerank_node,
+    route_after_rerank,
+)
+from app.services.graph.nodes.retrieve_node import retrieve_node, route_after_retrieve
 from app.services.graph.youtube_transcript_graph_state import RAGState
 
 
-# Build a simple 2‑node graph: retrieve -> answer
+# retrieve -> rerank -> answer, or -> no_answer when nothing is relevant
+# (decided from retrieval scores, or from the reranked chunks)
 builder = StateGraph(RAGState)
 
 builder.add_node("retrieve", retrieve_node)
+builder.add_node("rerank", rerank_node)
 builder.add_node("answer", answer_node)
+builder.add_node("no_answer", no_answer_node)
 
 builder.add_edge(START, "retrieve")
-builder.add_edge("retrieve", "answer")
+builder.add_conditional_edges("retrieve", route_after_retrieve, ["rerank", "no_answer"])
+builder.add_conditional_edges("rerank", route_after_rerank, ["answer", "no_answer"])
 builder.add_edge("answer", END)
+builder.add_edge("no_answer", END)
+
+# Compiled lazily: the SQLite checkpointer must be created inside the event loop
+_graph: Optional[CompiledStateGraph] = None
+_evictor: Optional[IdleThreadEvictor] = None
+_graph_lock = asyncio.Lock()
+
+
+async def get_graph() -> CompiledStateGraph:
+    """Return the compiled graph, creating its checkpointer on first use."""
+    global _graph, _evictor
+    if _graph is None:
+        async with _graph_lock:
+            if _graph is None:
+                # Durable (SQLite) or in‑memory checkpointer with per‑thread history
+                checkpointer = await create_checkpointer()
+                _evictor = IdleThreadEvictor(checkpointer)
+                _graph = builder.compile(checkpointer=checkpointer)
+    return _graph
+
+
+async def touch_thread(thread_id: str) -> None:
+    """Record thread activity so idle threads are eventually evicted."""
+    await get_graph()
+    await _evictor.touch(thread_id)
+
 
-# In‑memory checkpointer that keeps per‑thread message history
-memory = MemorySaver()
-graph = builder.compile(checkpointer=memory)
\ No newline at end of file
+async def close_graph() -> None:
+    """Close the checkpointer (called from the FastAPI lifespan on shutdown)."""
+    global _graph, _evictor
+    if _graph is not None:
+        await close_checkpointer(_graph.checkpointer)
+        _graph = None
+        _evictor = None
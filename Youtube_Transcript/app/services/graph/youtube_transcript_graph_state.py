@@ -3,7 +3,7 @@
 Each node in the graph reads from and writes to this TypedDict-based state.
 """
 
-from typing import Annotated, List, TypedDict
+from typing import Annotated, Dict, List, TypedDict
 
 from langchain_core.messages import BaseMessage
 from langgraph.graph import add_messages
@@ -13,11 +13,23 @@ class RAGState(TypedDict):
     """
     State that flows between graph nodes.
 
+    - request_id: ID of the HTTP request running this turn, for logs and metrics
     - messages: running chat history (user + assistant)
-    - context: retrieved chunk(s) for the current question
-    - all_context: concatenation of all stored chunks (used as extra guardrail)
+    - video_ids: videos bound to the thread; retrieval only searches these
+    - candidates: over-fetched chunks ({"id", "text", "metadata"}) awaiting reranking
+    - fast_path: True when the candidates come from a decisive keyword match
+    - relevance: retrieval score features read by the off-topic gate
+    - context: reranked chunk(s) for the current question
+    - all_context: bounded digest of the whole video (used as extra guardrail)
+    - sources: video_id/start/end/url of each retrieved chunk, for citations
     """
 
+    request_id: str
     messages: Annotated[List[BaseMessage], add_messages]
+    video_ids: List[str]
+    candidates: List[Dict]
+    fast_path: bool
+    relevance: Dict[str, float]
     context: str
     all_context: str
+    sources: List[Dict]
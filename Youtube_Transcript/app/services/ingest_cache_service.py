@@ -0,0 +1,161 @@
+"""Content-addressed cache that lets /init reuse an already-indexed video.
+
+The cache key combines the video ID with everything that affects the stored
+vectors (chunking parameters and embedding provider/model). Bookkeeping lives
+in the collection's own metadata, so the cache survives restarts whenever the
+Chroma backend does and needs no separate index file.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from typing import AbstractSet, Any, Dict, Optional
+
+from app.core.config import settings
+from app.core.observability import count_cache
+from app.core.interfaces.vector_store import VectorStore
+from app.infrastructure.chroma.lock import LockCancelledError
+from app.services.answer_cache_service import answer_cache
+from app.services.video_digest_service import digest_cache
+from app.services.video_registry_service import thread_registry
+
+
+logger = logging.getLogger(__name__)
+
+# Collection metadata keys used for cache bookkeeping
+INGEST_KEY = "ingest_key"
+VIDEO_ID = "video_id"
+CHUNK_COUNT = "chunk_count"
+CREATED_AT = "ingested_at"
+LAST_USED_AT = "last_used_at"
+
+
+class IngestCache:
+    """
+    Decides whether a video's collection can be reused and evicts stale ones.
+
+    Entries expire INGEST_CACHE_TTL_SECONDS after their last use; beyond
+    INGEST_CACHE_MAX_VIDEOS cached videos, the least recently used are dropped.
+    Lookups and evictions of a video run under its write lock (see
+    IngestPipeline.ingest), so no worker clears a video another one is reusing.
+    """
+
+    def __init__(
+        self,
+        repository: VectorStore,
+        ttl_seconds: Optional[int] = None,
+        max_videos: Optional[int] = None,
+        sweep_interval: Optional[float] = None,
+    ):
+        self.repository = repository
+        self.ttl_seconds = ttl_seconds or settings.INGEST_CACHE_TTL_SECONDS
+        self.max_videos = max_videos or settings.INGEST_CACHE_MAX_VIDEOS
+        self.sweep_interval = settings.INGEST_CACHE_SWEEP_SECONDS if sweep_interval is None else sweep_interval
+        self._last_sweep = 0.0
+        self._sweep_lock = threading.Lock()
+
+    @staticmethod
+    def key_for(video_id: str, splitter_signature: str) -> str:
+        """Return the cache key for a video under the current ingest settings."""
+        raw = "|".join([
+            video_id,
+            splitter_signature,
+            settings.EMBEDDING_PROVIDER,
+            settings.EMBEDDING_MODEL,
+        ])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+    def lookup(self, collection_name: str, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the collection metadata on a fresh hit, or None on a miss.
+
+        A hit refreshes the entry's last-used time so it stays out of eviction.
+        """
+        metadata = self.repository.get_collection_metadata(collection_name)
+        now = time.time()
+        if (
+            not metadata
+            or metadata.get(INGEST_KEY) != key
+            or now - metadata.get(LAST_USED_AT, 0) > self.ttl_seconds
+        ):
+            count_cache("ingest", hits=0, misses=1)
+            return None
+
+        count_cache("ingest", hits=1, misses=0)
+        metadata[LAST_USED_AT] = now
+        self.repository.update_collection_metadata(collection_name, metadata)
+        return metadata
+
+    def entry_metadata(self, video_id: str, key: str, chunk_count: int) -> Dict[str, Any]:
+        """Build the metadata to store on a freshly ingested collection."""
+        now = time.time()
+        return {
+            INGEST_KEY: key,
+            VIDEO_ID: video_id,
+            CHUNK_COUNT: chunk_count,
+            CREATED_AT: now,
+            LAST_USED_AT: now,
+        }
+
+    def sweep(self, cancel: Optional[threading.Event] = None) -> int:
+        """Run evict() unless this process already did in the last sweep_interval seconds."""
+        with self._sweep_lock:
+            now = time.time()
+            if now - self._last_sweep < self.sweep_interval:
+                return 0
+            self._last_sweep = now
+        return self.evict(cancel=cancel)
+
+    def evict(self, keep: AbstractSet[str] = frozenset(), cancel: Optional[threading.Event] = None) -> int:
+        """
+        Drop expired and least recently used cached collections; return how many.
+
+        Videos in keep (e.g. the ones a bulk run just indexed) are never
+        dropped; the size cap is met by evicting other videos first. A video
+        is only cleared under its write lock and if it was not used since it
+        was listed; one being ingested right now (lock held) is left alone.
+        Threads bound to an evicted video are unbound from it, so their next
+        question fails with "not initialized" instead of silently finding nothing.
+        """
+        now = time.time()
+        entries = []
+        for name in self.repository.list_collections():
+            metadata = self.repository.get_collection_metadata(name) or {}
+            if INGEST_KEY in metadata:
+                entries.append((metadata.get(LAST_USED_AT, 0), name, metadata.get(VIDEO_ID)))
+
+        # Oldest first; everything past the TTL or over the size cap goes
+        entries.sort()
+        overflow = max(0, len(entries) - self.max_videos)
+        evicted = 0
+        for last_used, name, video_id in entries:
+            if video_id in keep:
+                continue
+            if evicted < overflow or now - last_used > self.ttl_seconds:
+                if not self._clear_unused(name, last_used, cancel):
+                    continue
+                digest_cache.invalidate(name)
+                if video_id:
+                    answer_cache.invalidate(video_id)
+                    # Threads still bound to it would query an empty collection
+                    unbound = thread_registry.unbind_video(video_id)
+                    if unbound:
+                        logger.info(f"Unbound evicted video {video_id} from {unbound} thread(s)")
+                evicted += 1
+
+        if evicted:
+            logger.info(f"Ingest cache evicted {evicted} collection(s)")
+        return evicted
+
+    def _clear_unused(self, collection_name: str, last_used: float, cancel: Optional[threading.Event]) -> bool:
+        """Clear the collection unless it is locked or was used since last_used; return whether it was."""
+        try:
+            with self.repository.write_lock(collection_name, cancel=cancel, timeout_seconds=0):
+                metadata = self.repository.get_collection_metadata(collection_name) or {}
+                if INGEST_KEY not in metadata or metadata.get(LAST_USED_AT, 0) != last_used:
+                    return False
+                self.repository.clear_collection(collection_name)
+                return True
+        except (TimeoutError, LockCancelledError):
+            return False
@@ -0,0 +1,409 @@
+"""Background ingestion pipeline for YouTube transcripts.
+
+/init only validates the URL and enqueues an IngestJob; the blocking work
+(fetch, split, embed, index) runs on a worker thread pool so the event loop
+keeps serving /message requests while long videos are being indexed.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import AbstractSet, Any, Callable, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.factory import get_state_store
+from app.core.observability import observe
+from app.core.resources import get_resources
+from app.services.answer_cache_service import answer_cache
+from app.services.ingest_cache_service import CHUNK_COUNT, IngestCache
+from app.services.lexical_index_service import BM25Index, lexical_indexes
+from app.services.transcript_splitter_service import TranscriptSplitter
+from app.services.video_digest_service import VideoDigestBuilder, digest_cache
+from app.services.video_registry_service import collection_name_for, thread_registry
+from app.services.youtube_loader_service import YoutubeTranscriptLoader
+
+
+logger = logging.getLogger(__name__)
+
+# Pipeline stages in execution order, as reported by the status endpoint
+STAGES = ("fetch", "split", "embed", "index")
+
+
+def chunk_id(video_id: str, chunk: Any, taken: AbstractSet[str] = frozenset()) -> str:
+    """
+    Content hash identifying a chunk across re-ingests.
+
+    Covers the embedding model, the video, the chunk's time span and text, so
+    an ID found in the stored index means its stored vector is still valid.
+    IDs already in taken (identical chunks) get the chunk's position appended.
+    """
+    start = chunk.metadata.get("start_seconds")
+    raw = "|".join([
+        f"{settings.EMBEDDING_PROVIDER}:{settings.EMBEDDING_MODEL}",
+        video_id,
+        str(start if start is not None else chunk.metadata.get("chunk_index")),
+        str(chunk.metadata.get("end_seconds")),
+        chunk.page_content,
+    ])
+    digest = hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+    if digest in taken:
+        digest = f"{digest}-{chunk.metadata.get('chunk_index')}"
+    return digest
+
+
+class IngestJob:
+    """Mutable progress record for one /init request."""
+
+    def __init__(self, url: str, video_id: str, thread_id: Optional[str], append: bool):
+        self.id = uuid.uuid4().hex
+        self.url = url
+        self.video_id = video_id
+        self.thread_id = thread_id
+        self.append = append
+
+        self.status = "queued"  # queued, running, ready, failed
+        self.cached = False
+        self.error: Optional[str] = None
+        self.video_ids: List[str] = []
+        self.chunks_total = 0
+        self.chunks_embedded = 0
+        self.chunks_indexed = 0
+        # Chunks whose stored vectors were kept by an incremental re-index
+        self.chunks_reused = 0
+        self.stages: Dict[str, dict] = {
+            name: {"status": "pending", "seconds": None} for name in STAGES
+        }
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._stage_started: Dict[str, float] = {}
+        # Called on every stage change, e.g. to publish progress to other workers
+        self.on_change: Optional[Callable[["IngestJob"], None]] = None
+
+    def changed(self) -> None:
+        if self.on_change is not None:
+            self.on_change(self)
+
+    def start_stage(self, name: str) -> None:
+        with self._lock:
+            self._stage_started[name] = time.perf_counter()
+            self.stages[name]["status"] = "running"
+        self.changed()
+
+    def finish_stage(self, name: str) -> None:
+        with self._lock:
+            elapsed = time.perf_counter() - self._stage_started.get(name, time.perf_counter())
+            self.stages[name] = {"status": "done", "seconds": round(elapsed, 3)}
+        observe(name, elapsed)
+        self.changed()
+
+    def add_embedded(self, count: int) -> None:
+        with self._lock:
+            self.chunks_embedded += count
+
+    def to_dict(self) -> dict:
+        """Serializable snapshot used by the status endpoint."""
+        with self._lock:
+            return {
+                "job_id": self.id,
+                "status": self.status,
+                "video_id": self.video_id,
+                "thread_id": self.thread_id,
+                "video_ids": list(self.video_ids),
+                "cached": self.cached,
+                "error": self.error,
+                "stages": {name: dict(stage) for name, stage in self.stages.items()},
+                "chunks_total": self.chunks_total,
+                "chunks_embedded": self.chunks_embedded,
+                "chunks_indexed": self.chunks_indexed,
+                "chunks_reused": self.chunks_reused,
+                "created_at": self.created_at,
+                "finished_at": self.finished_at,
+            }
+
+
+class IngestPipeline:
+    """
+    Runs a single ingest job end to end (blocking; call from a worker thread).
+
+    Embedding overlaps with splitting: every time a full batch of chunks has
+    been produced it is handed to the embedding pool while splitting goes on.
+    The embeddings client and vector repository are the app-scoped ones
+    shared with the chat graph.
+    """
+
+    def __init__(self):
+        self.loader = YoutubeTranscriptLoader()
+        self.splitter = TranscriptSplitter()
+        self.digest_builder = VideoDigestBuilder()
+        self._ingest_cache: Optional[IngestCache] = None
+        self.embed_pool = self._new_embed_pool()
+        # One ingest per video at a time; later jobs then hit the ingest cache
+        self._video_locks: Dict[str, threading.Lock] = defaultdict(threading.Lock)
+        self._video_locks_guard = threading.Lock()
+        # Set on shutdown: ingests waiting for another worker's write lock give up
+        self.stopping = threading.Event()
+
+    @property
+    def embeddings(self):
+        return get_resources().embeddings
+
+    @property
+    def vector_repo(self):
+        return get_resources().vector_repo
+
+    @property
+    def ingest_cache(self) -> IngestCache:
+        # Rebuilt only if the app resources (and so the repository) were reopened
+        repository = self.vector_repo
+        if self._ingest_cache is None or self._ingest_cache.repository is not repository:
+            self._ingest_cache = IngestCache(repository)
+        return self._ingest_cache
+
+    @staticmethod
+    def _new_embed_pool() -> ThreadPoolExecutor:
+        return ThreadPoolExecutor(
+            max_workers=settings.EMBEDDING_MAX_CONCURRENCY,
+            thread_name_prefix="embed",
+        )
+
+    def shutdown(self) -> None:
+        """Stop the embedding pool's threads (a fresh pool takes over if reused)."""
+        pool, self.embed_pool = self.embed_pool, self._new_embed_pool()
+        pool.shutdown(wait=True, cancel_futures=True)
+        self.stopping.clear()
+
+    def _embed_batch(self, job: IngestJob, chunks: List) -> List[List[float]]:
+        vectors = self.embeddings.embed_documents([chunk.page_content for chunk in chunks])
+        job.add_embedded(len(chunks))
+        return vectors
+
+    def _reuse_cached(self, job: IngestJob, collection_name: str, cache_key: str) -> bool:
+        """Mark the job as an ingest cache hit if the video is already indexed."""
+        cached = self.ingest_cache.lookup(collection_name, cache_key)
+        if cached is None:
+            return False
+        job.cached = True
+        job.chunks_total = job.chunks_embedded = job.chunks_indexed = cached.get(CHUNK_COUNT, 0)
+        for name in STAGES:
+            job.stages[name]["status"] = "skipped"
+        return True
+
+    def run(self, job: IngestJob) -> None:
+        """Ingest the job's video, bind it to the job's thread and evict stale videos."""
+        self.ingest(job)
+
+        # Point the thread at this video so its questions query it
+        job.video_ids = thread_registry.bind(job.thread_id, job.video_id, append=job.append)
+
+        # Keep the persist dir bounded by dropping stale cached videos (throttled)
+        self.ingest_cache.sweep(cancel=self.stopping)
+
+    def ingest(self, job: IngestJob) -> None:
+        """Index the job's video, or mark every stage skipped on an ingest cache hit."""
+        collection_name = collection_name_for(job.video_id)
+        cache_key = self.ingest_cache.key_for(job.video_id, self.splitter.signature)
+
+        with self._video_locks_guard:
+            video_lock = self._video_locks[job.video_id]
+
+        # Other workers may be indexing the same video (rebuild it only once)
+        # or evicting it (not while it is being marked used here)
+        with video_lock, self.vector_repo.write_lock(collection_name, cancel=self.stopping):
+            # Reuse an existing index of this video when nothing relevant changed
+            if self._reuse_cached(job, collection_name, cache_key):
+                return
+            self._build(job, collection_name, cache_key)
+
+    def _build(self, job: IngestJob, collection_name: str, cache_key: str) -> None:
+        """
+        Fetch, split, embed and index the job's video (under its write lock).
+
+        Chunks already in the video's index (same content hash) keep their
+        stored vectors; only new or changed chunks are embedded. The rebuilt
+        index is swapped in atomically, and nothing is rewritten at all when
+        the chunks are unchanged.
+        """
+        existing = set(self.vector_repo.get_chunk_ids(collection_name))
+
+        # 1) Fetch the timed caption segments for the URL
+        job.start_stage("fetch")
+        segments = self.loader.load_segments(job.url)
+        job.finish_stage("fetch")
+
+        # 2 + 3) Pack segments into chunks, embedding full batches of new chunks while splitting continues
+        job.start_stage("split")
+        job.start_stage("embed")
+        chunks, ids, batch, futures = [], [], [], []
+        seen = set()
+        for chunk in self.splitter.iter_split(segments, {"source": job.video_id}):
+            # Remember transcript order so the digest can be rebuilt faithfully
+            chunk.metadata["chunk_index"] = len(chunks)
+            chunk.metadata["video_id"] = job.video_id
+            ids.append(chunk_id(job.video_id, chunk, taken=seen))
+            seen.add(ids[-1])
+            # Carried by the lexical index's hits, so reranking can look up stored vectors
+            chunk.id = ids[-1]
+            chunks.append(chunk)
+            job.chunks_total = len(chunks)
+            if ids[-1] in existing:
+                continue
+            batch.append(chunk)
+            if len(batch) >= settings.EMBEDDING_BATCH_SIZE:
+                futures.append(self.embed_pool.submit(self._embed_batch, job, batch))
+                batch = []
+        if batch:
+            futures.append(self.embed_pool.submit(self._embed_batch, job, batch))
+        job.finish_stage("split")
+        if not chunks:
+            raise ValueError(f"No transcript text found for video '{job.video_id}'")
+
+        embedded = iter([vector for future in futures for vector in future.result()])
+        reused = self.vector_repo.get_vectors(collection_name, [i for i in ids if i in existing])
+        job.chunks_reused = len(reused)
+        vectors = [reused[i] if i in reused else next(embedded) for i in ids]
+        job.finish_stage("embed")
+
+        # 4) Persist chunks into this video's collection (other videos untouched)
+        job.start_stage("index")
+        collection_metadata = self.ingest_cache.entry_metadata(job.video_id, cache_key, len(chunks))
+        unchanged = set(ids) == existing and len(reused) == len(ids)
+        if unchanged:
+            # Same chunks as the live index: only the cache bookkeeping is new
+            self.vector_repo.update_collection_metadata(collection_name, collection_metadata)
+        else:
+            self.vector_repo.save(
+                documents=chunks,
+                collection_name=collection_name,
+                clear_existing=True,
+                collection_metadata=collection_metadata,
+                vectors=vectors,
+                ids=ids,
+            )
+        # Sparse keyword index alongside the vectors, for hybrid retrieval
+        version = self.vector_repo.index_version(collection_name)
+        lexical_indexes.save(collection_name, BM25Index(chunks), version)
+        job.chunks_indexed = len(chunks)
+        job.finish_stage("index")
+
+        if not unchanged:
+            # Answers computed from the previous index may no longer be right
+            answer_cache.invalidate(job.video_id)
+
+        # Build the size-bounded digest once, instead of on every turn
+        digest_cache.set(
+            collection_name,
+            self.digest_builder.build([chunk.page_content for chunk in chunks]),
+            version,
+        )
+
+
+class IngestJobManager:
+    """
+    Queues ingest jobs on a thread pool and keeps a bounded job history.
+
+    Job progress is also published to the shared state store (if any), so a
+    status poll answered by another worker process still finds the job.
+    """
+
+    def __init__(self, pipeline: IngestPipeline, max_workers: int, history: int):
+        self.pipeline = pipeline
+        self.history = history
+        self.max_workers = max_workers
+        self._executor = self._new_executor()
+        self._jobs: "OrderedDict[str, IngestJob]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, url: str, video_id: str, thread_id: str, append: bool = False) -> IngestJob:
+        """Create a job, schedule it off the event loop and return it immediately."""
+        job = IngestJob(url, video_id, thread_id, append)
+        job.on_change = self._publish
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        self._publish(job)
+        self._executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id: str) -> Optional[IngestJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def snapshot(self, job_id: str) -> Optional[dict]:
+        """Status of a job run by this process or, failing that, by another worker."""
+        job = self.get(job_id)
+        if job is not None:
+            return job.to_dict()
+        store = get_state_store()
+        return store.get_job(job_id) if store is not None else None
+
+    def _publish(self, job: IngestJob) -> None:
+        store = get_state_store()
+        if store is not None:
+            store.save_job(job.to_dict(), self.history)
+
+    def _new_executor(self) -> ThreadPoolExecutor:
+        return ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="ingest")
+
+    def shutdown(self) -> None:
+        """
+        Drop queued jobs, wait for running ones and stop the worker threads.
+
+        Dropped jobs are marked failed (and published), so their status polls
+        do not report them queued forever. Fresh (idle, thread-less) pools
+        take over, so the manager stays usable if the app is started again in
+        the same process.
+        """
+        executor, self._executor = self._executor, self._new_executor()
+        # Jobs waiting for another worker's write lock would block this for up to its timeout
+        self.pipeline.stopping.set()
+        executor.shutdown(wait=True, cancel_futures=True)
+        self.pipeline.shutdown()
+
+        # Every job that was not cancelled has finished by now
+        with self._lock:
+            dropped = [job for job in self._jobs.values() if job.status == "queued"]
+        for job in dropped:
+            job.status = "failed"
+            job.error = "Cancelled: the server shut down before the job started"
+            job.finished_at = time.time()
+            job.changed()
+        if dropped:
+            logger.info(f"Cancelled {len(dropped)} queued ingest job(s) on shutdown")
+
+    def _prune(self) -> None:
+        # Forget the oldest finished jobs once the history is full
+        for job_id in list(self._jobs):
+            if len(self._jobs) <= self.history:
+                break
+            if self._jobs[job_id].status in ("ready", "failed"):
+                del self._jobs[job_id]
+
+    def _run(self, job: IngestJob) -> None:
+        job.status = "running"
+        job.changed()
+        try:
+            self.pipeline.run(job)
+            job.status = "ready"
+        except Exception as e:
+            logger.exception(f"Ingest job {job.id} for video {job.video_id} failed")
+            job.error = str(e)
+            job.status = "failed"
+            for stage in job.stages.values():
+                if stage["status"] == "running":
+                    stage["status"] = "failed"
+        finally:
+            job.finished_at = time.time()
+            job.changed()
+
+
+# Shared job manager used by the /init routes
+ingest_jobs = IngestJobManager(
+    IngestPipeline(),
+    max_workers=settings.INGEST_MAX_WORKERS,
+    history=settings.INGEST_JOB_HISTORY,
+)
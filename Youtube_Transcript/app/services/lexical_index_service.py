@@ -0,0 +1,180 @@
+"""In-process BM25 index per collection for lexical (keyword) retrieval.
+
+Dense embeddings are weak on exact names, numbers and jargon, which video
+transcripts are full of. A BM25 index is built at ingest time next to each
+Chroma collection, persisted beside CHROMA_PERSIST_DIR, and fused with the
+dense results at query time.
+"""
+
+import json
+import logging
+import math
+import os
+import re
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+from app.core.config import settings
+from app.infrastructure.chroma.client import chroma_mode
+
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word/number tokens."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+class BM25Index:
+    """Okapi BM25 over a fixed list of documents (k1=1.5, b=0.75)."""
+
+    def __init__(self, documents: List[Document], k1: float = 1.5, b: float = 0.75):
+        self.documents = documents
+        self.k1 = k1
+        self.b = b
+
+        self._term_freqs = [Counter(tokenize(doc.page_content)) for doc in documents]
+        self._lengths = [sum(freqs.values()) for freqs in self._term_freqs]
+        self._avg_length = (sum(self._lengths) / len(self._lengths)) if documents else 0.0
+
+        doc_freqs: Counter = Counter()
+        for freqs in self._term_freqs:
+            doc_freqs.update(freqs.keys())
+        count = len(documents)
+        self._idf = {
+            term: math.log(1 + (count - df + 0.5) / (df + 0.5))
+            for term, df in doc_freqs.items()
+        }
+
+    def search(self, query: str, k: int) -> List[Tuple[Document, float]]:
+        """Return up to k (document, score) pairs with a positive score, best first."""
+        terms = [term for term in set(tokenize(query)) if term in self._idf]
+        if not terms:
+            return []
+
+        scores = []
+        for position, freqs in enumerate(self._term_freqs):
+            norm = self.k1 * (1 - self.b + self.b * self._lengths[position] / (self._avg_length or 1))
+            score = 0.0
+            for term in terms:
+                tf = freqs.get(term)
+                if tf:
+                    score += self._idf[term] * tf * (self.k1 + 1) / (tf + norm)
+            if score > 0:
+                scores.append((score, position))
+
+        scores.sort(reverse=True)
+        return [(self.documents[position], score) for score, position in scores[:k]]
+
+    def to_rows(self) -> List[dict]:
+        return [{"id": doc.id, "text": doc.page_content, "metadata": doc.metadata} for doc in self.documents]
+
+    @classmethod
+    def from_rows(cls, rows: List[dict]) -> "BM25Index":
+        return cls([
+            Document(id=row.get("id"), page_content=row["text"], metadata=row["metadata"]) for row in rows
+        ])
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_rows())
+
+    @classmethod
+    def from_json(cls, payload: str) -> "BM25Index":
+        return cls.from_rows(json.loads(payload))
+
+
+class LexicalIndexStore:
+    """
+    Per-collection BM25 indexes, cached in process and optionally on disk.
+
+    Files live in <CHROMA_PERSIST_DIR>/bm25/ when Chroma is persistent, so the
+    lexical index survives restarts together with the vectors it mirrors.
+
+    Each index is stored with the index version of the collection it was
+    built from, and get() ignores it once the collection's version differs
+    (e.g. another worker re-indexed the video).
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory
+        self._indexes: Dict[str, Tuple[str, BM25Index]] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, collection_name: str) -> Optional[str]:
+        if not self.directory:
+            return None
+        return os.path.join(self.directory, f"{collection_name}.json")
+
+    def save(self, collection_name: str, index: BM25Index, version: str) -> None:
+        path = self._path(collection_name)
+        if path:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as handle:
+                json.dump({"version": version, "documents": index.to_rows()}, handle)
+            os.replace(tmp_path, path)
+        with self._lock:
+            self._indexes[collection_name] = (version, index)
+
+    def get(self, collection_name: str, version: str) -> Optional[BM25Index]:
+        """Return the index built from this version of the collection (memory, then disk), or None."""
+        with self._lock:
+            entry = self._indexes.get(collection_name)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+
+        path = self._path(collection_name)
+        if not path or not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as handle:
+            payload = json.load(handle)
+        # Files written before versions were recorded are a plain list of rows
+        if not isinstance(payload, dict) or payload.get("version") != version:
+            return None
+        index = BM25Index.from_rows(payload["documents"])
+        with self._lock:
+            self._indexes[collection_name] = (version, index)
+        return index
+
+    def invalidate(self, collection_name: str) -> None:
+        """Forget a collection's index (memory and disk), e.g. when it is rewritten."""
+        with self._lock:
+            self._indexes.pop(collection_name, None)
+        path = self._path(collection_name)
+        if path and os.path.exists(path):
+            os.remove(path)
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int = 60) -> Dict[str, float]:
+    """Fuse several ranked lists of keys into RRF scores (higher is better)."""
+    fused: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, key in enumerate(ranking):
+            fused[key] = fused.get(key, 0.0) + 1.0 / (k + rank + 1)
+    return fused
+
+
+def is_decisive(hits: List[Tuple[Document, float]]) -> bool:
+    """
+    True when lexical scores alone clearly identify the best chunk.
+
+    The top hit must score at least BM25_DECISIVE_MIN_SCORE and beat the
+    runner-up by BM25_DECISIVE_RATIO, so the dense search can be skipped.
+    """
+    if not settings.BM25_FAST_PATH_ENABLED or not hits:
+        return False
+    top = hits[0][1]
+    runner_up = hits[1][1] if len(hits) > 1 else 0.0
+    return top >= settings.BM25_DECISIVE_MIN_SCORE and top >= settings.BM25_DECISIVE_RATIO * runner_up
+
+
+# Shared store used by ingestion, retrieval and the repository
+lexical_indexes = LexicalIndexStore(
+    os.path.join(settings.CHROMA_PERSIST_DIR, "bm25") if chroma_mode() == "persistent" else None
+)
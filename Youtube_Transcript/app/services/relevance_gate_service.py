@@ -0,0 +1,76 @@
+"""Retrieval-score gate that refuses off-topic questions before any LLM work.
+
+Retrieval already tells us how close the question is to anything in the
+video. Questions whose best dense relevance score stays under
+RELEVANCE_GATE_THRESHOLD are answered "I don't know" straight away, skipping
+reranking and the LLM. Optionally a tiny logistic-regression classifier over
+the same retrieval features, fitted offline by app.cli.calibrate_relevance,
+replaces the single threshold.
+"""
+
+import json
+import logging
+import math
+import os
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+# Retrieval features, in the order the classifier weights refer to them
+FEATURES = ("top_dense", "mean_dense_top3", "top_lexical")
+
+
+def retrieval_features(dense_scores: List[float], lexical_scores: List[float]) -> Dict[str, float]:
+    """Summarize one retrieval's relevance scores (dense 0..1, BM25 unbounded)."""
+    dense = sorted(dense_scores, reverse=True)
+    return {
+        "top_dense": dense[0] if dense else 0.0,
+        "mean_dense_top3": sum(dense[:3]) / len(dense[:3]) if dense else 0.0,
+        # BM25 grows with query length, so compress it
+        "top_lexical": math.log1p(max(lexical_scores, default=0.0)),
+    }
+
+
+class RelevanceGate:
+    """
+    Decides from retrieval features whether a question is about the video.
+
+    Uses the classifier at model_path when that file exists, else the plain
+    top_dense >= threshold rule.
+    """
+
+    def __init__(self, threshold: Optional[float] = None, model_path: Optional[str] = None):
+        self.threshold = settings.RELEVANCE_GATE_THRESHOLD if threshold is None else threshold
+        self.model_path = model_path or settings.RELEVANCE_GATE_MODEL_PATH
+        self.model: Optional[dict] = None
+        self.reload()
+
+    def reload(self) -> None:
+        """(Re)load the calibrated classifier, if one was written."""
+        self.model = None
+        if self.model_path and os.path.exists(self.model_path):
+            with open(self.model_path, encoding="utf-8") as handle:
+                self.model = json.load(handle)
+            logger.info(f"Loaded relevance classifier from {self.model_path}")
+
+    def score(self, features: Dict[str, float]) -> float:
+        """Classifier probability of being on topic, or top_dense without a classifier."""
+        if self.model is None:
+            return features["top_dense"]
+        logit = self.model["bias"] + sum(
+            weight * features[name] for name, weight in zip(FEATURES, self.model["weights"])
+        )
+        return 1.0 / (1.0 + math.exp(-logit))
+
+    def is_relevant(self, features: Dict[str, float]) -> bool:
+        if not settings.RELEVANCE_GATE_ENABLED:
+            return True
+        threshold = self.model["threshold"] if self.model is not None else self.threshold
+        return self.score(features) >= threshold
+
+
+# Shared gate used by the graph's routing after retrieval
+relevance_gate = RelevanceGate()
@@ -0,0 +1,87 @@
+"""Timestamp-aware chunking of raw YouTube caption segments.
+
+Instead of flattening the transcript and cutting it every N characters, whole
+caption segments are packed into token-budgeted chunks. Chunk boundaries
+therefore always fall between segments, and every chunk keeps the start/end
+time of the speech it covers so answers can point back into the video.
+"""
+
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from langchain_core.documents import Document
+
+from app.core.config import settings
+from app.services.video_digest_service import estimate_tokens
+
+
+def format_timestamp(seconds: float) -> str:
+    """Render seconds as m:ss or h:mm:ss."""
+    seconds = int(seconds)
+    hours, remainder = divmod(seconds, 3600)
+    minutes, secs = divmod(remainder, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{secs:02d}"
+    return f"{minutes}:{secs:02d}"
+
+
+class TranscriptSplitter:
+    """
+    Packs consecutive caption segments into chunks of at most max_tokens.
+
+    The last overlap_segments segments of a chunk are repeated at the start of
+    the next one, so sentences spanning a boundary stay retrievable.
+    """
+
+    def __init__(self, max_tokens: Optional[int] = None, overlap_segments: Optional[int] = None):
+        self.max_tokens = max_tokens or settings.CHUNK_MAX_TOKENS
+        self.overlap_segments = (
+            settings.CHUNK_OVERLAP_SEGMENTS if overlap_segments is None else overlap_segments
+        )
+        # Identifies the chunking parameters, e.g. for ingest cache keys
+        self.signature = f"transcript-segments:{self.max_tokens}:{self.overlap_segments}"
+
+    def _chunk(self, segments: List[Dict], metadata: Dict) -> Document:
+        last = segments[-1]
+        return Document(
+            page_content=" ".join(segment["text"] for segment in segments),
+            metadata={
+                **metadata,
+                "start_seconds": float(segments[0]["start"]),
+                "end_seconds": float(last["start"] + last.get("duration", 0.0)),
+            },
+        )
+
+    def iter_split(self, segments: Iterable[Dict], metadata: Optional[Dict] = None) -> Iterator[Document]:
+        """
+        Lazily turn {"text", "start", "duration"} segments into chunks.
+
+        Only the segments of the chunk being built are held, so a transcript
+        is never materialized a second time as one big string.
+        """
+        metadata = metadata or {}
+        current: List[Dict] = []
+        tokens = 0
+        fresh = 0  # segments in `current` that were not carried over as overlap
+
+        for segment in segments:
+            text = " ".join(segment["text"].split())
+            if not text:
+                continue
+            segment = {**segment, "text": text}
+            cost = estimate_tokens(text)
+
+            if fresh and tokens + cost > self.max_tokens:
+                yield self._chunk(current, metadata)
+                current = current[-self.overlap_segments:] if self.overlap_segments else []
+                tokens = sum(estimate_tokens(s["text"]) for s in current)
+                fresh = 0
+                # Drop overlap that would not leave room for the new segment
+                while current and tokens + cost > self.max_tokens:
+                    tokens -= estimate_tokens(current.pop(0)["text"])
+
+            current.append(segment)
+            tokens += cost
+            fresh += 1
+
+        if fresh:
+            yield self._chunk(current, metadata)
@@ -0,0 +1,97 @@
+"""Builds and caches a compact "video digest" for each indexed collection.
+
+The digest is a size-bounded, representative subset of the transcript chunks
+that the answer node uses as a global overview of the video. It is computed
+once at ingest time so the per-turn prompt no longer grows with video length.
+"""
+
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+
+# Rough chars-per-token ratio for English text; good enough for budgeting
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate used for prompt budgeting (no tokenizer needed)."""
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+class VideoDigestBuilder:
+    """
+    Select an evenly spaced, in-order subset of chunks that fits a token budget.
+
+    Spreading the picks across the whole transcript gives the model a view of
+    the beginning, middle and end of the video instead of just its opening.
+    """
+
+    def __init__(self, token_budget: Optional[int] = None):
+        self.token_budget = token_budget or settings.DIGEST_TOKEN_BUDGET
+
+    def build(self, texts: List[str]) -> str:
+        """Return the digest text for an ordered list of chunk texts."""
+        texts = [t for t in texts if t and t.strip()]
+        if not texts:
+            return ""
+
+        total = sum(estimate_tokens(t) for t in texts)
+        if total <= self.token_budget:
+            return "\n---\n".join(texts)
+
+        # How many average-sized chunks fit, spaced evenly across the video
+        average = total / len(texts)
+        count = max(1, min(len(texts), int(self.token_budget // average)))
+        if count == 1:
+            indices = [0]
+        else:
+            step = (len(texts) - 1) / (count - 1)
+            indices = sorted({round(i * step) for i in range(count)})
+
+        selected: List[str] = []
+        used = 0
+        for index in indices:
+            cost = estimate_tokens(texts[index])
+            if used + cost > self.token_budget:
+                continue
+            selected.append(texts[index])
+            used += cost
+
+        if not selected:
+            # A single chunk is larger than the whole budget: truncate it
+            selected = [texts[0][: self.token_budget * CHARS_PER_TOKEN]]
+
+        return "\n---\n".join(selected)
+
+
+class VideoDigestCache:
+    """
+    Thread-safe in-process cache of digests keyed by collection name.
+
+    A digest is only returned for the index version it was built from, so a
+    video re-indexed by another worker process gets a fresh one.
+    """
+
+    def __init__(self):
+        self._digests: Dict[str, Tuple[str, str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, collection_name: str, version: str) -> Optional[str]:
+        with self._lock:
+            entry = self._digests.get(collection_name)
+        return entry[1] if entry is not None and entry[0] == version else None
+
+    def set(self, collection_name: str, digest: str, version: str) -> None:
+        with self._lock:
+            self._digests[collection_name] = (version, digest)
+
+    def invalidate(self, collection_name: str) -> None:
+        """Drop the cached digest, e.g. after the collection was rewritten."""
+        with self._lock:
+            self._digests.pop(collection_name, None)
+
+
+# Shared cache used by ingestion, retrieval and the repository
+digest_cache = VideoDigestCache()
@@ -0,0 +1,79 @@
+"""Maps videos to Chroma collections and chat threads to the videos they query.
+
+Each video is indexed into its own collection, so ingesting one video never
+touches another user's index and retrieval cost only depends on the videos a
+thread is bound to, not on the size of the whole corpus.
+"""
+
+import threading
+from typing import Dict, List
+
+from app.core.factory import get_state_store
+
+
+def collection_name_for(video_id: str) -> str:
+    """Return the Chroma collection name used for a single video."""
+    # Video IDs may end in "-" or "_", which Chroma rejects as a last character
+    return f"yt_{video_id}_idx"
+
+
+class ThreadVideoRegistry:
+    """
+    Thread-safe mapping of chat thread_id -> ordered list of bound video IDs.
+
+    Kept in the shared SQLite state store when there is one (so every worker
+    sees every binding), otherwise in process.
+    """
+
+    def __init__(self):
+        self._bindings: Dict[str, List[str]] = {}
+        self._lock = threading.Lock()
+
+    def bind(self, thread_id: str, video_id: str, append: bool = False) -> List[str]:
+        """
+        Bind a video to a thread and return the thread's resulting video list.
+
+        With append=False the thread is re-pointed at this video only; with
+        append=True the video is added alongside the ones already bound.
+        """
+        store = get_state_store()
+        if store is not None:
+            return store.bind(thread_id, video_id, append)
+        with self._lock:
+            videos = list(self._bindings.get(thread_id, [])) if append else []
+            if video_id not in videos:
+                videos.append(video_id)
+            self._bindings[thread_id] = videos
+            return list(videos)
+
+    def unbind_video(self, video_id: str) -> int:
+        """
+        Remove a video from every thread bound to it (its index is gone).
+
+        Threads left with no video must be initialized again; returns how
+        many threads were affected.
+        """
+        store = get_state_store()
+        if store is not None:
+            return store.unbind_video(video_id)
+        with self._lock:
+            affected = [thread_id for thread_id, videos in self._bindings.items() if video_id in videos]
+            for thread_id in affected:
+                videos = [v for v in self._bindings[thread_id] if v != video_id]
+                if videos:
+                    self._bindings[thread_id] = videos
+                else:
+                    del self._bindings[thread_id]
+            return len(affected)
+
+    def get(self, thread_id: str) -> List[str]:
+        """Return the video IDs a thread queries (empty if none are bound)."""
+        store = get_state_store()
+        if store is not None:
+            return store.thread_videos(thread_id)
+        with self._lock:
+            return list(self._bindings.get(thread_id, []))
+
+
+# Shared registry used by the ingest controller and the chat entrypoint
+thread_registry = ThreadVideoRegistry()
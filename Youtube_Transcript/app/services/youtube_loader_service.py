@@ -1,24 +1,87 @@
-"""Service that loads transcripts from YouTube into LangChain Document objects.
+"""Service that loads transcripts from YouTube.
 
-This is the only place where we directly call the YoutubeLoader; everything
-else receives already-loaded Document instances.
+This is the only place that fetches transcripts (through the
+TranscriptFetcher in app/infrastructure/transcripts); everything else receives
+already-loaded caption segments.
 """
 
+from typing import Dict, List, Optional
+
 from langchain_community.document_loaders import YoutubeLoader
 
+from app.infrastructure.transcripts.fetcher import TranscriptFetcher
+
+# Preferred caption languages, in order
+LANGUAGES: List[str] = ["en", "en-US"]
+
+
+def extract_video_id(url: str) -> str:
+    """
+    Normalize any supported YouTube URL form to its 11-character video ID.
+
+    Raises ValueError when no video ID can be found in the URL.
+    """
+    return YoutubeLoader.extract_video_id(url)
+
+
+def expand_video_ids(url: str, limit: Optional[int] = None) -> List[str]:
+    """
+    Resolve a video, playlist or channel URL to the video IDs it contains.
+
+    Single videos are recognized locally; playlists and channels are listed
+    with yt-dlp (flat extraction, so no video pages are downloaded).
+    """
+    try:
+        return [extract_video_id(url)]
+    except ValueError:
+        pass
+
+    import yt_dlp
+
+    options = {"extract_flat": True, "quiet": True, "skip_download": True}
+    if limit:
+        options["playlistend"] = limit
+    with yt_dlp.YoutubeDL(options) as ydl:
+        info = ydl.extract_info(url, download=False)
+        video_ids: List[str] = []
+        pending = list(info.get("entries") or [])
+        while pending and not (limit and len(video_ids) >= limit):
+            entry = pending.pop(0)
+            if not entry:
+                continue
+            if entry.get("entries"):
+                pending.extend(entry["entries"])
+            elif entry.get("ie_key") == "YoutubeTab" and entry.get("url"):
+                # Channels list their tabs (videos, shorts, ...) as nested playlists
+                nested = ydl.extract_info(entry["url"], download=False)
+                pending.extend(nested.get("entries") or [])
+            elif entry.get("id") and len(entry["id"]) == 11:
+                video_ids.append(entry["id"])
+
+    if not video_ids:
+        raise ValueError(f"No videos found for URL '{url}'")
+    return video_ids[:limit] if limit else video_ids
+
 
 class YoutubeTranscriptLoader:
-    """Thin wrapper around LangChain's YoutubeLoader."""
+    """Loads transcripts through the TranscriptFetcher (disk cache, retries, fallback sources)."""
+
+    def __init__(self, fetcher: Optional[TranscriptFetcher] = None):
+        self._fetcher = fetcher
+
+    @property
+    def fetcher(self) -> TranscriptFetcher:
+        # Built on the first fetch, not when the ingest pipeline is imported
+        if self._fetcher is None:
+            self._fetcher = TranscriptFetcher.from_settings()
+        return self._fetcher
 
-    def load(self, url: str):
+    def load_segments(self, url: str) -> List[Dict]:
         """
-        Fetch the transcript for a single YouTube URL.
+        Fetch the raw caption segments for a single YouTube URL.
 
-        Returns a list of LangChain Document objects containing the transcript.
+        Returns {"text", "start", "duration"} dicts (times in seconds) in
+        playback order, so timing information is preserved for chunking.
         """
-        loader = YoutubeLoader.from_youtube_url(
-            url,
-            add_video_info=False,
-            language=["en", "en-US"],
-        )
-        return loader.load()
+        _, segments = self.fetcher.fetch(extract_video_id(url), LANGUAGES)
+        return segments
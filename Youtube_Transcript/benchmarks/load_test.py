@@ -0,0 +1,273 @@
+"""Offline load test for /init and /message.
+
+Usage (from the Youtube_Transcript directory):
+    python -m benchmarks.load_test --videos 10 --users 20 --questions 200 --concurrency 16
+
+By default the app runs in-process with the fake LLM and embedding providers
+and synthetic transcripts, so no API key or network access is needed; the
+FAKE_* settings simulate provider latency. Pass --url to load-test a running
+server instead (it must be configured with TRANSCRIPT_SOURCE=synthetic).
+
+Phases:
+- init: ingest every synthetic video (submit + poll until ready)
+- bind: bind each simulated user's thread to a video (ingest cache hits)
+- message: ask on-topic and off-topic questions; a user's questions run in
+  order, different users run concurrently
+
+Reports p50/p95/p99 latency and throughput per phase plus process RSS, and
+exits non-zero when --thresholds are exceeded (used in CI).
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+import numpy as np
+
+
+OFF_TOPIC_QUESTIONS = [
+    "How do I bake sourdough bread at home?",
+    "What is the capital city of Australia?",
+    "Can you recommend a good laptop for gaming?",
+    "Who won the football world cup in 2014?",
+    "How many moons does Jupiter have?",
+]
+
+
+def _configure_offline() -> None:
+    """Point the in-process app at offline providers and throwaway storage."""
+    workdir = tempfile.mkdtemp(prefix="yt-bench-")
+    defaults = {
+        "OPENAI_API_KEY": "unused",
+        "HF_TOKEN": "unused",
+        "LLM_PROVIDER": "fake",
+        "EMBEDDING_PROVIDER": "fake",
+        "TRANSCRIPT_SOURCE": "synthetic",
+        "CHECKPOINTER_BACKEND": "memory",
+        "IS_CHROMA_PERSISTENT": "False",
+        "EMBEDDING_CACHE_PATH": os.path.join(workdir, "embeddings.sqlite3"),
+        "CHROMA_PERSIST_DIR": os.path.join(workdir, "chroma"),
+    }
+    for key, value in defaults.items():
+        os.environ.setdefault(key, value)
+
+
+def _rss_mb() -> Dict[str, Optional[float]]:
+    current = None
+    with contextlib.suppress(OSError):
+        with open("/proc/self/status", encoding="utf-8") as handle:
+            for line in handle:
+                if line.startswith("VmRSS:"):
+                    current = int(line.split()[1]) / 1024
+    # ru_maxrss is in KiB on Linux (bytes on macOS)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_mb = peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    return {"rss_mb": round(current, 1) if current else None, "peak_rss_mb": round(peak_mb, 1)}
+
+
+def _summary(latencies: List[float], errors: int, wall_seconds: float) -> dict:
+    values = np.asarray(latencies) * 1000 if latencies else np.zeros(1)
+    return {
+        "requests": len(latencies) + errors,
+        "errors": errors,
+        "wall_seconds": round(wall_seconds, 3),
+        "throughput_per_second": round(len(latencies) / wall_seconds, 2) if wall_seconds else 0.0,
+        "p50_ms": round(float(np.percentile(values, 50)), 1),
+        "p95_ms": round(float(np.percentile(values, 95)), 1),
+        "p99_ms": round(float(np.percentile(values, 99)), 1),
+        "mean_ms": round(float(values.mean()), 1),
+    }
+
+
+async def _run_phase(chains: List[List[Callable[[], Awaitable[None]]]], concurrency: int) -> dict:
+    """
+    Run request callables with bounded concurrency and summarize their latency.
+
+    Requests within a chain (e.g. one user's conversation) run in order;
+    chains run concurrently, at most `concurrency` requests at a time.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+
+    async def run(chain: List[Callable[[], Awaitable[None]]]) -> None:
+        nonlocal errors
+        for task in chain:
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    await task()
+                except Exception as e:
+                    errors += 1
+                    print(f"request failed: {e}", file=sys.stderr)
+                    continue
+                latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(run(chain) for chain in chains))
+    return _summary(latencies, errors, time.perf_counter() - started)
+
+
+def _video_url(index: int) -> str:
+    return f"https://www.youtube.com/watch?v=bench{index:06d}"
+
+
+async def _init(client: httpx.AsyncClient, url: str, thread_id: str) -> None:
+    response = await client.post("/api/v1/init", json={"url": url, "thread_id": thread_id})
+    response.raise_for_status()
+    job = response.json()
+    while job["status"] in ("queued", "running"):
+        await asyncio.sleep(0.02)
+        job = (await client.get(f"/api/v1/init/{job['job_id']}")).json()
+    if job["status"] != "ready":
+        raise RuntimeError(f"ingest failed: {job.get('error')}")
+
+
+def _questions(args: argparse.Namespace) -> Dict[int, List[dict]]:
+    """Questions per user: on-topic ones reuse topic words of one transcript segment."""
+    from app.infrastructure.fake.transcripts import synthetic_segments, topic_words
+
+    rng = random.Random(args.seed)
+    segments = {}
+    questions: Dict[int, List[dict]] = {user: [] for user in range(args.users)}
+    for position in range(args.questions):
+        user = position % args.users
+        if rng.random() < args.off_topic:
+            text = rng.choice(OFF_TOPIC_QUESTIONS)
+        else:
+            video_id = f"bench{user % args.videos:06d}"
+            if video_id not in segments:
+                segments[video_id] = [segment["text"] for segment in synthetic_segments(video_id)]
+            vocabulary = set(topic_words(video_id))
+            words = [word for word in rng.choice(segments[video_id]).split() if word in vocabulary]
+            text = f"What does the video say about {' '.join(dict.fromkeys(words[:4]))}?"
+        questions[user].append({"thread_id": f"bench-user-{user}", "message": text})
+    return questions
+
+
+async def _ask(client: httpx.AsyncClient, question: dict, stream: bool, ttfts: List[float]) -> None:
+    if not stream:
+        response = await client.post("/api/v1/message", json=question)
+        response.raise_for_status()
+        return
+
+    started = time.perf_counter()
+    first = True
+    async with client.stream("POST", "/api/v1/message/stream", json=question) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if first and line.startswith("event: token"):
+                ttfts.append(time.perf_counter() - started)
+                first = False
+            elif line.startswith("event: error"):
+                raise RuntimeError("stream reported an error")
+
+
+async def _benchmark(args: argparse.Namespace, client: httpx.AsyncClient) -> dict:
+    results: Dict[str, dict] = {}
+
+    results["init"] = await _run_phase(
+        [[lambda i=i: _init(client, _video_url(i), f"bench-video-{i}")] for i in range(args.videos)],
+        args.concurrency,
+    )
+    results["bind"] = await _run_phase(
+        [[lambda u=u: _init(client, _video_url(u % args.videos), f"bench-user-{u}")] for u in range(args.users)],
+        args.concurrency,
+    )
+
+    ttfts: List[float] = []
+    results["message"] = await _run_phase(
+        [
+            [lambda q=q: _ask(client, q, args.stream, ttfts) for q in user_questions]
+            for user_questions in _questions(args).values()
+        ],
+        args.concurrency,
+    )
+    if ttfts:
+        results["message"]["ttft_p50_ms"] = round(float(np.percentile(ttfts, 50)) * 1000, 1)
+        results["message"]["ttft_p95_ms"] = round(float(np.percentile(ttfts, 95)) * 1000, 1)
+    return results
+
+
+async def _main(args: argparse.Namespace) -> dict:
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, timeout=120) as client:
+            results = await _benchmark(args, client)
+        return {"target": args.url, **results}
+
+    from prometheus_client import REGISTRY
+
+    from app.main import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+            results = await _benchmark(args, client)
+
+    # How the questions were answered, to spot a gate/rerank that refuses too much
+    outcomes = {
+        outcome: int(REGISTRY.get_sample_value("rag_chat_turns_total", {"outcome": outcome}) or 0)
+        for outcome in ("llm", "refused", "cached")
+    }
+    return {"target": "in-process", **results, "outcomes": outcomes, "memory": _rss_mb()}
+
+
+def _check(results: dict, thresholds: dict) -> List[str]:
+    """Return a description of every threshold the results violate."""
+    violations = []
+    for phase, limits in thresholds.items():
+        stats = results.get(phase, {})
+        for name, limit in limits.items():
+            metric, _, bound = name.rpartition("_")
+            value = stats.get(metric)
+            if value is None:
+                continue
+            if (bound == "max" and value > limit) or (bound == "min" and value < limit):
+                violations.append(f"{phase}.{metric} = {value} (limit {bound} {limit})")
+    return violations
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Offline load test for /init and /message.")
+    parser.add_argument("--videos", type=int, default=10, help="synthetic videos to ingest")
+    parser.add_argument("--users", type=int, default=20, help="simulated users (threads)")
+    parser.add_argument("--questions", type=int, default=200, help="questions across all users")
+    parser.add_argument("--concurrency", type=int, default=16, help="requests in flight")
+    parser.add_argument("--off-topic", type=float, default=0.2, help="fraction of off-topic questions")
+    parser.add_argument("--stream", action="store_true", help="use /message/stream and report TTFT")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--url", help="benchmark a running server instead of the in-process app")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--thresholds", help="JSON limits per phase, e.g. {\"message\": {\"p95_ms_max\": 500}}")
+    args = parser.parse_args(argv)
+
+    if not args.url:
+        _configure_offline()
+
+    results = asyncio.run(_main(args))
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2)
+
+    if args.thresholds:
+        with open(args.thresholds, encoding="utf-8") as handle:
+            violations = _check(results, json.load(handle))
+        for violation in violations:
+            print(f"THRESHOLD EXCEEDED: {violation}", file=sys.stderr)
+        if violations:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
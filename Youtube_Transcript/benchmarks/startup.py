@@ -0,0 +1,145 @@
+"""Cold start benchmark: import time, time to ready and baseline RSS of one worker.
+
+Usage (from the Youtube_Transcript directory):
+    python -m benchmarks.startup --runs 5
+
+Each run starts a fresh interpreter with `python -X importtime`, imports
+app.main, then runs the app's startup (lifespan) the way uvicorn would. It
+reports, as medians over the runs:
+- import: seconds and RSS after `import app.main`
+- ready: seconds and RSS once startup finished (clients, graph)
+- the import cost per top-level package, to see what a worker pays for
+- which provider SDKs were loaded (only the configured ones should be)
+
+Like the load test it defaults to the offline fake providers; pass
+--llm-provider / --embedding-provider (e.g. openai) to measure a real SDK.
+--thresholds makes it exit non-zero on regressions.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List
+
+from benchmarks.load_test import _check, _configure_offline
+
+
+# Heavy third-party SDKs that should only be imported for the configured provider
+PROVIDER_MODULES = (
+    "openai",
+    "anthropic",
+    "google.genai",
+    "huggingface_hub",
+    "fastembed",
+    "langchain_openai",
+    "langchain_anthropic",
+    "langchain_google_genai",
+    "langchain_huggingface",
+)
+
+_CHILD = """
+import asyncio, json, sys, time
+
+def rss_mb():
+    with open("/proc/self/status", encoding="utf-8") as handle:
+        for line in handle:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+
+started = time.perf_counter()
+from app.main import app
+imported = time.perf_counter()
+result = {"import_seconds": imported - started, "import_rss_mb": rss_mb()}
+
+async def start():
+    async with app.router.lifespan_context(app):
+        result["ready_seconds"] = time.perf_counter() - started
+        result["ready_rss_mb"] = rss_mb()
+
+asyncio.run(start())
+result["modules"] = sorted(name for name in sys.modules if name in set(json.loads(sys.argv[1])))
+print(json.dumps(result))
+"""
+
+
+def _package_costs(importtime: str) -> Dict[str, float]:
+    """Self import time (ms) summed per top-level package, from -X importtime output."""
+    costs: Dict[str, float] = defaultdict(float)
+    for line in importtime.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        costs[name.strip().split(".")[0]] += int(self_us) / 1000
+    return costs
+
+
+def _run_once() -> dict:
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _CHILD, json.dumps(PROVIDER_MODULES)],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if process.returncode != 0:
+        raise RuntimeError(f"Startup run failed:\n{process.stderr[-4000:]}")
+    result = json.loads(process.stdout.strip().splitlines()[-1])
+    result["packages"] = _package_costs(process.stderr)
+    return result
+
+
+def _median(runs: List[dict], key: str) -> float:
+    return round(statistics.median(run[key] for run in runs), 3)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Cold start benchmark (import time, time to ready, RSS).")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters to start")
+    parser.add_argument("--llm-provider", help="LLM_PROVIDER to start with (default: fake)")
+    parser.add_argument("--embedding-provider", help="EMBEDDING_PROVIDER to start with (default: fake)")
+    parser.add_argument("--top", type=int, default=15, help="packages to list by import cost")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--thresholds", help="JSON limits, e.g. {\"ready\": {\"seconds_max\": 10, \"rss_mb_max\": 400}}")
+    args = parser.parse_args(argv)
+
+    if args.llm_provider:
+        os.environ["LLM_PROVIDER"] = args.llm_provider
+    if args.embedding_provider:
+        os.environ["EMBEDDING_PROVIDER"] = args.embedding_provider
+    _configure_offline()
+
+    runs = [_run_once() for _ in range(args.runs)]
+    packages: Dict[str, List[float]] = defaultdict(list)
+    for run in runs:
+        for package, ms in run["packages"].items():
+            packages[package].append(ms)
+    top = sorted(packages.items(), key=lambda item: -statistics.median(item[1]))[:args.top]
+
+    results = {
+        "providers": {"llm": os.environ["LLM_PROVIDER"], "embedding": os.environ["EMBEDDING_PROVIDER"]},
+        "runs": args.runs,
+        "import": {"seconds": _median(runs, "import_seconds"), "rss_mb": _median(runs, "import_rss_mb")},
+        "ready": {"seconds": _median(runs, "ready_seconds"), "rss_mb": _median(runs, "ready_rss_mb")},
+        "provider_modules": runs[-1]["modules"],
+        "import_ms_by_package": {package: round(statistics.median(ms), 1) for package, ms in top},
+    }
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2)
+
+    if args.thresholds:
+        with open(args.thresholds, encoding="utf-8") as handle:
+            violations = _check(results, json.load(handle))
+        for violation in violations:
+            print(f"THRESHOLD EXCEEDED: {violation}", file=sys.stderr)
+        if violations:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,6 +9,9 @@ const chatHistory = document.getElementById('chat-history');
 const userMessageInput = document.getElementById('user-message');
 const sendBtn = document.getElementById('send-btn');
 
+// Per-tab conversation id; the backend binds indexed videos to this thread
+const threadId = (crypto.randomUUID && crypto.randomUUID()) || `thread-${Date.now()}-${Math.random().toString(16).slice(2)}`;
+
 // Tracks whether the backend has finished building the vector store
 let isInitialized = false;
 // Reference to the temporary "bot is typing" message
@@ -37,6 +40,52 @@ function appendMessage(text, sender) {
     chatHistory.scrollTop = chatHistory.scrollHeight;
 }
 
+/**
+ * Format seconds as m:ss or h:mm:ss.
+ * @param {number} seconds
+ */
+function formatTimestamp(seconds) {
+    const total = Math.floor(seconds);
+    const h = Math.floor(total / 3600);
+    const m = Math.floor((total % 3600) / 60);
+    const s = String(total % 60).padStart(2, '0');
+    return h ? `${h}:${String(m).padStart(2, '0')}:${s}` : `${m}:${s}`;
+}
+
+/**
+ * Append deep links to the video moments an answer was drawn from.
+ * @param {Array<{url?: string, start?: number}>} sources
+ */
+function appendSources(sources) {
+    const timed = (sources || []).filter((source) => source.url && source.start != null);
+    if (!timed.length) return;
+
+    const sourcesDiv = document.createElement('div');
+    sourcesDiv.className = 'message sources';
+    sourcesDiv.append('Sources: ');
+    timed.forEach((source, index) => {
+        const link = document.createElement('a');
+        link.href = source.url;
+        link.target = '_blank';
+        link.rel = 'noopener';
+        link.textContent = formatTimestamp(source.start);
+        if (index) sourcesDiv.append(' · ');
+        sourcesDiv.appendChild(link);
+    });
+    chatHistory.appendChild(sourcesDiv);
+    chatHistory.scrollTop = chatHistory.scrollHeight;
+}
+
+/**
+ * Human-readable progress line for a background ingest job.
+ * @param {object} job
+ */
+function describeJob(job) {
+    const running = Object.entries(job.stages || {}).find(([, stage]) => stage.status === 'running');
+    const stage = running ? running[0] : job.status;
+    return `Initializing knowledge base (${stage})... ${job.chunks_embedded}/${job.chunks_total} chunks embedded.`;
+}
+
 /**
  * Call the /init endpoint to ingest a YouTube URL and build the vector store.
  */
@@ -56,16 +105,32 @@ async function initializeChat() {
             headers: {
                 'Content-Type': 'application/json',
             },
-            body: JSON.stringify({ url: url }),
+            body: JSON.stringify({ url: url, thread_id: threadId }),
         });
 
         if (!response.ok) {
             throw new Error('Failed to initialize chat');
         }
 
-        const data = await response.json();
+        // Ingestion runs in the background; poll the job until it finishes
+        let job = await response.json();
+        while (job.status === 'queued' || job.status === 'running') {
+            setStatus(describeJob(job), 'loading');
+            await new Promise((resolve) => setTimeout(resolve, 1000));
+            const poll = await fetch(`${API_BASE_URL}/init/${job.job_id}`);
+            if (!poll.ok) {
+                throw new Error('Lost track of the initialization job');
+            }
+            job = await poll.json();
+        }
+        if (job.status !== 'ready') {
+            throw new Error(job.error || 'Failed to initialize chat');
+        }
+
         // Indicate that the backend is ready to answer questions
-        setStatus(data.message || 'Ready to chat!', 'success');
+        setStatus(job.cached
+            ? `Ready to chat! Reused existing index (${job.chunks_total} chunks).`
+            : `Ready to chat! Indexed ${job.chunks_total} chunks.`, 'success');
         isInitialized = true;
         userMessageInput.disabled = false;
         sendBtn.disabled = false;
@@ -82,7 +147,39 @@ async function initializeChat() {
 }
 
 /**
- * Send the user message to the backend and render the bot answer.
+ * Read a Server-Sent Events response body and dispatch each event.
+ * @param {Response} response
+ * @param {(event: string, data: object) => void} onEvent
+ */
+async function readEventStream(response, onEvent) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        // Frames are separated by a blank line
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const frame = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+
+            let event = 'message';
+            let data = '';
+            for (const line of frame.split('\n')) {
+                if (line.startsWith('event: ')) event = line.slice(7);
+                else if (line.startsWith('data: ')) data += line.slice(6);
+            }
+            onEvent(event, data ? JSON.parse(data) : {});
+        }
+    }
+}
+
+/**
+ * Send the user message to the backend and stream the bot answer.
  */
 async function sendMessage() {
     if (!isInitialized) return;
@@ -103,38 +200,39 @@ async function sendMessage() {
     chatHistory.scrollTop = chatHistory.scrollHeight;
 
     try {
-        const response = await fetch(`${API_BASE_URL}/message`, {
+        const response = await fetch(`${API_BASE_URL}/message/stream`, {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
             },
-            body: JSON.stringify({ message: text }),
+            body: JSON.stringify({ message: text, thread_id: threadId }),
         });
 
-        if (!response.ok) {
+        if (!response.ok || !response.body) {
             throw new Error('Failed to send message');
         }
 
-        const data = await response.json();
-
-        console.log('API Response:', data);
-
-        // Try to normalize different possible API response shapes to a string
-        let botResponse = "I couldn't understand the response.";
-        if (typeof data === 'string') {
-            botResponse = data;
-        } else if (data.answer) {
-            botResponse = data.answer;
-        } else if (data.response) {
-            botResponse = data.response;
-        } else if (data.content) {
-            botResponse = data.content;
-        } else {
-            // Fallback: try to dump the object
-            botResponse = JSON.stringify(data);
-        }
-
-        appendMessage(botResponse, 'bot');
+        // Render tokens into a single bot bubble as they stream in
+        let botMessageEl = null;
+        await readEventStream(response, (event, data) => {
+            if (event === 'token') {
+                if (!botMessageEl) {
+                    loadingMessageEl.remove();
+                    botMessageEl = document.createElement('div');
+                    botMessageEl.className = 'message bot';
+                    chatHistory.appendChild(botMessageEl);
+                }
+                botMessageEl.textContent += data.token;
+                chatHistory.scrollTop = chatHistory.scrollHeight;
+            } else if (event === 'done') {
+                if (!botMessageEl) {
+                    appendMessage(data.answer || "I couldn't understand the response.", 'bot');
+                }
+                appendSources(data.sources);
+            } else if (event === 'error') {
+                throw new Error(data.detail || 'Failed to generate answer');
+            }
+        });
 
     } catch (error) {
         appendMessage(`Error: ${error.message}`, 'error');
@@ -0,0 +1,27 @@
+"""Offline configuration shared by every test.
+
+The settings are read when app.core.config is first imported, so the
+environment is set here, before any test module imports the app: fake LLM
+and embeddings, synthetic transcripts, in-memory Chroma and checkpointer,
+and throwaway directories for everything written to disk.
+"""
+
+import os
+import tempfile
+
+_workdir = tempfile.mkdtemp(prefix="yt-tests-")
+
+os.environ.update({
+    "OPENAI_API_KEY": "unused",
+    "HF_TOKEN": "unused",
+    "LLM_PROVIDER": "fake",
+    "EMBEDDING_PROVIDER": "fake",
+    "TRANSCRIPT_SOURCE": "synthetic",
+    "CHECKPOINTER_BACKEND": "memory",
+    "CHROMA_MODE": "memory",
+    "HOT_INDEX_ENABLED": "False",
+    "EMBEDDING_CACHE_PATH": os.path.join(_workdir, "embeddings.sqlite3"),
+    "CHROMA_PERSIST_DIR": os.path.join(_workdir, "chroma"),
+    "TRANSCRIPT_CACHE_DIR": os.path.join(_workdir, "transcripts"),
+    "HOT_INDEX_DIR": os.path.join(_workdir, "hot_index"),
+})
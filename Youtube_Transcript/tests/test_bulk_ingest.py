@@ -0,0 +1,65 @@
+import threading
+import time
+
+from app.core.resources import get_resources
+from app.services.bulk_ingest_service import BulkIngestManager, BulkIngestor, BulkIngestRun
+from app.services.ingest_service import IngestJob, IngestPipeline
+from app.services.video_registry_service import collection_name_for
+
+
+def test_run_larger_than_the_cache_cap_keeps_its_videos(monkeypatch):
+    pipeline = IngestPipeline()
+    repository = get_resources().vector_repo
+    pipeline.ingest(IngestJob("https://www.youtube.com/watch?v=bulkold0001", "bulkold0001", None, False))
+
+    video_ids = ["bulknew0001", "bulknew0002", "bulknew0003"]
+    monkeypatch.setattr("app.services.bulk_ingest_service.expand_video_ids", lambda url, limit: video_ids)
+    monkeypatch.setattr(pipeline.ingest_cache, "max_videos", 2)
+
+    run = BulkIngestRun(["https://www.youtube.com/playlist?list=tests"])
+    BulkIngestor(pipeline, workers=2).run(run)
+
+    assert run.status == "done" and run.videos_done == len(video_ids)
+    for video_id in video_ids:
+        assert repository.get_chunk_ids(collection_name_for(video_id))
+    # The cap is met by evicting videos outside the run
+    assert not repository.get_chunk_ids(collection_name_for("bulkold0001"))
+    pipeline.shutdown()
+
+
+class _BlockingPipeline:
+    """Stands in for IngestPipeline: each ingest waits until released."""
+
+    def __init__(self):
+        self.stopping = threading.Event()
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def ingest(self, job):
+        self.started.set()
+        self.release.wait(5)
+
+
+def test_shutdown_drops_queued_runs_and_unstarted_videos(monkeypatch):
+    monkeypatch.setattr(
+        "app.services.bulk_ingest_service.expand_video_ids", lambda url, limit: ["vid01", "vid02", "vid03"]
+    )
+    pipeline = _BlockingPipeline()
+    manager = BulkIngestManager(BulkIngestor(pipeline, workers=1), history=10)
+    running = manager.submit(["https://www.youtube.com/playlist?list=tests"])
+    queued = manager.submit(["https://www.youtube.com/playlist?list=tests"])
+    assert pipeline.started.wait(5)
+
+    shutdown = threading.Thread(target=manager.shutdown)
+    shutdown.start()
+    while not pipeline.stopping.is_set():
+        time.sleep(0.01)
+    pipeline.release.set()
+    shutdown.join(5)
+
+    assert running.status == "failed" and running.videos_done == 1
+    assert sorted(running.failures) == ["vid02", "vid03"]
+    assert all(error.startswith("Cancelled") for error in running.failures.values())
+    assert queued.status == "failed" and queued.error.startswith("Cancelled")
+    # Usable again after shutdown
+    assert not pipeline.stopping.is_set()
@@ -0,0 +1,87 @@
+import threading
+import time
+
+import chromadb
+import pytest
+
+from app.infrastructure.chroma.lock import ACQUIRED_AT, HOLDER, ChromaLock, LockCancelledError
+
+
+@pytest.fixture
+def client():
+    # Ephemeral clients in one process share their collections
+    client = chromadb.EphemeralClient()
+    yield client
+    if "video_lock" in [collection.name for collection in client.list_collections()]:
+        client.delete_collection("video_lock")
+
+
+def _lock(client, **kwargs) -> ChromaLock:
+    options = {"lease_seconds": 60, "timeout_seconds": 1, "poll_seconds": 0.02, **kwargs}
+    return ChromaLock(client, "video_lock", **options)
+
+
+def test_only_one_holder_at_a_time(client):
+    holding = []
+    overlaps = []
+
+    def work():
+        with _lock(client, timeout_seconds=10):
+            holding.append(1)
+            overlaps.append(len(holding))
+            time.sleep(0.02)
+            holding.pop()
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert overlaps == [1, 1, 1, 1]
+
+
+def test_waiting_times_out_while_held(client):
+    with _lock(client):
+        with pytest.raises(TimeoutError):
+            _lock(client, timeout_seconds=0.1).acquire()
+
+
+def test_expired_marker_is_taken_over(client):
+    # A holder that died long ago
+    client.create_collection("video_lock", metadata={HOLDER: "gone", ACQUIRED_AT: time.time() - 120})
+    with _lock(client) as lock:
+        assert client.get_collection("video_lock").metadata[HOLDER] == lock.holder
+
+
+def test_marker_changed_since_expiry_is_not_deleted(client):
+    expired = {HOLDER: "gone", ACQUIRED_AT: time.time() - 120}
+    client.create_collection("video_lock", metadata={HOLDER: "new", ACQUIRED_AT: time.time()})
+    _lock(client)._take_over(expired)
+    assert client.get_collection("video_lock").metadata[HOLDER] == "new"
+
+
+def test_lease_is_renewed_while_held(client):
+    with _lock(client, lease_seconds=0.3):
+        time.sleep(0.5)
+        # Renewed every lease / 3, so never older than the lease
+        with pytest.raises(TimeoutError):
+            _lock(client, lease_seconds=0.3, timeout_seconds=0.4).acquire()
+
+
+def test_cancel_stops_waiting(client):
+    cancel = threading.Event()
+    with _lock(client):
+        threading.Timer(0.1, cancel.set).start()
+        started = time.monotonic()
+        with pytest.raises(LockCancelledError):
+            _lock(client, timeout_seconds=30, cancel=cancel).acquire()
+        assert time.monotonic() - started < 5
+
+
+def test_release_leaves_other_holders_alone(client):
+    lock = _lock(client)
+    with lock:
+        pass
+    with _lock(client) as other:
+        lock.release()
+        assert client.get_collection("video_lock").metadata[HOLDER] == other.holder
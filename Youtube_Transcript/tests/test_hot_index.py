@@ -0,0 +1,60 @@
+import os
+
+import numpy as np
+import pytest
+
+from app.infrastructure.vector_index.hot_index import HotIndexCache, QuantizedIndex
+
+
+def _clustered(rng: np.random.Generator, count: int, dim: int = 32, centers: int = 20) -> np.ndarray:
+    # Transcript chunks cluster by topic; uniform noise would make IVF look worse than it is
+    means = rng.normal(size=(centers, dim))
+    return means[rng.integers(centers, size=count)] + 0.3 * rng.normal(size=(count, dim))
+
+
+def _exact_top(vectors: np.ndarray, query: np.ndarray, k: int) -> set:
+    return set(np.argsort(((vectors - query) ** 2).sum(axis=1))[:k])
+
+
+@pytest.mark.parametrize("dtype, flat_max, minimum", [("int8", 4096, 0.95), ("float16", 4096, 0.99), ("int8", 100, 0.8)])
+def test_recall_against_exact_search(dtype, flat_max, minimum):
+    rng = np.random.default_rng(1)
+    vectors = _clustered(rng, 2000)
+    index = QuantizedIndex(list(range(len(vectors))), vectors.tolist(), target="t", dtype=dtype, flat_max=flat_max)
+    assert (index.centroids is not None) == (len(vectors) > flat_max)
+
+    k, hits, queries = 10, 0, 50
+    for row in rng.choice(len(vectors), queries, replace=False):
+        query = vectors[row] + 0.1 * rng.normal(size=vectors.shape[1])
+        found = {doc for doc, _ in index.search(query.tolist(), k)}
+        hits += len(found & _exact_top(vectors, query, k))
+    assert hits / (k * queries) >= minimum
+
+
+def test_scores_are_best_first_on_chroma_scale():
+    rng = np.random.default_rng(2)
+    vectors = rng.normal(size=(50, 8))
+    index = QuantizedIndex(list(range(50)), vectors.tolist(), target="t", dtype="float16")
+    results = index.search(vectors[7].tolist(), 5)
+    scores = [score for _, score in results]
+    assert results[0][0] == 7 and scores == sorted(scores, reverse=True)
+    assert scores[0] == pytest.approx(1.0, abs=1e-2)
+    assert index.search(vectors[7].tolist(), 0) == []
+
+
+def test_cache_removes_files_of_evicted_and_replaced_indexes(tmp_path):
+    rng = np.random.default_rng(3)
+    cache = HotIndexCache(max_collections=2, revalidate_seconds=30, directory=str(tmp_path))
+
+    def build(target: str) -> QuantizedIndex:
+        return QuantizedIndex(list(range(10)), rng.normal(size=(10, 4)).tolist(), target=target, directory=str(tmp_path))
+
+    indexes = {name: build(f"{name}_a-0") for name in ("one", "two", "three")}
+    for name, index in indexes.items():
+        cache.put(name, index)
+    assert cache.peek("one") is None
+    assert not os.path.exists(indexes["one"].path)
+
+    rebuilt = build("two_b-0")
+    cache.put("two", rebuilt)
+    assert sorted(os.listdir(tmp_path)) == sorted(os.path.basename(i.path) for i in (rebuilt, indexes["three"]))
@@ -0,0 +1,44 @@
+from langchain_core.documents import Document
+
+from app.core.resources import get_resources
+from app.services.ingest_service import IngestJob, IngestPipeline, chunk_id
+from app.services.video_registry_service import collection_name_for
+
+
+def _chunk(text: str, start: float = 0.0, end: float = 3.0) -> Document:
+    return Document(page_content=text, metadata={"start_seconds": start, "end_seconds": end})
+
+
+def _job(video_id: str) -> IngestJob:
+    return IngestJob(f"https://www.youtube.com/watch?v={video_id}", video_id, "tests", append=False)
+
+
+def test_chunk_id_is_a_content_hash():
+    assert chunk_id("video", _chunk("some words")) == chunk_id("video", _chunk("some words"))
+    assert chunk_id("video", _chunk("some words")) != chunk_id("video", _chunk("other words"))
+    assert chunk_id("video", _chunk("some words")) != chunk_id("another", _chunk("some words"))
+    assert chunk_id("video", _chunk("some words")) != chunk_id("video", _chunk("some words", 3.0, 6.0))
+
+
+def test_chunk_id_tells_identical_chunks_apart():
+    first = chunk_id("video", _chunk("same"))
+    assert chunk_id("video", _chunk("same"), taken={first}) != first
+
+
+def test_reingesting_an_unchanged_transcript_rewrites_nothing():
+    pipeline = IngestPipeline()
+    repository = get_resources().vector_repo
+    collection_name = collection_name_for("unchanged01")
+
+    first = _job("unchanged01")
+    pipeline.ingest(first)
+    assert first.chunks_total > 0 and first.chunks_reused == 0
+    version = repository.index_version(collection_name)
+
+    # Bypass the ingest cache (as a changed splitter signature would) so the video is rebuilt
+    second = _job("unchanged01")
+    pipeline._build(second, collection_name, cache_key="another-key")
+    assert second.chunks_reused == second.chunks_total == first.chunks_total
+    # Same chunks: the live index was kept, not swapped for a copy
+    assert repository.index_version(collection_name) == version
+    pipeline.shutdown()
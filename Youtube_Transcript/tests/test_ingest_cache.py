@@ -0,0 +1,46 @@
+import time
+
+from app.core.resources import get_resources
+from app.services.ingest_cache_service import IngestCache, LAST_USED_AT
+from app.services.ingest_service import IngestJob, IngestPipeline
+from app.services.video_registry_service import collection_name_for
+
+
+def _ingest(pipeline: IngestPipeline, video_id: str) -> str:
+    pipeline.ingest(IngestJob(f"https://www.youtube.com/watch?v={video_id}", video_id, None, False))
+    return collection_name_for(video_id)
+
+
+def _expire(repository, collection_name: str) -> None:
+    metadata = repository.get_collection_metadata(collection_name)
+    metadata[LAST_USED_AT] = time.time() - 3600
+    repository.update_collection_metadata(collection_name, metadata)
+
+
+def test_sweep_runs_at_most_once_per_interval(monkeypatch):
+    cache = IngestCache(get_resources().vector_repo, sweep_interval=60)
+    calls = []
+    monkeypatch.setattr(cache, "evict", lambda **kwargs: calls.append(kwargs) or 0)
+    cache.sweep()
+    cache.sweep()
+    assert len(calls) == 1
+
+
+def test_eviction_skips_videos_locked_or_used_meanwhile():
+    pipeline = IngestPipeline()
+    repository = get_resources().vector_repo
+    locked, stale = _ingest(pipeline, "cachelock01"), _ingest(pipeline, "cachestale1")
+    for name in (locked, stale):
+        _expire(repository, name)
+    cache = IngestCache(repository, ttl_seconds=60)
+
+    # An ingest holds the lock: the video is in use, not evicted
+    with repository.write_lock(locked):
+        cache.evict()
+    assert repository.get_chunk_ids(locked)
+    assert not repository.get_chunk_ids(stale)
+
+    # Used after eviction listed it (its last-used time moved on)
+    assert not cache._clear_unused(locked, time.time() - 7200, cancel=None)
+    assert repository.get_chunk_ids(locked)
+    pipeline.shutdown()
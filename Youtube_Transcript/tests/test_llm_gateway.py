@@ -0,0 +1,158 @@
+import asyncio
+
+import pytest
+
+from app.infrastructure.llm.gateway import LLMGateway, LLMOverloadedError, PrioritySlots
+
+
+class StubLLM:
+    """Streams the given chunks, pausing after the first until resumed."""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.calls = 0
+        self.resume = asyncio.Event()
+
+    async def astream(self, prompt, **options):
+        self.calls += 1
+        for position, chunk in enumerate(self.chunks):
+            if position == 1:
+                await self.resume.wait()
+            yield chunk
+
+
+async def _collect(stream):
+    return [chunk async for chunk in stream]
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_timed_out_waiter_does_not_keep_the_slot():
+    async def scenario():
+        slots = PrioritySlots(limit=1, max_waiting=4, timeout=0.05)
+        await slots.acquire(0)
+        with pytest.raises(LLMOverloadedError):
+            await slots.acquire(0)
+        later = asyncio.create_task(slots.acquire(0))
+        await _settle()
+        slots.release()
+        await later
+        assert slots.active == 1
+        slots.release()
+        assert slots.active == 0
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_does_not_keep_the_slot():
+    async def scenario():
+        slots = PrioritySlots(limit=1, max_waiting=4, timeout=5)
+        await slots.acquire(0)
+        waiter = asyncio.create_task(slots.acquire(0))
+        await _settle()
+        waiter.cancel()
+        await _settle()
+        slots.release()
+        assert slots.active == 0 and slots.waiting == 0
+
+    asyncio.run(scenario())
+
+
+def test_slot_handed_to_a_cancelled_waiter_passes_on():
+    async def scenario():
+        slots = PrioritySlots(limit=1, max_waiting=4, timeout=5)
+        await slots.acquire(0)
+        first = asyncio.create_task(slots.acquire(0))
+        second = asyncio.create_task(slots.acquire(0))
+        await _settle()
+        # Hand the slot to first, then cancel it before it resumes
+        slots.release()
+        first.cancel()
+        try:
+            await first
+        except asyncio.CancelledError:
+            pass
+        else:
+            # wait_for may deliver the handed-over slot instead of the cancel
+            slots.release()
+        await asyncio.wait_for(second, 1)
+        assert slots.active == 1
+        slots.release()
+        assert slots.active == 0
+
+    asyncio.run(scenario())
+
+
+def test_waiters_are_admitted_by_priority():
+    async def scenario():
+        slots = PrioritySlots(limit=1, max_waiting=4, timeout=5)
+        await slots.acquire(0)
+        admitted = []
+
+        async def wait(name, priority):
+            await slots.acquire(priority)
+            admitted.append(name)
+
+        tasks = [asyncio.create_task(wait("batch", 10)), asyncio.create_task(wait("interactive", 0))]
+        await _settle()
+        for _ in range(3):
+            slots.release()
+            await _settle()
+        await asyncio.gather(*tasks)
+        assert admitted == ["interactive", "batch"]
+
+    asyncio.run(scenario())
+
+
+def test_full_queue_rejects_immediately():
+    async def scenario():
+        gateway = LLMGateway(max_concurrency=1, max_queue=1, queue_timeout=5)
+        await gateway.slots.acquire(0)
+        queued = asyncio.create_task(gateway.slots.acquire(0))
+        await _settle()
+        with pytest.raises(LLMOverloadedError):
+            gateway.check_capacity()
+        with pytest.raises(LLMOverloadedError):
+            await _collect(gateway.astream(StubLLM(["a"]), "prompt"))
+        gateway.slots.release()
+        await queued
+        gateway.slots.release()
+        gateway.check_capacity()
+
+    asyncio.run(scenario())
+
+
+def test_identical_calls_share_one_provider_call():
+    async def scenario():
+        gateway = LLMGateway(max_concurrency=4, max_queue=4, queue_timeout=5)
+        llm = StubLLM(["a", "b", "c"])
+        first = gateway.astream(llm, "prompt", key="k")
+        first_chunks = asyncio.create_task(_collect(first))
+        await _settle()
+        # Joins after the first chunk: replays it, then follows the live call
+        second = gateway.astream(llm, "prompt", key="k")
+        second_chunks = asyncio.create_task(_collect(second))
+        await _settle()
+        llm.resume.set()
+        assert await first_chunks == ["a", "b", "c"]
+        assert await second_chunks == ["a", "b", "c"]
+        assert llm.calls == 1
+        assert not first.shared and second.shared
+        assert not gateway._flights
+
+    asyncio.run(scenario())
+
+
+def test_finished_call_is_not_replayed_to_later_callers():
+    async def scenario():
+        gateway = LLMGateway(max_concurrency=4, max_queue=4, queue_timeout=5)
+        llm = StubLLM(["a"])
+        assert await _collect(gateway.astream(llm, "prompt", key="k")) == ["a"]
+        later = gateway.astream(llm, "prompt", key="k")
+        assert await _collect(later) == ["a"]
+        assert llm.calls == 2 and not later.shared
+
+    asyncio.run(scenario())
@@ -0,0 +1,27 @@
+from app.core.resources import get_resources
+from app.services.graph.nodes import retrieve_node
+from app.services.ingest_service import IngestJob, IngestPipeline
+from app.services.lexical_index_service import lexical_indexes
+from app.services.video_digest_service import digest_cache
+from app.services.video_registry_service import collection_name_for
+
+
+def test_cache_misses_read_the_chunks_once(monkeypatch):
+    pipeline = IngestPipeline()
+    pipeline.ingest(IngestJob("https://www.youtube.com/watch?v=retrieve001", "retrieve001", None, False))
+    pipeline.shutdown()
+    collection_name = collection_name_for("retrieve001")
+    lexical_indexes.invalidate(collection_name)
+    digest_cache.invalidate(collection_name)
+
+    reads = []
+    stored_chunks = retrieve_node._stored_chunks
+    monkeypatch.setattr(retrieve_node, "_stored_chunks", lambda store: reads.append(1) or stored_chunks(store))
+
+    vector_repo = get_resources().vector_repo
+    index, digest = retrieve_node.load_video(vector_repo, collection_name)
+    assert index.search("the", k=3) and digest
+    assert len(reads) == 1
+    # Both are cached for the next turn
+    retrieve_node.load_video(vector_repo, collection_name)
+    assert len(reads) == 1
@@ -0,0 +1,18 @@
+from app.infrastructure.state.store import SQLiteStateStore
+
+
+def test_unbind_video_matches_the_id_exactly(tmp_path):
+    store = SQLiteStateStore(str(tmp_path / "state.sqlite3"))
+    store.bind("exact", "ab_cdefghij", append=False)
+    store.bind("exact", "other000001", append=True)
+    store.bind("wildcard", "abXcdefghij", append=False)
+    store.bind("case", "AB_CDEFGHIJ", append=False)
+    store.bind("alone", "ab_cdefghij", append=False)
+
+    assert store.unbind_video("ab_cdefghij") == 2
+    assert store.thread_videos("exact") == ["other000001"]
+    assert store.thread_videos("alone") == []
+    assert store.thread_videos("wildcard") == ["abXcdefghij"]
+    assert store.thread_videos("case") == ["AB_CDEFGHIJ"]
+    assert store.unbind_video("ab_cdefghij") == 0
+    store.close()
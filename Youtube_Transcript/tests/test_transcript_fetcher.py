@@ -0,0 +1,127 @@
+import gzip
+import json
+import time
+
+import pytest
+
+from app.infrastructure.transcripts.cache import TranscriptCache
+from app.infrastructure.transcripts.fetcher import TranscriptFetcher, TranscriptFetchError
+from app.infrastructure.transcripts.sources import (
+    FixtureSource,
+    TranscriptSource,
+    TranscriptUnavailableError,
+)
+
+SEGMENTS = [{"text": "hello there", "start": 0.0, "duration": 1.5}]
+
+
+class ScriptedSource(TranscriptSource):
+    """Raises the scripted errors in turn, then returns SEGMENTS."""
+
+    def __init__(self, name, errors=(), local=False, delay=0.0):
+        self.name = name
+        self.local = local
+        self.errors = list(errors)
+        self.delay = delay
+        self.calls = 0
+
+    def fetch(self, video_id, languages, timeout):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.errors:
+            raise self.errors.pop(0)
+        return languages[0], list(SEGMENTS)
+
+
+def _fetcher(sources, **kwargs) -> TranscriptFetcher:
+    return TranscriptFetcher(sources, **{"timeout": 5, "retries": 2, "backoff_seconds": 0, **kwargs})
+
+
+def test_source_must_implement_fetch():
+    with pytest.raises(TypeError):
+        TranscriptSource()
+
+
+def test_fixture_source_prefers_language_files(tmp_path):
+    with gzip.open(tmp_path / "vid.de.json.gz", "wt", encoding="utf-8") as f:
+        json.dump({"language": "de", "segments": SEGMENTS}, f)
+    (tmp_path / "vid.json").write_text(json.dumps(SEGMENTS + SEGMENTS))
+    source = FixtureSource(str(tmp_path))
+
+    assert source.fetch("vid", ["de", "en"], timeout=1) == ("de", SEGMENTS)
+    # A bare segment list stands for the first preferred language
+    assert source.fetch("vid", ["en"], timeout=1) == ("en", SEGMENTS + SEGMENTS)
+    with pytest.raises(TranscriptUnavailableError):
+        source.fetch("other", ["en"], timeout=1)
+
+
+def test_transient_errors_are_retried():
+    source = ScriptedSource("flaky", errors=[ConnectionError("reset"), ConnectionError("reset")])
+    assert _fetcher([source]).fetch("vid", ["en"]) == ("en", SEGMENTS)
+    assert source.calls == 3
+
+
+def test_retries_back_off_exponentially(monkeypatch):
+    delays = []
+
+    async def sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr("app.infrastructure.transcripts.fetcher.asyncio.sleep", sleep)
+    monkeypatch.setattr("app.infrastructure.transcripts.fetcher.random.random", lambda: 1.0)
+    source = ScriptedSource("flaky", errors=[ConnectionError("reset")] * 2)
+    _fetcher([source], backoff_seconds=1).fetch("vid", ["en"])
+    assert delays == [1.0, 2.0]
+
+
+def test_exhausted_retries_fall_back_to_the_next_source():
+    broken = ScriptedSource("broken", errors=[ConnectionError("reset")] * 3)
+    backup = ScriptedSource("backup")
+    assert _fetcher([broken, backup]).fetch("vid", ["en"]) == ("en", SEGMENTS)
+    assert (broken.calls, backup.calls) == (3, 1)
+
+
+def test_unavailable_is_not_retried():
+    missing = ScriptedSource("missing", errors=[TranscriptUnavailableError("no captions")])
+    backup = ScriptedSource("backup")
+    _fetcher([missing, backup]).fetch("vid", ["en"])
+    assert (missing.calls, backup.calls) == (1, 1)
+
+
+def test_failure_kind_decides_the_error():
+    missing = ScriptedSource("missing", errors=[TranscriptUnavailableError("no captions")])
+    with pytest.raises(TranscriptUnavailableError):
+        _fetcher([missing]).fetch("vid", ["en"])
+
+    missing = ScriptedSource("missing", errors=[TranscriptUnavailableError("no captions")])
+    broken = ScriptedSource("broken", errors=[ConnectionError("reset")] * 3)
+    with pytest.raises(TranscriptFetchError):
+        _fetcher([missing, broken]).fetch("vid", ["en"])
+
+
+def test_slow_attempts_time_out():
+    slow = ScriptedSource("slow", delay=0.5)
+    started = time.monotonic()
+    with pytest.raises(TranscriptFetchError):
+        _fetcher([slow], timeout=0.05, retries=0).fetch("vid", ["en"])
+    assert time.monotonic() - started < 0.4
+
+
+def test_remote_transcripts_are_cached(tmp_path):
+    cache = TranscriptCache(str(tmp_path))
+    remote = ScriptedSource("remote")
+    fetcher = _fetcher([remote], cache=cache)
+    assert fetcher.fetch("vid", ["en"]) == ("en", SEGMENTS)
+    assert fetcher.fetch("vid", ["en"]) == ("en", SEGMENTS)
+    assert remote.calls == 1
+    assert cache.get("vid", ["en"]) == ("en", SEGMENTS)
+
+
+def test_local_sources_are_not_cached(tmp_path):
+    cache = TranscriptCache(str(tmp_path))
+    local = ScriptedSource("local", local=True)
+    fetcher = _fetcher([local], cache=cache)
+    fetcher.fetch("vid", ["en"])
+    fetcher.fetch("vid", ["en"])
+    assert local.calls == 2
+    assert cache.get("vid", ["en"]) is None